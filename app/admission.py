@@ -0,0 +1,141 @@
+"""
+Admission control for WebSocket handshakes.
+
+After a deploy or a network blip every client reconnects at once. Connections
+are admitted against token-bucket rate limits (global and per client IP) and
+connection caps (per game and global). Rejected clients are closed with
+code 1013 (Try Again Later) and a jittered retry delay, so reconnects spread
+out instead of stampeding.
+"""
+from collections import OrderedDict
+from typing import Callable, Optional
+import os
+import random
+import time
+
+# Origins allowed for both CORS and the WebSocket handshake
+ALLOWED_ORIGINS = (
+    "https://micho8cho93.github.io",
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "http://localhost:5500",
+    "http://127.0.0.1:5500",
+)
+ALLOWED_ORIGIN_SET = frozenset(origin.rstrip("/") for origin in ALLOWED_ORIGINS)
+
+# Close code and reason format for rejected connections
+RETRY_CLOSE_CODE = 1013
+
+WS_CONNECT_RATE = float(os.getenv("WS_CONNECT_RATE", "500"))
+WS_CONNECT_BURST = float(os.getenv("WS_CONNECT_BURST", "1000"))
+WS_IP_CONNECT_RATE = float(os.getenv("WS_IP_CONNECT_RATE", "2"))
+WS_IP_CONNECT_BURST = float(os.getenv("WS_IP_CONNECT_BURST", "10"))
+WS_MAX_CONNECTIONS_PER_GAME = int(os.getenv("WS_MAX_CONNECTIONS_PER_GAME", "20000"))
+WS_MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "100000"))
+WS_RETRY_JITTER_MS = int(os.getenv("WS_RETRY_JITTER_MS", "2000"))
+
+
+def origin_allowed(origin: Optional[str]) -> bool:
+    """Check an Origin header; clients that send none (non-browsers) are allowed."""
+    return origin is None or origin.rstrip("/") in ALLOWED_ORIGIN_SET
+
+
+def retry_reason(retry_after_ms: int) -> str:
+    """Close reason carrying the retry delay."""
+    return f"retry_after_ms={retry_after_ms}"
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`."""
+    __slots__ = ("rate", "burst", "tokens", "updated", "clock")
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+
+    def take(self) -> float:
+        """Take one token. Returns 0 if admitted, else seconds until a token is available."""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Decides whether a WebSocket handshake may proceed."""
+
+    def __init__(
+        self,
+        connect_rate: float = WS_CONNECT_RATE,
+        connect_burst: float = WS_CONNECT_BURST,
+        ip_connect_rate: float = WS_IP_CONNECT_RATE,
+        ip_connect_burst: float = WS_IP_CONNECT_BURST,
+        max_per_game: int = WS_MAX_CONNECTIONS_PER_GAME,
+        max_total: int = WS_MAX_CONNECTIONS,
+        jitter_ms: int = WS_RETRY_JITTER_MS,
+        max_tracked_ips: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ip_connect_rate = ip_connect_rate
+        self.ip_connect_burst = ip_connect_burst
+        self.max_per_game = max_per_game
+        self.max_total = max_total
+        self.jitter_ms = jitter_ms
+        self.max_tracked_ips = max_tracked_ips
+        self.clock = clock
+        self.rejected = 0
+        self._connect_rate = connect_rate
+        self._connect_burst = connect_burst
+        self.reset()
+
+    def reset(self):
+        """Refill every bucket and forget tracked client IPs."""
+        self._global = TokenBucket(self._connect_rate, self._connect_burst, self.clock)
+        self._ips: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _retry_after_ms(self, wait_seconds: float) -> int:
+        """Retry delay: the time until capacity frees up plus random jitter."""
+        return int(wait_seconds * 1000) + random.randint(0, self.jitter_ms)
+
+    def _ip_bucket(self, client_ip: str) -> TokenBucket:
+        bucket = self._ips.get(client_ip)
+        if bucket is None:
+            bucket = TokenBucket(self.ip_connect_rate, self.ip_connect_burst, self.clock)
+            self._ips[client_ip] = bucket
+            while len(self._ips) > self.max_tracked_ips:
+                self._ips.popitem(last=False)
+        else:
+            self._ips.move_to_end(client_ip)
+        return bucket
+
+    def admit(
+        self,
+        client_ip: Optional[str],
+        game_connections: int,
+        total_connections: int,
+    ) -> Optional[int]:
+        """
+        Admit one connection attempt.
+        Returns None if admitted, else the delay in ms the client should wait.
+        """
+        wait = 0.0
+        if game_connections >= self.max_per_game or total_connections >= self.max_total:
+            # Full: spread retries over the jitter window plus one second
+            wait = 1.0
+        elif client_ip is not None:
+            wait = self._ip_bucket(client_ip).take()
+        if not wait:
+            wait = self._global.take()
+        if not wait:
+            return None
+        self.rejected += 1
+        return self._retry_after_ms(wait)
+
+
+admission = AdmissionController()
@@ -0,0 +1,317 @@
+"""
+Retention for play_by_play_events: moving old games out of the hot table.
+
+Events of finished games that started more than ARCHIVE_AFTER_DAYS ago are
+moved to an archive, so the hot table and its indexes only hold recent
+games. The archive is split into ranges of ARCHIVE_RANGE_GAMES game ids:
+
+- PostgreSQL: play_by_play_events_archive is partitioned BY RANGE (game_id)
+  (created by migration 0003) and each range is a partition.
+- SQLite: each range is its own table and play_by_play_events_archive is a
+  view over all of them, recreated when a range is added.
+
+Either way a whole range can be dropped with one DROP TABLE instead of a
+mass DELETE.
+
+Games are moved in batches of at most ARCHIVE_BATCH_EVENTS events, each in
+its own short transaction, with a pause between batches. Finished games
+never change, so a batch never touches rows that live writes use. A game is
+flagged with games.archived_at in the same transaction, and reads of its
+history go to the archive from then on.
+
+Usage:
+    python -m app.archive run [--days N]
+    python -m app.archive ranges
+    python -m app.archive drop-range N
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import argparse
+import asyncio
+import os
+import re
+import time
+
+from sqlalchemy import (
+    Column, DateTime, Enum, Index, Integer, MetaData, String, Table,
+    delete, func, insert, inspect, select, union_all, update,
+)
+from sqlalchemy.orm import Session
+
+from app import models, search
+from app.live_state import LiveEvent, LiveGame
+
+# Background archiving is off unless a retention period is configured
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "0"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_EVENTS = int(os.getenv("ARCHIVE_BATCH_EVENTS", "5000"))
+ARCHIVE_BATCH_PAUSE_MS = float(os.getenv("ARCHIVE_BATCH_PAUSE_MS", "50"))
+ARCHIVE_RANGE_GAMES = int(os.getenv("ARCHIVE_RANGE_GAMES", "100000"))
+
+ARCHIVE_TABLE = "play_by_play_events_archive"
+RANGE_TABLE = re.compile(rf"^{ARCHIVE_TABLE}_(\d+)$")
+EVENT_COLUMNS = ("id", "game_id", "team", "minute", "description", "points", "created_at")
+
+Event = models.PlayByPlayEvent
+Game = models.Game
+
+
+def _columns() -> list:
+    return [
+        Column("id", Integer, nullable=False),
+        Column("game_id", Integer, nullable=False),
+        Column("team", Enum(models.TeamSide), nullable=False),
+        Column("minute", Integer, nullable=False),
+        Column("description", String, nullable=False),
+        Column("points", Integer, nullable=False, server_default="0"),
+        Column("created_at", DateTime),
+    ]
+
+
+# Kept off Base.metadata: archive DDL is managed here, not by create_all or autogenerate
+archive_metadata = MetaData()
+archived_events = Table(ARCHIVE_TABLE, archive_metadata, *_columns())
+_range_tables: Dict[int, Table] = {}
+
+
+def range_number(game_id: int) -> int:
+    """The archive range holding a game's events."""
+    return game_id // ARCHIVE_RANGE_GAMES
+
+
+def range_table(number: int) -> Table:
+    """Table object for one archive range."""
+    table = _range_tables.get(number)
+    if table is None:
+        name = f"{ARCHIVE_TABLE}_{number:06d}"
+        table = Table(
+            name, MetaData(), *_columns(),
+            Index(f"ix_{name}_game_id", "game_id", "id"),
+        )
+        _range_tables[number] = table
+    return table
+
+
+def range_numbers(bind) -> List[int]:
+    """Archive ranges that exist in the database."""
+    names = inspect(bind).get_table_names()
+    return sorted(int(match.group(1)) for match in map(RANGE_TABLE.match, names) if match)
+
+
+def has_archive(bind) -> bool:
+    """Whether the archive table (PostgreSQL) or view (SQLite) exists yet."""
+    inspector = inspect(bind)
+    return ARCHIVE_TABLE in inspector.get_table_names() or ARCHIVE_TABLE in inspector.get_view_names()
+
+
+def _refresh_view(conn, numbers: Iterable[int]):
+    """Point the SQLite archive view at every range table."""
+    columns = ", ".join(EVENT_COLUMNS)
+    conn.exec_driver_sql(f"DROP VIEW IF EXISTS {ARCHIVE_TABLE}")
+    arms = [f"SELECT {columns} FROM {range_table(number).name}" for number in numbers]
+    if arms:
+        conn.exec_driver_sql(f"CREATE VIEW {ARCHIVE_TABLE} AS {' UNION ALL '.join(arms)}")
+
+
+def ensure_range(conn, number: int):
+    """Create an archive range if it does not exist yet."""
+    table = range_table(number)
+    if inspect(conn).has_table(table.name):
+        return
+    if conn.dialect.name == "postgresql":
+        low = number * ARCHIVE_RANGE_GAMES
+        conn.exec_driver_sql(
+            f"CREATE TABLE {table.name} PARTITION OF {ARCHIVE_TABLE} "
+            f"FOR VALUES FROM ({low}) TO ({low + ARCHIVE_RANGE_GAMES})"
+        )
+    else:
+        table.create(conn)
+        _refresh_view(conn, range_numbers(conn))
+    print(f"🗄️ Created archive range {number} ({table.name})")
+
+
+def drop_range(db: Session, number: int):
+    """
+    Delete one archive range outright, with its search entries. Its games
+    keep their rows but lose their events.
+    """
+    conn = db.connection()
+    table = range_table(number)
+    if conn.dialect.name == "sqlite":
+        _refresh_view(conn, [n for n in range_numbers(conn) if n != number])
+    table.drop(conn, checkfirst=True)
+    low = number * ARCHIVE_RANGE_GAMES
+    search.remove_games(conn, low, low + ARCHIVE_RANGE_GAMES - 1)
+    db.commit()
+    print(f"🗑️ Dropped archive range {number} ({table.name})")
+
+
+def all_events(db: Session, game_ids: Optional[List[int]] = None):
+    """
+    Hot and archived events as one subquery with the event columns, for
+    whole-history aggregates (stats, standings rebuilds). With game_ids the
+    filter is applied inside each side of the union.
+    """
+    hot = Event.__table__
+    query = select(*(hot.c[name] for name in EVENT_COLUMNS))
+    if game_ids is not None:
+        query = query.where(hot.c.game_id.in_(game_ids))
+    if has_archive(db.connection()):
+        archived = select(*(archived_events.c[name] for name in EVENT_COLUMNS))
+        if game_ids is not None:
+            archived = archived.where(archived_events.c.game_id.in_(game_ids))
+        query = union_all(query, archived)
+    return query.subquery()
+
+
+def with_history(db: Session, game: models.Game):
+    """
+    A game with its event history loaded from wherever it is stored: the
+    ORM row itself, or a copy holding its archived events.
+    """
+    if game.archived_at is None:
+        return game
+    rows = db.execute(
+        select(*(archived_events.c[name] for name in EVENT_COLUMNS))
+        .where(archived_events.c.game_id == game.id)
+        .order_by(archived_events.c.created_at, archived_events.c.id)
+    )
+    return LiveGame(game, [LiveEvent(*row) for row in rows])
+
+
+def archive_games(db: Session, game_ids: List[int]) -> int:
+    """Move the events of finished games to the archive in one transaction. Returns events moved."""
+    conn = db.connection()
+    hot = Event.__table__
+    by_range: Dict[int, List[int]] = {}
+    for game_id in game_ids:
+        by_range.setdefault(range_number(game_id), []).append(game_id)
+    for number, ids in by_range.items():
+        ensure_range(conn, number)
+        table = range_table(number)
+        conn.execute(insert(table).from_select(
+            list(EVENT_COLUMNS),
+            select(*(hot.c[name] for name in EVENT_COLUMNS)).where(hot.c.game_id.in_(ids)),
+        ))
+    moved = conn.execute(delete(hot).where(hot.c.game_id.in_(game_ids))).rowcount
+    conn.execute(
+        update(Game.__table__)
+        .where(Game.id.in_(game_ids), Game.status == models.GameStatus.FINISHED)
+        .values(archived_at=datetime.utcnow())
+    )
+    db.commit()
+    return moved
+
+
+def plan_batches(counts: Iterable, batch_events: int) -> List[List[int]]:
+    """
+    Group (game_id, event count) pairs into batches of whole games holding
+    at most batch_events events; a larger game gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for game_id, count in counts:
+        if current and size + count > batch_events:
+            batches.append(current)
+            current, size = [], 0
+        current.append(game_id)
+        size += count
+    if current:
+        batches.append(current)
+    return batches
+
+
+def archive_finished(
+    db: Session,
+    before: datetime,
+    batch_events: int = ARCHIVE_BATCH_EVENTS,
+    pause_ms: float = ARCHIVE_BATCH_PAUSE_MS,
+    scan_games: int = 1000,
+) -> dict:
+    """
+    Archive every finished game that started before `before`, scanning
+    scan_games candidates at a time. Returns totals for the run.
+    """
+    start = time.perf_counter()
+    totals = {"games": 0, "events": 0, "batches": 0}
+    while True:
+        counts = (
+            db.query(Game.id, func.count(Event.id))
+            .outerjoin(Event, Event.game_id == Game.id)
+            .filter(
+                Game.status == models.GameStatus.FINISHED,
+                Game.archived_at.is_(None),
+                Game.start_time < before,
+            )
+            .group_by(Game.id)
+            .order_by(Game.id)
+            .limit(scan_games)
+            .all()
+        )
+        db.rollback()  # end the read transaction before writing
+        if not counts:
+            break
+        for batch in plan_batches(counts, batch_events):
+            totals["events"] += archive_games(db, batch)
+            totals["games"] += len(batch)
+            totals["batches"] += 1
+            # Let live writers in between batches
+            time.sleep(pause_ms / 1000.0)
+    totals["seconds"] = round(time.perf_counter() - start, 3)
+    if totals["games"]:
+        print(f"🗄️ Archived {totals['events']} events of {totals['games']} games "
+              f"in {totals['batches']} batches ({totals['seconds']} s)")
+    return totals
+
+
+async def run_periodically(session_factory, after_days: float = ARCHIVE_AFTER_DAYS,
+                           interval: float = ARCHIVE_INTERVAL_SECONDS):
+    """Background retention job: archive old finished games every `interval` seconds."""
+    loop = asyncio.get_running_loop()
+
+    def archive_once():
+        db = session_factory()
+        try:
+            return archive_finished(db, datetime.utcnow() - timedelta(days=after_days))
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await loop.run_in_executor(None, archive_once)
+        except Exception as e:
+            print(f"❌ Archiving failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old finished games out of play_by_play_events.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Archive finished games older than --days")
+    run.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS or 180.0)
+    run.add_argument("--batch-events", type=int, default=ARCHIVE_BATCH_EVENTS)
+    commands.add_parser("ranges", help="List archive ranges and their event counts")
+    drop = commands.add_parser("drop-range", help="Delete an archive range and its events")
+    drop.add_argument("number", type=int)
+    args = parser.parse_args()
+
+    from app.database import new_session
+
+    db = new_session()
+    try:
+        if args.command == "run":
+            archive_finished(db, datetime.utcnow() - timedelta(days=args.days), args.batch_events)
+        elif args.command == "ranges":
+            for number in range_numbers(db.connection()):
+                count = db.execute(select(func.count()).select_from(range_table(number))).scalar()
+                low = number * ARCHIVE_RANGE_GAMES
+                print(f"{number}\tgames {low}-{low + ARCHIVE_RANGE_GAMES - 1}\t{count} events")
+        else:
+            drop_range(db, args.number)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
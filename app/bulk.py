@@ -0,0 +1,432 @@
+"""
+Streaming bulk import and export of sports, games and events.
+
+Both directions use the same line-oriented records, as NDJSON or CSV (one
+column per field), each with a `type`:
+
+    {"type": "sport", "name": "Soccer", "slug": "soccer"}
+    {"type": "game", "ref": "g1", "sport": "soccer", "team_a_name": "Lions", "team_b_name": "Tigers"}
+    {"type": "event", "game": "g1", "team": "A", "minute": 12, "description": "Goal", "points": 1}
+
+Games name their sport by slug (`sport`) or `sport_id`. Events name their
+game by the `ref` it was given earlier in the same import, or by `game_id`
+for a game already in the database. An export is a valid import: each game's
+id is its ref.
+
+Imports parse the request body as it arrives, validate each record with the
+same rules as the single-record endpoints, and write IMPORT_BATCH_ROWS
+records per transaction with multi-row INSERTs. Duplicate checks are one
+query per batch. Bad records are skipped and reported by line number.
+Exports stream rows with yield_per (a server-side cursor on PostgreSQL).
+Either way memory holds one batch, plus one ref -> id entry per imported game.
+
+Caches of existing games that get events are invalidated in this process
+only. Behind the game-affinity router (app/router.py) the import lands on an
+arbitrary worker, so live games should get their events through
+POST /games/{game_id}/events instead.
+"""
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+import codecs
+import csv
+import io
+import json
+import os
+import time
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas, search, standings
+from app.archive import all_events
+from app.cache import finished_games
+from app.connections import json_default
+from app.live_state import live_games
+from app.scheduler import kickoffs
+from app.stats import game_stats
+
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "1000"))
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+# Skipped records beyond this are counted but not listed
+IMPORT_MAX_ERRORS = 100
+
+FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_FIELDS = (
+    "type", "ref", "name", "slug", "sport", "sport_id", "team_a_name", "team_b_name", "status",
+    "start_time", "game", "game_id", "team", "minute", "description", "points", "created_at",
+)
+RECORD_SCHEMAS = {"sport": schemas.SportCreate, "game": schemas.GameImport, "event": schemas.EventImport}
+
+Sport = models.Sport
+Game = models.Game
+Event = models.PlayByPlayEvent
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Text lines of a streamed UTF-8 body (a leading BOM is dropped)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+        if len(pending) > IMPORT_MAX_LINE_BYTES:
+            raise ValueError(f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    """(line number, dict or the exception parsing it) per non-blank line."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Record is not a JSON object")
+        except ValueError as e:
+            record = e
+        yield number, record
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    """(line number, dict) per CSV row after the header; empty cells are omitted."""
+    header: Optional[List[str]] = None
+    number, start, buffer = 0, 0, []
+    async for line in lines:
+        number += 1
+        if not buffer:
+            start = number
+        buffer.append(line)
+        text = "\n".join(buffer)
+        if text.count('"') % 2:
+            # A quoted field continues on the next line
+            if len(text) > IMPORT_MAX_LINE_BYTES:
+                raise ValueError(f"Record at line {start} longer than {IMPORT_MAX_LINE_BYTES} bytes")
+            continue
+        buffer = []
+        if not text.strip():
+            continue
+        row = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in row]
+            if "type" not in header:
+                raise ValueError("CSV header has no `type` column")
+            continue
+        yield start, {name: value for name, value in zip(header, row) if value != ""}
+    if buffer:
+        raise ValueError(f"Unterminated quoted field in record at line {start}")
+
+
+def records_for(content_type: Optional[str]):
+    """Record parser for a request's Content-Type (NDJSON unless it says CSV)."""
+    return csv_records if content_type and "csv" in content_type else ndjson_records
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}"
+            for item in error.errors()
+        )
+    return str(error)
+
+
+class Importer:
+    """
+    Validates records one at a time and writes them in batches of
+    `batch_rows`, sports first, then games, then events, one transaction per
+    batch. Call `add` for each record, `flush` whenever it returns True, and
+    `finish` at the end.
+    """
+
+    def __init__(self, db: Session, batch_rows: int = IMPORT_BATCH_ROWS, max_errors: int = IMPORT_MAX_ERRORS):
+        self.db = db
+        self.batch_rows = batch_rows
+        self.max_errors = max_errors
+        self.counts = {"sports": 0, "games": 0, "events": 0}
+        self.batches = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self._batch: List[Tuple[int, str, object]] = []
+        self._sports: Dict[str, int] = {}  # slug -> id
+        self._sport_ids: Set[int] = set()
+        self._games: Dict[str, int] = {}  # ref -> id
+        self._standings: Set[int] = set()  # sports with imported finished games
+        self._start = time.perf_counter()
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def add(self, line: int, record) -> bool:
+        """Validate one record and queue it. Returns True when a batch is ready to flush."""
+        try:
+            if isinstance(record, Exception):
+                raise record
+            kind = record.get("type")
+            schema = RECORD_SCHEMAS.get(kind) if isinstance(kind, str) else None
+            if schema is None:
+                raise ValueError(f"Unknown record type {kind!r}; expected one of {', '.join(RECORD_SCHEMAS)}")
+            self._batch.append((line, kind, schema(**record)))
+        except ValueError as e:
+            self.fail(line, _describe(e))
+        return len(self._batch) >= self.batch_rows
+
+    def flush(self):
+        """Write the queued records in one transaction."""
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        sports = [(line, record) for line, kind, record in batch if kind == "sport"]
+        games = [(line, record) for line, kind, record in batch if kind == "game"]
+        events = [(line, record) for line, kind, record in batch if kind == "event"]
+        known_slugs, known_refs = set(self._sports), set(self._games)
+        try:
+            created_sports = self._insert_sports(sports)
+            created_games, scheduled, finished_sports = self._insert_games(games)
+            created_events, existing_games = self._insert_events(events)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for slug in set(self._sports) - known_slugs:
+                self._sport_ids.discard(self._sports.pop(slug))
+            for ref in set(self._games) - known_refs:
+                del self._games[ref]
+            print(f"❌ Import batch of lines {batch[0][0]}-{batch[-1][0]} failed: {e}")
+            for line, _, _ in batch:
+                self.fail(line, f"Batch not written: {e}")
+            return
+
+        self.batches += 1
+        self.counts["sports"] += created_sports
+        self.counts["games"] += created_games
+        self.counts["events"] += created_events
+        self._standings |= finished_sports
+        if kickoffs.running:
+            for game_id, start_time in scheduled:
+                kickoffs.add(game_id, start_time)
+        # Cached copies of games that got events are out of date
+        for game_id in existing_games:
+            finished_games.discard(game_id)
+            if game_id in live_games:
+                live_games.evict(game_id)
+        rebuilt = [game_id for game_id in existing_games if game_stats.get(game_id) is not None]
+        if rebuilt:
+            game_stats.rebuild(self.db, rebuilt)
+
+    def _insert_sports(self, records) -> int:
+        if not records:
+            return 0
+        existing = self.db.execute(
+            select(Sport.id, Sport.name, Sport.slug).where(or_(
+                Sport.slug.in_({sport.slug for _, sport in records}),
+                Sport.name.in_({sport.name for _, sport in records}),
+            ))
+        ).all()
+        by_slug = {slug: (sport_id, name) for sport_id, name, slug in existing}
+        names = {name for _, name, _ in existing}
+        rows = []
+        for line, sport in records:
+            if by_slug.get(sport.slug, (None, None))[1] == sport.name:
+                # Already there (e.g. importing an export): reuse it
+                sport_id = by_slug[sport.slug][0]
+                self._sports[sport.slug] = sport_id
+                self._sport_ids.add(sport_id)
+            elif sport.slug in by_slug or sport.name in names:
+                self.fail(line, "Sport with this name or slug already exists")
+            else:
+                rows.append(sport.dict())
+                by_slug[sport.slug] = (None, sport.name)
+                names.add(sport.name)
+        if rows:
+            ids = self.db.execute(
+                insert(Sport.__table__).returning(Sport.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+            for row, sport_id in zip(rows, ids):
+                self._sports[row["slug"]] = sport_id
+                self._sport_ids.add(sport_id)
+        return len(rows)
+
+    def _resolve_sports(self, records):
+        """Look up the sports a batch of games names that are not known yet."""
+        slugs = {game.sport for _, game in records if game.sport and game.sport not in self._sports}
+        ids = {game.sport_id for _, game in records if game.sport_id and game.sport_id not in self._sport_ids}
+        if slugs or ids:
+            for sport_id, slug in self.db.execute(
+                select(Sport.id, Sport.slug).where(or_(Sport.slug.in_(slugs), Sport.id.in_(ids)))
+            ):
+                self._sports[slug] = sport_id
+                self._sport_ids.add(sport_id)
+
+    def _insert_games(self, records):
+        if not records:
+            return 0, [], set()
+        self._resolve_sports(records)
+        now = datetime.utcnow()
+        rows, refs = [], []
+        for line, game in records:
+            sport_id = self._sports.get(game.sport) if game.sport else game.sport_id
+            if sport_id is None or sport_id not in self._sport_ids:
+                self.fail(line, "Sport not found" if game.sport or game.sport_id else "Game needs sport or sport_id")
+                continue
+            if game.ref is not None and (game.ref in self._games or game.ref in refs):
+                self.fail(line, f"Duplicate game ref {game.ref!r}")
+                continue
+            rows.append({
+                "sport_id": sport_id,
+                "team_a_name": game.team_a_name,
+                "team_b_name": game.team_b_name,
+                "status": game.status or models.GameStatus.SCHEDULED,
+                "start_time": game.start_time or now,
+            })
+            refs.append(game.ref)
+        if not rows:
+            return 0, [], set()
+        ids = self.db.execute(
+            insert(Game.__table__).returning(Game.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        scheduled, finished_sports = [], set()
+        for row, ref, game_id in zip(rows, refs, ids):
+            if ref is not None:
+                self._games[ref] = game_id
+            if row["status"] == models.GameStatus.SCHEDULED:
+                scheduled.append((game_id, row["start_time"]))
+            elif row["status"] == models.GameStatus.FINISHED:
+                finished_sports.add(row["sport_id"])
+        return len(rows), scheduled, finished_sports
+
+    def _insert_events(self, records):
+        if not records:
+            return 0, set()
+        # Events for games already in the database follow POST /games/{id}/events
+        targets = {event.game_id for _, event in records if event.game is None and event.game_id is not None}
+        statuses = dict(self.db.execute(select(Game.id, Game.status).where(Game.id.in_(targets))).all()) \
+            if targets else {}
+        now = datetime.utcnow()
+        rows, existing_games = [], set()
+        for line, event in records:
+            if event.game is not None:
+                game_id = self._games.get(event.game)
+                if game_id is None:
+                    self.fail(line, f"Unknown game ref {event.game!r}")
+                    continue
+            elif event.game_id is not None:
+                game_id = event.game_id
+                status = statuses.get(game_id)
+                if status is None:
+                    self.fail(line, "Game not found")
+                    continue
+                if status == models.GameStatus.FINISHED:
+                    self.fail(line, "Game is finished")
+                    continue
+                existing_games.add(game_id)
+            else:
+                self.fail(line, "Event needs game or game_id")
+                continue
+            rows.append({
+                "game_id": game_id,
+                "team": event.team,
+                "minute": event.minute,
+                "description": event.description,
+                "points": event.points,
+                "created_at": event.created_at or now,
+                "source_event_id": event.source_event_id,
+            })
+        if not rows:
+            return 0, set()
+        ids = self.db.execute(
+            insert(Event.__table__).returning(Event.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        search.index_events(self.db, ids)
+        return len(rows), existing_games
+
+    def finish(self) -> dict:
+        """Write the last batch and update standings for imported results."""
+        self.flush()
+        for sport_id in sorted(self._standings):
+            standings.rebuild(self.db, sport_id)
+        result = self.result()
+        print(f"📥 Imported {result['sports']} sports, {result['games']} games, {result['events']} events "
+              f"in {result['batches']} batches ({time.perf_counter() - self._start:.1f} s, "
+              f"{result['failed']} records skipped)")
+        return result
+
+    def result(self) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {**self.counts, "batches": self.batches, "failed": self.failed, "errors": errors}
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def export_records(db: Session, sport_id: Optional[int] = None, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[dict]:
+    """
+    Every sport, game and event (archived ones included) as import records:
+    sports, then games, then events, streamed `batch_rows` rows at a time.
+    """
+    sports = select(Sport.name, Sport.slug).order_by(Sport.id)
+    games = (
+        select(Game.id, Sport.slug, Game.team_a_name, Game.team_b_name, Game.status, Game.start_time)
+        .join(Sport, Sport.id == Game.sport_id)
+        .order_by(Game.id)
+    )
+    events = all_events(db).c
+    event_rows = select(
+        events.game_id, events.team, events.minute, events.description, events.points, events.created_at
+    )
+    if sport_id is not None:
+        sports = sports.where(Sport.id == sport_id)
+        games = games.where(Game.sport_id == sport_id)
+        event_rows = event_rows.where(events.game_id.in_(select(Game.id).where(Game.sport_id == sport_id)))
+
+    for name, slug in db.execute(sports):
+        yield {"type": "sport", "name": name, "slug": slug}
+    for game_id, slug, team_a, team_b, status, start_time in db.execute(
+        games.execution_options(yield_per=batch_rows)
+    ):
+        yield {
+            "type": "game", "ref": str(game_id), "sport": slug, "team_a_name": team_a,
+            "team_b_name": team_b, "status": status.value, "start_time": _iso(start_time),
+        }
+    for game_id, team, minute, description, points, created_at in db.execute(
+        event_rows.execution_options(yield_per=batch_rows)
+    ):
+        yield {
+            "type": "event", "game": str(game_id), "team": team.value, "minute": minute,
+            "description": description, "points": points, "created_at": _iso(created_at),
+        }
+
+
+def export_stream(db: Session, sport_id: Optional[int] = None, format: str = "ndjson",
+                  batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """An export encoded as NDJSON or CSV, yielded in chunks of `batch_rows` records."""
+    buffer = io.StringIO()
+    if format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        write = lambda record: buffer.write(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=json_default) + "\n"
+        )
+    pending = 0
+    for record in export_records(db, sport_id, batch_rows):
+        write(record)
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
@@ -0,0 +1,229 @@
+"""
+In-process caches of serialized game-state bodies.
+
+Finished games keep their serialized body for good. Live games are cached
+per state version. Either body is compressed at most once per encoding, and
+the compressed variants are kept in a separate byte-bounded LRU.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import gzip
+import os
+import time
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Finished games never change, so their responses may be cached for a year.
+FINISHED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LIVE_CACHE_CONTROL = "no-cache"
+
+
+class ImmutableGameCache:
+    """Bounded LRU of serialized GET /games/{game_id} bodies for finished games."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, game_id: int) -> Optional[bytes]:
+        """Return the cached body for a game, or None."""
+        with self._lock:
+            body = self._entries.get(game_id)
+            if body is not None:
+                self._entries.move_to_end(game_id)
+            return body
+
+    def put(self, game_id: int, body: bytes):
+        """Store a finished game's body, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[game_id] = body
+            self._entries.move_to_end(game_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, game_id: int):
+        """Drop a game's body if cached."""
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+    def clear(self):
+        """Drop every cached body."""
+        with self._lock:
+            self._entries.clear()
+
+    def game_ids(self) -> List[int]:
+        """Ids of every game with a cached body."""
+        return list(self._entries.keys())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+finished_games = ImmutableGameCache(int(os.getenv("FINISHED_GAME_CACHE_SIZE", "1024")))
+
+
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a body with a supported content encoding."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def choose_encoding(accept_encoding: Optional[str], encodings=ENCODINGS) -> Optional[str]:
+    """Best supported encoding allowed by an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class BodyVariantCache:
+    """
+    Byte-bounded LRU of serialized bodies and their compressed variants.
+
+    Entries are keyed by (game_id, version, encoding); storing a newer
+    version of a game drops the variants of its older versions.
+    """
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_BYTES, min_bytes: int = COMPRESSION_MIN_BYTES):
+        self.max_bytes = max_bytes
+        self.min_bytes = min_bytes
+        self._entries: "OrderedDict[Tuple[int, Hashable, str], bytes]" = OrderedDict()
+        self._games: Dict[int, Tuple[Hashable, Set[Tuple[int, Hashable, str]]]] = {}
+        self._size = 0
+        self._lock = Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compressions = 0
+        self.compress_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get(self, game_id: int, version: Hashable, encoding: str) -> Optional[bytes]:
+        """Return a cached variant, or None."""
+        key = (game_id, version, encoding)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, game_id: int, version: Hashable, encoding: str, data: bytes):
+        """Store a variant, dropping older versions of the game and evicting to fit."""
+        key = (game_id, version, encoding)
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            current = self._games.get(game_id)
+            if current is not None and current[0] != version:
+                for old in current[1]:
+                    self._size -= len(self._entries.pop(old, b""))
+                current = None
+            if current is None:
+                current = self._games[game_id] = (version, set())
+            if key in self._entries:
+                self._size -= len(self._entries[key])
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            current[1].add(key)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                old, old_data = self._entries.popitem(last=False)
+                self._size -= len(old_data)
+                self.evictions += 1
+                game = self._games.get(old[0])
+                if game is not None:
+                    game[1].discard(old)
+                    if not game[1]:
+                        del self._games[old[0]]
+
+    def variant(self, game_id: int, version: Hashable, body: bytes, encoding: str) -> bytes:
+        """A body compressed with `encoding`, compressing it on first use only."""
+        data = self.get(game_id, version, encoding)
+        if data is None:
+            start = time.perf_counter()
+            data = compress(body, encoding)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.compressions += 1
+                self.compress_seconds += elapsed
+                self.bytes_in += len(body)
+                self.bytes_out += len(data)
+            self.put(game_id, version, encoding, data)
+        return data
+
+    def stats(self) -> dict:
+        """Size and effectiveness counters."""
+        return {
+            "encodings": list(ENCODINGS),
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "compressions": self.compressions,
+            "compress_ms": round(self.compress_seconds * 1000, 3),
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+        }
+
+    def discard(self, game_id: int):
+        """Drop every cached variant of a game."""
+        with self._lock:
+            game = self._games.pop(game_id, None)
+            if game is not None:
+                for key in game[1]:
+                    self._size -= len(self._entries.pop(key, b""))
+
+    def game_ids(self) -> List[int]:
+        """Ids of every game with cached variants."""
+        return list(self._games.keys())
+
+    def clear(self):
+        """Drop every cached variant."""
+        with self._lock:
+            self._entries.clear()
+            self._games.clear()
+            self._size = 0
+
+
+game_bodies = BodyVariantCache()
@@ -0,0 +1,458 @@
+"""
+Subscription registry and fan-out for live game updates.
+
+WebSocket clients and Server-Sent Events streams subscribe to a game through
+the same ConnectionManager. Each subscription is a slotted ConnectionRecord
+held in a per-game dict keyed by subscriber, so connects and disconnects are
+O(1) however large the audience. Each broadcast message is encoded once and
+the same bytes are delivered to every subscriber.
+
+Under bursts, events for a popular game can be coalesced: they are held for
+a short window and sent as one `event_batch` message, so the number of
+fan-outs per second stays within BROADCAST_FANOUT_BUDGET sends.
+"""
+from fastapi import WebSocket
+from typing import Callable, Dict, List, Optional, Union
+from datetime import datetime
+import asyncio
+import heapq
+import json
+import os
+import sys
+import time
+
+from app.tracing import tracer
+
+SSE_QUEUE_SIZE = 256
+
+# Coalescing is off unless a maximum window is configured
+BROADCAST_COALESCE_MAX_MS = float(os.getenv("BROADCAST_COALESCE_MAX_MS", "0"))
+BROADCAST_COALESCE_MAX_BATCH = int(os.getenv("BROADCAST_COALESCE_MAX_BATCH", "50"))
+# Per-game sends per second (subscribers x broadcasts) allowed before coalescing starts
+BROADCAST_FANOUT_BUDGET = float(os.getenv("BROADCAST_FANOUT_BUDGET", "50000"))
+# Smoothing factor for the per-game event rate estimate
+RATE_EWMA_ALPHA = 0.3
+
+
+def json_default(value):
+    """JSON encoder fallback for payload values."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class EncodedMessage:
+    """A broadcast message encoded once for every transport."""
+    __slots__ = ("text", "size", "event_id", "kind", "_sse")
+
+    def __init__(self, message: dict):
+        self.text = json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=json_default)
+        self.size = len(self.text.encode())
+        self.kind = message.get("type", "event")
+        # Only new events advance a client's resume position
+        self.event_id = None
+        if self.kind == "event":
+            self.event_id = message.get("event_id")
+        elif self.kind == "event_batch":
+            # Batches resume from their last event
+            self.event_id = message["events"][-1].get("event_id")
+        self._sse: Optional[str] = None
+
+    @property
+    def sse(self) -> str:
+        """Server-Sent Events frame, built on first use."""
+        if self._sse is None:
+            self._sse = sse_frame(self.text, self.kind, self.event_id)
+        return self._sse
+
+
+def sse_frame(data: str, kind: str = "event", event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Events frame."""
+    frame = f"event: {kind}\n"
+    if event_id is not None:
+        frame = f"id: {event_id}\n" + frame
+    return frame + f"data: {data}\n\n"
+
+
+def sse_unseen(frame: str, seen: Callable[[int], bool]) -> Optional[str]:
+    """
+    A queued Server-Sent Events frame without the events a client already
+    has (`seen(event_id)`), or None if nothing is left. A batch that
+    straddles the client's position is re-encoded with its remaining events.
+    """
+    if not frame.startswith("id: "):
+        return frame
+    id_line, kind_line, data_line, _ = frame.split("\n", 3)
+    if kind_line != "event: event_batch":
+        return None if seen(int(id_line[len("id: "):])) else frame
+    message = json.loads(data_line[len("data: "):])
+    events = [event for event in message["events"] if not seen(event["event_id"])]
+    if not events:
+        return None
+    if len(events) == len(message["events"]):
+        return frame
+    message["events"] = events
+    return EncodedMessage(message).sse
+
+
+class StreamSubscriber:
+    """
+    A Server-Sent Events subscriber: a bounded queue of pre-encoded frames.
+    A client that falls SSE_QUEUE_SIZE frames behind is disconnected.
+    """
+    __slots__ = ("queue", "loop", "closed")
+
+    def __init__(self, max_queue: int = SSE_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    def _put(self, frame: Optional[str]):
+        if frame is None:
+            # End of stream; make room so the sentinel always fits
+            self.closed = True
+            while self.queue.full():
+                self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+    def _call(self, frame: Optional[str]):
+        """Queue a frame from any thread or event loop."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(frame)
+        else:
+            self.loop.call_soon_threadsafe(self._put, frame)
+
+    def push(self, frame: str):
+        """Queue a frame; raises if the client is too far behind."""
+        if self.closed:
+            raise RuntimeError("Stream closed")
+        if self.queue.full():
+            raise RuntimeError("Stream queue full")
+        self._call(frame)
+
+    def close(self):
+        """End the stream after the frames already queued."""
+        if not self.closed:
+            self._call(None)
+
+
+Subscriber = Union[WebSocket, StreamSubscriber]
+
+
+class ConnectionRecord:
+    """One subscription: the subscriber plus its metadata and counters."""
+    __slots__ = (
+        "subscriber", "game_id", "transport", "client",
+        "connected_at", "messages_sent", "bytes_sent", "last_event_id",
+    )
+
+    def __init__(self, subscriber: Subscriber, game_id: int, client: Optional[str] = None):
+        self.subscriber = subscriber
+        self.game_id = game_id
+        self.transport = "sse" if isinstance(subscriber, StreamSubscriber) else "websocket"
+        self.client = client
+        self.connected_at = time.time()
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.last_event_id: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "game_id": self.game_id,
+            "transport": self.transport,
+            "client": self.client,
+            "connected_at": self.connected_at,
+            "messages_sent": self.messages_sent,
+            "bytes_sent": self.bytes_sent,
+            "last_event_id": self.last_event_id,
+        }
+
+
+class _GameRate:
+    """Exponentially weighted events-per-second estimate for one game."""
+    __slots__ = ("last", "rate")
+
+    def __init__(self):
+        self.last: Optional[float] = None
+        self.rate = 0.0
+
+    def update(self, now: float) -> float:
+        if self.last is None:
+            self.last = now
+            return self.rate
+        interval = max(now - self.last, 1e-3)
+        self.last = now
+        self.rate = RATE_EWMA_ALPHA * (1.0 / interval) + (1 - RATE_EWMA_ALPHA) * self.rate
+        return self.rate
+
+
+class _PendingBatch:
+    """Events held for one game's coalescing window."""
+    __slots__ = ("messages", "timer", "since")
+
+    def __init__(self):
+        self.messages: List[dict] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.since = time.monotonic()
+
+
+class ConnectionManager:
+    """Manages WebSocket and event-stream subscriptions per game."""
+
+    def __init__(
+        self,
+        coalesce_max_ms: float = BROADCAST_COALESCE_MAX_MS,
+        coalesce_max_batch: int = BROADCAST_COALESCE_MAX_BATCH,
+        fanout_budget: float = BROADCAST_FANOUT_BUDGET,
+    ):
+        # game_id -> {subscriber: ConnectionRecord}, in connection order
+        self.active_connections: Dict[int, Dict[Subscriber, ConnectionRecord]] = {}
+        self.total_connections = 0
+        self.coalesce_max_ms = coalesce_max_ms
+        self.coalesce_max_batch = coalesce_max_batch
+        self.fanout_budget = fanout_budget
+        self._seq: Dict[int, int] = {}
+        self._rates: Dict[int, _GameRate] = {}
+        self._pending: Dict[int, _PendingBatch] = {}
+        self._flush_tasks = set()
+
+    async def connect(self, websocket: WebSocket, game_id: int):
+        """Connect a client to a game's WebSocket."""
+        await websocket.accept()
+        self.subscribe(websocket, game_id, websocket.client.host if websocket.client else None)
+        print(f"✅ WebSocket client connected for game {game_id}")
+
+    def subscribe(self, subscriber: Subscriber, game_id: int, client: Optional[str] = None) -> ConnectionRecord:
+        """Register an already-accepted subscriber for a game."""
+        connections = self.active_connections.get(game_id)
+        if connections is None:
+            connections = self.active_connections[game_id] = {}
+        record = connections[subscriber] = ConnectionRecord(subscriber, game_id, client)
+        self.total_connections += 1
+        print(f"   Total connections for game {game_id}: {len(connections)}")
+        return record
+
+    def disconnect(self, websocket: Subscriber, game_id: int):
+        """Disconnect a client from a game's WebSocket."""
+        connections = self.active_connections.get(game_id)
+        if connections is None:
+            return
+        if connections.pop(websocket, None) is not None:
+            self.total_connections -= 1
+            print(f"🔌 Client disconnected from game {game_id}")
+        if not connections:
+            del self.active_connections[game_id]
+            print(f"   No more connections for game {game_id}")
+        else:
+            print(f"   Remaining connections for game {game_id}: {len(connections)}")
+
+    def prepare(self, game_id: int):
+        """Create a game's broadcast state (sequence, rate estimate) ahead of its first event."""
+        self._seq.setdefault(game_id, 0)
+        if game_id not in self._rates:
+            self._rates[game_id] = _GameRate()
+
+    def records(self) -> List[ConnectionRecord]:
+        """Every subscription, across all games."""
+        return [record for connections in list(self.active_connections.values()) for record in connections.values()]
+
+    async def close_connection(self, record: ConnectionRecord, code: int, reason: str, frame: Optional[str] = None):
+        """Close one subscriber; event-stream subscribers get `frame` first."""
+        self.disconnect(record.subscriber, record.game_id)
+        try:
+            if record.transport == "sse":
+                if frame is not None and not record.subscriber.queue.full():
+                    record.subscriber.push(frame)
+                record.subscriber.close()
+            else:
+                await record.subscriber.close(code=code, reason=reason)
+        except Exception as e:
+            print(f"❌ Failed to close client for game {record.game_id}: {e}")
+
+    def top_games(self, limit: int = 10) -> List[dict]:
+        """The games with the largest audiences, largest first."""
+        top = heapq.nlargest(
+            limit, self.active_connections.items(), key=lambda item: len(item[1])
+        )
+        games = []
+        for game_id, connections in top:
+            records = list(connections.values())
+            sse = sum(1 for record in records if record.transport == "sse")
+            games.append({
+                "game_id": game_id,
+                "connections": len(records),
+                "websocket": len(records) - sse,
+                "sse": sse,
+                "messages_sent": sum(record.messages_sent for record in records),
+                "bytes_sent": sum(record.bytes_sent for record in records),
+            })
+        return games
+
+    def memory_usage(self) -> dict:
+        """
+        Approximate registry memory, in bytes. Covers the per-game dicts and
+        connection records, not the sockets themselves.
+        """
+        total = sys.getsizeof(self.active_connections)
+        for connections in list(self.active_connections.values()):
+            total += sys.getsizeof(connections)
+            for record in list(connections.values()):
+                total += sys.getsizeof(record)
+        return {
+            "connections": self.total_connections,
+            "bytes": total,
+            "bytes_per_connection": total // self.total_connections if self.total_connections else 0,
+        }
+
+    def coalesce_window(self, game_id: int, rate: float) -> float:
+        """
+        Coalescing window in seconds for a game's next event.
+        Zero while subscribers x event rate fits the fan-out budget; above
+        it, long enough that subscribers / window stays within budget.
+        """
+        if self.coalesce_max_ms <= 0:
+            return 0.0
+        subscribers = len(self.active_connections.get(game_id, ()))
+        if subscribers * rate <= self.fanout_budget:
+            return 0.0
+        return min(self.coalesce_max_ms / 1000.0, subscribers / self.fanout_budget)
+
+    async def broadcast_event(self, game_id: int, message: dict):
+        """
+        Broadcast a play-by-play event with the game's next sequence number,
+        coalescing it with other events when the game is under load.
+        """
+        seq = self._seq.get(game_id, 0) + 1
+        self._seq[game_id] = seq
+        message["seq"] = seq
+
+        now = time.monotonic()
+        game_rate = self._rates.get(game_id)
+        if game_rate is None:
+            game_rate = self._rates[game_id] = _GameRate()
+        window = self.coalesce_window(game_id, game_rate.update(now))
+
+        pending = self._pending.get(game_id)
+        if window <= 0 and pending is None:
+            await self.broadcast(game_id, message)
+            return
+
+        if pending is None:
+            pending = self._pending[game_id] = _PendingBatch()
+            loop = asyncio.get_running_loop()
+            pending.timer = loop.call_later(window, self._schedule_flush, game_id)
+        pending.messages.append(message)
+        if len(pending.messages) >= self.coalesce_max_batch:
+            await self.flush(game_id)
+
+    def _schedule_flush(self, game_id: int):
+        task = asyncio.get_running_loop().create_task(self.flush(game_id))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self, game_id: int):
+        """Send a game's coalesced events now, as one ordered batch."""
+        pending = self._pending.pop(game_id, None)
+        if pending is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+        # Joins the trace of the request that opened the window
+        with tracer.span("ws.coalesced_flush", **{
+            "game_id": game_id,
+            "ws.coalesced": len(pending.messages),
+            "ws.held_ms": round((time.monotonic() - pending.since) * 1000, 3),
+        }):
+            if len(pending.messages) == 1:
+                await self.broadcast(game_id, pending.messages[0])
+            elif pending.messages:
+                await self.broadcast(game_id, {
+                    "type": "event_batch",
+                    "game_id": game_id,
+                    "events": pending.messages,
+                })
+
+    async def flush_all(self):
+        """Send every game's coalesced events."""
+        for game_id in list(self._pending):
+            await self.flush(game_id)
+
+    async def broadcast(self, game_id: int, message: dict):
+        """Broadcast a message to all connected clients for a game."""
+        if game_id in self._pending:
+            # Keep ordering: held events go out before anything newer
+            await self.flush(game_id)
+        if game_id not in self.active_connections:
+            print(f"📭 No active connections for game {game_id}")
+            return
+
+        with tracer.span("ws.fanout", **{"game_id": game_id}) as span:
+            encoded = EncodedMessage(message)
+            records = list(self.active_connections[game_id].values())
+            # Per-send timings only for traced broadcasts: sends are sequential,
+            # so one slow socket delays everyone after it
+            clock = time.perf_counter if span is not None else None
+            slowest = 0.0
+
+            disconnected = []
+            for record in records:
+                connection = record.subscriber
+                started = clock() if clock else 0.0
+                try:
+                    if record.transport == "sse":
+                        connection.push(encoded.sse)
+                    else:
+                        await connection.send_text(encoded.text)
+                except Exception as e:
+                    print(f"❌ Failed to send to client of game {game_id}: {e}")
+                    disconnected.append(connection)
+                    continue
+                if clock:
+                    slowest = max(slowest, clock() - started)
+                record.messages_sent += 1
+                record.bytes_sent += encoded.size
+                if encoded.event_id is not None:
+                    record.last_event_id = encoded.event_id
+
+            if span is not None:
+                span.set(**{
+                    "ws.subscribers": len(records),
+                    "ws.failed": len(disconnected),
+                    "ws.bytes": encoded.size,
+                    "ws.slowest_send_ms": round(slowest * 1000, 3),
+                })
+
+        for conn in disconnected:
+            self.disconnect(conn, game_id)
+            if isinstance(conn, StreamSubscriber):
+                conn.close()
+
+        print(f"📡 Broadcast to {len(records) - len(disconnected)} clients of game {game_id}"
+              f" (disconnected: {len(disconnected)})")
+
+    async def close_game(self, game_id: int, code: int = 1000, reason: str = ""):
+        """Close every client subscribed to a game."""
+        await self.flush(game_id)
+        self._seq.pop(game_id, None)
+        self._rates.pop(game_id, None)
+        connections = self.active_connections.pop(game_id, {})
+        self.total_connections -= len(connections)
+        for connection in connections:
+            try:
+                if isinstance(connection, StreamSubscriber):
+                    connection.close()
+                else:
+                    await connection.close(code=code, reason=reason)
+            except Exception as e:
+                print(f"❌ Failed to close client for game {game_id}: {e}")
+        if connections:
+            print(f"🔒 Closed {len(connections)} connections for game {game_id}: {reason}")
+
+
+manager = ConnectionManager()
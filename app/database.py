@@ -1,43 +1,105 @@
 """
 Database configuration and session management.
+
+The engine and session factory are built lazily on first use, so importing
+the application never opens a connection or creates a database file.
+Schema changes are managed by Alembic (see migrations/).
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
 import os
 
 # Use SQLite for development, PostgreSQL for production
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./scoreboard.db")
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=False
-    )
-else:
-    engine = create_engine(DATABASE_URL, echo=False)
+# Alembic revision this code expects. Bump it together with every new migration.
+SCHEMA_VERSION = "0007"
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Tables created by their own DDL rather than from the models: the events
+# archive (app/archive.py) and the search index (app/search.py)
+UNMANAGED_TABLE_PREFIXES = ("play_by_play_events_archive", "event_search")
 
 Base = declarative_base()
 
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+
+
+def get_engine() -> Engine:
+    """Return the application engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        if DATABASE_URL.startswith("sqlite"):
+            _engine = create_engine(
+                DATABASE_URL,
+                connect_args={"check_same_thread": False},
+                echo=False
+            )
+        else:
+            _engine = create_engine(DATABASE_URL, echo=False)
+    return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    """Return the session factory, creating it on first use."""
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _session_factory
+
+
+def new_session(**kwargs) -> Session:
+    """Open a new session on the application database."""
+    return get_session_factory()(**kwargs)
+
 
 def get_db():
     """
     Database dependency for FastAPI.
     Yields a database session.
     """
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
     finally:
         db.close()
 
 
+def get_schema_version(engine: Engine) -> Optional[str]:
+    """Return the Alembic revision recorded in the database, or None."""
+    if not inspect(engine).has_table("alembic_version"):
+        return None
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def verify_schema(engine: Optional[Engine] = None):
+    """
+    Check that the database is migrated to SCHEMA_VERSION.
+    Raises RuntimeError if it is not; migrations are never run from here.
+    """
+    version = get_schema_version(engine or get_engine())
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at revision {version}, expected {SCHEMA_VERSION}. "
+            f"Run `alembic upgrade head`."
+        )
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Schema comparison filter (Alembic `include_name`) skipping unmanaged tables."""
+    return not (type_ == "table" and name.startswith(UNMANAGED_TABLE_PREFIXES))
+
+
 def init_db():
     """
-    Initialize database tables.
+    Initialize database tables without migrations (tests and scratch databases).
     """
-    Base.metadata.create_all(bind=engine)
+    from app.search import create_index
 
+    Base.metadata.create_all(bind=get_engine())
+    with get_engine().begin() as conn:
+        create_index(conn)
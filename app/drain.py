@@ -0,0 +1,119 @@
+"""
+Graceful drain of live connections before shutdown.
+
+On SIGTERM (or POST /admin/drain) the instance stops accepting new
+subscribers, flushes coalesced broadcasts and then closes its existing
+connections in waves. WebSocket clients are closed with DRAIN_CLOSE_CODE
+and a reason carrying a randomized reconnect delay and the id of the last
+event they received; Server-Sent Events clients get an equivalent `drain`
+frame. Reconnects therefore reach the next instance as a ramp, not a spike.
+"""
+from typing import Optional
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import threading
+
+from app.admission import retry_reason
+from app.connections import ConnectionManager, ConnectionRecord, manager, sse_frame
+
+# Application close code: server going away, reconnect after the given delay
+DRAIN_CLOSE_CODE = 4000
+DRAIN_WAVES = int(os.getenv("DRAIN_WAVES", "10"))
+DRAIN_WAVE_INTERVAL_MS = float(os.getenv("DRAIN_WAVE_INTERVAL_MS", "500"))
+# Reconnect delays are spread uniformly over this window
+DRAIN_RECONNECT_SPREAD_MS = int(os.getenv("DRAIN_RECONNECT_SPREAD_MS", "10000"))
+
+
+def drain_reason(retry_after_ms: int, last_event_id: Optional[int]) -> str:
+    """Close reason: the retry delay, plus the last delivered event id when known."""
+    reason = retry_reason(retry_after_ms)
+    if last_event_id is not None:
+        reason += f";last_event_id={last_event_id}"
+    return reason
+
+
+class DrainController:
+    """Stops admissions and closes a ConnectionManager's subscribers in waves."""
+
+    def __init__(
+        self,
+        registry: ConnectionManager,
+        waves: int = DRAIN_WAVES,
+        wave_interval_ms: float = DRAIN_WAVE_INTERVAL_MS,
+        spread_ms: int = DRAIN_RECONNECT_SPREAD_MS,
+    ):
+        self.registry = registry
+        self.waves = max(1, waves)
+        self.wave_interval = wave_interval_ms / 1000.0
+        self.spread_ms = spread_ms
+        self.draining = False
+        self.closed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def retry_after_ms(self) -> int:
+        """Randomized reconnect delay for one client."""
+        return random.randint(0, self.spread_ms)
+
+    def start(self, exit_when_done: bool = False) -> bool:
+        """Begin draining in the background. Returns False if already draining."""
+        if self.draining:
+            return False
+        self.draining = True
+        self._task = asyncio.get_running_loop().create_task(self.drain(exit_when_done))
+        return True
+
+    async def drain(self, exit_when_done: bool = False):
+        """Flush pending broadcasts, then close every connection in waves."""
+        self.draining = True
+        await self.registry.flush_all()
+
+        records = self.registry.records()
+        random.shuffle(records)
+        per_wave = max(1, math.ceil(len(records) / self.waves))
+        print(f"🚰 Draining {len(records)} connections in waves of {per_wave}")
+
+        for start in range(0, len(records), per_wave):
+            if start:
+                await asyncio.sleep(self.wave_interval)
+            for record in records[start:start + per_wave]:
+                await self._close(record)
+        print(f"🚰 Drain complete ({self.closed} connections closed)")
+
+        if exit_when_done:
+            # Hand over to the server's own graceful shutdown (uvicorn handles SIGINT)
+            os.kill(os.getpid(), signal.SIGINT)
+
+    async def _close(self, record: ConnectionRecord):
+        retry_after_ms = self.retry_after_ms()
+        frame = (
+            f"retry: {retry_after_ms}\n"
+            + sse_frame(json.dumps({"retry_after_ms": retry_after_ms, "last_event_id": record.last_event_id}), "drain")
+        )
+        await self.registry.close_connection(
+            record, DRAIN_CLOSE_CODE, drain_reason(retry_after_ms, record.last_event_id), frame
+        )
+        self.closed += 1
+
+    def install_signal_handler(self):
+        """Drain on SIGTERM instead of dropping every socket at once (main thread only)."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.start, True)
+        except (NotImplementedError, RuntimeError):
+            return
+        print("🚰 SIGTERM will drain connections before shutdown")
+
+    def reset(self):
+        """Leave drain mode."""
+        self.draining = False
+        self.closed = 0
+        self._task = None
+
+
+drainer = DrainController(manager)
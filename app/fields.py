@@ -0,0 +1,64 @@
+"""
+Sparse fieldsets and columnar list views.
+
+`?fields=` selects which attributes a response carries. The selection is
+pushed into SQL as a column list, so projected reads load tuples rather than
+ORM entities. `?format=columnar` turns a list into one array per field,
+which avoids repeating keys on every row of long event histories.
+"""
+from typing import Iterable, List, Optional, Sequence
+import json
+
+from app import models
+from app.archive import archived_events
+from app.connections import json_default
+
+GAME_FIELDS = ("id", "sport_id", "team_a_name", "team_b_name", "status", "start_time", "created_at")
+EVENT_FIELDS = ("id", "game_id", "team", "minute", "description", "points", "created_at")
+LIST_FORMATS = ("objects", "columnar")
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated field list, keeping request order.
+    Returns None when no selection was given; raises ValueError on unknown fields.
+    """
+    if value is None:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+
+def columns(model, fields: Iterable[str]) -> list:
+    """Mapped columns of a model for the given field names."""
+    return [getattr(model, name) for name in fields]
+
+
+def shape(rows: Iterable, fields: Sequence[str], columnar: bool = False):
+    """
+    Rows (query rows, objects with those attributes or dicts) as a list of
+    dicts, or as one list per field when columnar.
+    """
+    rows = list(rows)
+    get = (lambda row, name: row[name]) if rows and isinstance(rows[0], dict) else getattr
+    if columnar:
+        return {name: [get(row, name) for row in rows] for name in fields}
+    return [{name: get(row, name) for name in fields} for row in rows]
+
+
+def encode(payload) -> bytes:
+    """Compact JSON body for a projected response."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=json_default).encode()
+
+
+def game_events_query(db, game_id: int, fields: Sequence[str], archived: bool = False):
+    """Selected event columns of one game, in history order, from the archive if it was moved there."""
+    Event = archived_events.c if archived else models.PlayByPlayEvent
+    return (
+        db.query(*columns(Event, fields))
+        .filter(Event.game_id == game_id)
+        .order_by(Event.created_at, Event.id)
+    )
@@ -0,0 +1,76 @@
+"""
+Deduplication of retried event posts.
+
+Feed clients retry `POST /games/{game_id}/events` on timeouts. An event may
+carry the provider's id (`source_event_id`, or an `Idempotency-Key`
+header); it is stored on the row under a unique (game_id, source_event_id)
+index. Replays are answered with the original event, without a write, a
+broadcast or any aggregate update. Recently seen keys are kept in a bounded
+LRU with the event's response, so a retry storm is served from memory.
+Keys that have fallen out of it (or were written by another worker) are
+caught by the unique index.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+import os
+
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "50000"))
+IDEMPOTENCY_KEY_MAX_CHARS = 128
+
+RESPONSE_FIELDS = ("id", "game_id", "team", "minute", "description", "points", "created_at")
+
+
+def event_response(event) -> dict:
+    """The fields of an event's EventResponse, as kept for replays."""
+    return {name: getattr(event, name) for name in RESPONSE_FIELDS}
+
+
+class RecentKeys:
+    """Bounded LRU of (game_id, key) -> response of the event the key created."""
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, str], dict]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, game_id: int, key: str) -> Optional[dict]:
+        """The response stored for a key, or None."""
+        with self._lock:
+            response = self._entries.get((game_id, key))
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((game_id, key))
+            self.hits += 1
+            return response
+
+    def put(self, game_id: int, key: str, response: dict):
+        """Remember a key's event, evicting the least recently used key."""
+        with self._lock:
+            self._entries[(game_id, key)] = response
+            self._entries.move_to_end((game_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, game_id: int, key: Optional[str]):
+        """Forget a key (its event was corrected or removed)."""
+        if key is None:
+            return
+        with self._lock:
+            self._entries.pop((game_id, key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"keys": len(self._entries), "max_keys": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+recent_keys = RecentKeys()
@@ -0,0 +1,145 @@
+"""
+Group-commit batching for play-by-play event inserts.
+
+Concurrent event creations are queued and written together in one
+transaction, so a burst of N events costs one commit instead of N.
+"""
+import asyncio
+import os
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import models, search
+from app.tracing import tracer
+
+# Batching is off unless a window is configured
+INGEST_BATCH_WINDOW_MS = float(os.getenv("INGEST_BATCH_WINDOW_MS", "0"))
+INGEST_BATCH_MAX_EVENTS = int(os.getenv("INGEST_BATCH_MAX_EVENTS", "100"))
+
+
+class EventBatcher:
+    """
+    Collects event inserts for up to `window_ms` (or `max_events` events)
+    and flushes them in a single transaction. Each caller gets back its own
+    persisted event with the id and timestamp assigned by that flush.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[..., Session],
+        window_ms: float = 5.0,
+        max_events: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000.0
+        self.max_events = max_events
+        self.batches_flushed = 0
+        self.events_flushed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._tasks = set()
+
+    def _bind_loop(self):
+        """Bind queue primitives to the running loop (rebinding if it changed)."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._flush_lock = asyncio.Lock()
+            self._tasks = set()
+        return loop
+
+    async def submit(self, **values) -> models.PlayByPlayEvent:
+        """Queue one event for the next flush and wait for it to be committed."""
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._pending.append((values, future))
+
+        if len(self._pending) >= self.max_events:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+
+        with tracer.span("ingest.batch_wait"):
+            return await future
+
+    def _schedule_flush(self):
+        """Start flushing whatever is pending."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = self._loop.create_task(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        """Write one batch; only one batch is written at a time."""
+        # Traced as part of whichever request opened (or filled) the batch
+        with tracer.span("ingest.flush", **{"ingest.events": len(batch)}):
+            async with self._flush_lock:
+                results = await run_in_threadpool(self._write, [values for values, _ in batch])
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _write(self, batch: List[dict]) -> List[object]:
+        """
+        Insert a batch in one transaction. If the transaction fails, fall
+        back to one transaction per event so only the bad rows fail.
+        """
+        session = self.session_factory(expire_on_commit=False)
+        try:
+            events = [models.PlayByPlayEvent(**values) for values in batch]
+            session.add_all(events)
+            session.flush()
+            search.index_events(session, [event.id for event in events])
+            session.commit()
+            self.batches_flushed += 1
+            self.events_flushed += len(events)
+            print(f"💾 Flushed {len(events)} events in one commit")
+            return events
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Batch of {len(batch)} events failed ({e}), retrying one by one")
+        finally:
+            session.close()
+
+        results: List[object] = []
+        for values in batch:
+            session = self.session_factory(expire_on_commit=False)
+            try:
+                event = models.PlayByPlayEvent(**values)
+                session.add(event)
+                session.flush()
+                search.index_events(session, [event.id])
+                session.commit()
+                self.batches_flushed += 1
+                self.events_flushed += 1
+                results.append(event)
+            except Exception as e:
+                session.rollback()
+                results.append(e)
+            finally:
+                session.close()
+        return results
+
+    async def close(self):
+        """Flush anything still pending."""
+        if self._loop is None or self._loop is not asyncio.get_running_loop():
+            return
+        self._schedule_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
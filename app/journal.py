@@ -0,0 +1,298 @@
+"""
+Append-only journal of live-game state for warm restarts.
+
+The live-state store writes through to a local journal: a snapshot of each
+game when it is loaded, then every event, correction, status change and
+eviction. Records are length- and CRC-framed JSON in numbered segment files.
+On startup the segments are read through mmap, finished and evicted games
+are compacted away, and the remaining games are checked against the
+database with one aggregate query before going back into the store, so a
+restart during live play does not reload every game from play_by_play_events.
+
+The database stays the source of truth: a game whose journal copy does not
+match it (a torn tail, writes from another process) is dropped from the
+journal and loads from the database as before. Records are flushed to the
+OS on every write but not fsynced. Each worker process needs its own
+directory.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, List, Optional
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.live_state import LiveEvent, LiveGame, LiveGameStore
+
+# Journaling is off unless a directory is configured
+EVENT_JOURNAL_DIR = os.getenv("EVENT_JOURNAL_DIR", "")
+EVENT_JOURNAL_SEGMENT_BYTES = int(os.getenv("EVENT_JOURNAL_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+# Sealed segments allowed to accumulate before they are compacted into one
+EVENT_JOURNAL_MAX_SEGMENTS = int(os.getenv("EVENT_JOURNAL_MAX_SEGMENTS", "4"))
+
+# Record frame: payload length and CRC32, then the JSON payload
+HEADER = struct.Struct("<II")
+SEGMENT_NAME = "journal-{:08d}.log"
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def encode_event(event: LiveEvent) -> list:
+    """Compact journal form of an event."""
+    return [
+        event.id, event.game_id, event.team.value, event.minute,
+        event.description, event.points, _timestamp(event.created_at),
+    ]
+
+
+def decode_event(row: list) -> LiveEvent:
+    """Live-state event from its journal form."""
+    id, game_id, team, minute, description, points, created_at = row
+    return LiveEvent(
+        id, game_id, models.TeamSide(team), minute, description, points, _parse_timestamp(created_at)
+    )
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """Records of one segment, read through mmap; stops at a torn or corrupt tail."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + HEADER.size <= size:
+                length, crc = HEADER.unpack_from(data, offset)
+                start = offset + HEADER.size
+                end = start + length
+                if end > size:
+                    break
+                payload = data[start:end]
+                if zlib.crc32(payload) != crc:
+                    print(f"⚠️ Corrupt journal record in {path} at offset {offset}, ignoring the rest")
+                    break
+                yield json.loads(payload)
+                offset = end
+
+
+def replay(paths: Iterable[str]) -> Dict[int, dict]:
+    """
+    Fold segment records into per-game state: game_id -> {"game": snapshot
+    fields, "events": [encoded events]}. Evicted games are dropped.
+    """
+    games: Dict[int, dict] = {}
+    for path in paths:
+        for record in read_segment(path):
+            kind = record["t"]
+            if kind == "game":
+                games[record["id"]] = {"game": record, "events": record.pop("events")}
+                continue
+            entry = games.get(record["game_id"])
+            if entry is None:
+                continue
+            events = entry["events"]
+            if kind == "event":
+                events.append(record["event"])
+            elif kind == "update":
+                event_id = record["event"][0]
+                for index in range(len(events) - 1, -1, -1):
+                    if events[index][0] == event_id:
+                        events[index] = record["event"]
+                        break
+            elif kind == "remove":
+                entry["events"] = [event for event in events if event[0] != record["event_id"]]
+            elif kind == "status":
+                entry["game"]["status"] = record["status"]
+            elif kind == "evict":
+                del games[record["game_id"]]
+    return games
+
+
+class EventJournal:
+    """Segmented append-only journal written through by LiveGameStore."""
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = EVENT_JOURNAL_SEGMENT_BYTES,
+        max_segments: int = EVENT_JOURNAL_MAX_SEGMENTS,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._file = None
+        self._number = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, SEGMENT_NAME.format(number))
+
+    def segments(self) -> List[str]:
+        """Segment files, oldest first."""
+        return sorted(glob.glob(os.path.join(self.directory, SEGMENT_NAME.replace("{:08d}", "*"))))
+
+    def open(self) -> Dict[int, dict]:
+        """
+        Replay every segment, compact the result into a fresh segment and
+        start appending to it. Returns the journaled state of unfinished games.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        paths = self.segments()
+        games = replay(paths)
+        number = int(os.path.basename(paths[-1])[8:16]) + 1 if paths else 1
+        self._write_snapshot(self._path(number), games)
+        for path in paths:
+            os.remove(path)
+        with self._lock:
+            self._number = number
+            self._file = open(self._path(number), "ab")
+            self._size = self._file.tell()
+        return games
+
+    def close(self):
+        """Stop journaling and wait for any running compaction."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def _write_snapshot(self, path: str, games: Dict[int, dict]):
+        """Write one game record per game to path, atomically."""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            for entry in games.values():
+                f.write(self._frame({**entry["game"], "events": entry["events"]}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _frame(record: dict) -> bytes:
+        payload = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode()
+        return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _append(self, record: dict):
+        frame = self._frame(record)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(frame)
+            self._file.flush()
+            self._size += len(frame)
+            if self._size >= self.segment_bytes:
+                self._roll()
+
+    def _roll(self):
+        """Seal the active segment and start the next one (lock held)."""
+        self._file.close()
+        self._number += 1
+        self._file = open(self._path(self._number), "ab")
+        self._size = 0
+        sealed = self.segments()[:-1]
+        running = self._compaction is not None and self._compaction.is_alive()
+        if len(sealed) >= self.max_segments and not running:
+            self._compaction = threading.Thread(target=self.compact, args=(sealed,), daemon=True)
+            self._compaction.start()
+
+    def compact(self, paths: List[str]):
+        """Fold sealed segments into the last of them, dropping finished and evicted games."""
+        start = time.perf_counter()
+        games = replay(paths)
+        self._write_snapshot(paths[-1], games)
+        for path in paths[:-1]:
+            os.remove(path)
+        print(f"🗜️ Compacted {len(paths)} journal segments to {len(games)} games "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Write-through hooks called by LiveGameStore
+
+    def record_game(self, game: LiveGame):
+        self._append({
+            "t": "game",
+            "id": game.id,
+            "sport_id": game.sport_id,
+            "team_a_name": game.team_a_name,
+            "team_b_name": game.team_b_name,
+            "status": game.status.value,
+            "start_time": _timestamp(game.start_time),
+            "created_at": _timestamp(game.created_at),
+            "events": [encode_event(event) for event in game.events],
+        })
+
+    def record_event(self, event: LiveEvent):
+        self._append({"t": "event", "game_id": event.game_id, "event": encode_event(event)})
+
+    def record_update(self, event: LiveEvent):
+        self._append({"t": "update", "game_id": event.game_id, "event": encode_event(event)})
+
+    def record_remove(self, game_id: int, event_id: int):
+        self._append({"t": "remove", "game_id": game_id, "event_id": event_id})
+
+    def record_status(self, game_id: int, status: models.GameStatus):
+        self._append({"t": "status", "game_id": game_id, "status": status.value})
+
+    def record_evict(self, game_id: int):
+        self._append({"t": "evict", "game_id": game_id})
+
+
+def restore_live_games(journal: EventJournal, store: LiveGameStore, db: Session) -> int:
+    """
+    Open the journal and put every journaled game that still matches the
+    database back into the store. Returns the number of games restored.
+    """
+    start = time.perf_counter()
+    games = journal.open()
+    if not games:
+        return 0
+
+    Event = models.PlayByPlayEvent
+    rows = (
+        db.query(models.Game.id, models.Game.status, func.count(Event.id), func.max(Event.id))
+        .outerjoin(Event, Event.game_id == models.Game.id)
+        .filter(models.Game.id.in_(list(games)))
+        .group_by(models.Game.id, models.Game.status)
+    )
+    restored = set()
+    for game_id, status, count, max_id in rows:
+        entry = games[game_id]
+        events = entry["events"]
+        last_id = max(event[0] for event in events) if events else None
+        if status == models.GameStatus.FINISHED or count != len(events) or max_id != last_id:
+            continue
+        fields = entry["game"]
+        game = SimpleNamespace(
+            id=game_id,
+            sport_id=fields["sport_id"],
+            team_a_name=fields["team_a_name"],
+            team_b_name=fields["team_b_name"],
+            status=status,
+            start_time=_parse_timestamp(fields["start_time"]),
+            created_at=_parse_timestamp(fields["created_at"]),
+        )
+        store.restore(LiveGame(game, [decode_event(event) for event in sorted(events)]))
+        restored.add(game_id)
+
+    for game_id in games.keys() - restored:
+        journal.record_evict(game_id)
+    print(f"♻️ Restored {len(restored)} of {len(games)} journaled games "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return len(restored)
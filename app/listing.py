@@ -0,0 +1,157 @@
+"""
+Game listings: status filters, keyset pages and embedded live scores.
+
+A sport page lists games with `?status=Live&include=score,last_event`
+instead of fetching each game. The page, every game's score and its most
+recently recorded event come from one statement: the page of game ids as a
+CTE, events aggregated per game for those ids only, and the last event
+joined by id. Pages are keyed on game id (`after_id`), so deep pages cost
+the same as the first. Archived games (app/archive.py) get their scores
+from the archive in a second query, only when the page holds any.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.archive import archived_events
+
+INCLUDES = ("score", "last_event")
+LAST_EVENT_FIELDS = ("id", "team", "minute", "description", "points", "created_at")
+
+Game = models.Game
+Event = models.PlayByPlayEvent
+
+
+def parse_statuses(value: Optional[str]) -> Optional[List[models.GameStatus]]:
+    """
+    Parse a comma-separated status filter by name or value, any case
+    (`LIVE`, `Live`). Returns None when no filter was given; raises
+    ValueError on unknown statuses.
+    """
+    if value is None:
+        return None
+    statuses = []
+    for name in filter(None, (part.strip().lower() for part in value.split(","))):
+        status = next((s for s in models.GameStatus if name in (s.name.lower(), s.value.lower())), None)
+        if status is None:
+            allowed = ", ".join(s.value for s in models.GameStatus)
+            raise ValueError(f"Unknown status: {name}. Allowed: {allowed}")
+        statuses.append(status)
+    if not statuses:
+        raise ValueError("Empty status filter")
+    return statuses
+
+
+def parse_include(value: Optional[str]) -> List[str]:
+    """Parse ?include=; raises ValueError on unknown names."""
+    if value is None:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}. Allowed: {', '.join(INCLUDES)}")
+    return names
+
+
+def games_query(
+    db: Session,
+    sport_id: int,
+    statuses: Optional[Sequence[models.GameStatus]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    entities=(Game,),
+):
+    """A sport's games (or the given columns of them) in id order, filtered and paged."""
+    query = db.query(*entities).filter(Game.sport_id == sport_id)
+    if statuses:
+        query = query.filter(Game.status.in_(statuses))
+    if after_id is not None:
+        query = query.filter(Game.id > after_id)
+    query = query.order_by(Game.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _summary(events, game_ids):
+    """Per game: points of each side and the id of the last recorded event."""
+    return (
+        select(
+            events.c.game_id,
+            func.sum(case((events.c.team == models.TeamSide.A, events.c.points), else_=0)).label("score_a"),
+            func.sum(case((events.c.team == models.TeamSide.B, events.c.points), else_=0)).label("score_b"),
+            func.max(events.c.id).label("last_id"),
+        )
+        .where(events.c.game_id.in_(game_ids))
+        .group_by(events.c.game_id)
+        .subquery()
+    )
+
+
+def _with_summary(events, game_columns, games, game_ids):
+    """Game columns joined with their event summary and last event, starting from `games`."""
+    summary = _summary(events, game_ids)
+    last = events.alias("last_event")
+    return (
+        select(
+            *game_columns,
+            summary.c.score_a,
+            summary.c.score_b,
+            *(last.c[name].label(f"last_{name}") for name in LAST_EVENT_FIELDS),
+        )
+        .select_from(games)
+        .outerjoin(summary, summary.c.game_id == Game.id)
+        .outerjoin(last, last.c.id == summary.c.last_id)
+    )
+
+
+def _extras(row, include: Sequence[str]) -> dict:
+    extras = {}
+    if "score" in include:
+        extras["score"] = {"team_a": int(row.score_a or 0), "team_b": int(row.score_b or 0)}
+    if "last_event" in include:
+        extras["last_event"] = None if row.last_id is None else {
+            name: getattr(row, f"last_{name}") for name in LAST_EVENT_FIELDS
+        }
+    return extras
+
+
+def game_rows(
+    db: Session,
+    sport_id: int,
+    fields: Sequence[str],
+    statuses: Optional[Sequence[models.GameStatus]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    include: Sequence[str] = (),
+) -> List[dict]:
+    """
+    One page of a sport's games as dicts of the selected fields (and id),
+    plus the requested includes, in one statement.
+    """
+    keys = list(dict.fromkeys(["id", *fields]))
+    game_columns = [getattr(Game, name) for name in keys]
+    if not include:
+        rows = games_query(db, sport_id, statuses, after_id, limit, game_columns)
+        return [{name: getattr(row, name) for name in keys} for row in rows]
+
+    # Start from the page so only its games are read
+    page = games_query(db, sport_id, statuses, after_id, limit, [Game.id]).cte("page")
+    games = page.join(Game, Game.id == page.c.id)
+    query = _with_summary(
+        Event.__table__, [*game_columns, Game.archived_at], games, select(page.c.id)
+    ).order_by(page.c.id)
+    rows = db.execute(query).all()
+
+    archived: Dict[int, object] = {}
+    archived_ids = [row.id for row in rows if row.archived_at is not None]
+    if archived_ids:
+        query = _with_summary(archived_events, [Game.id], Game, archived_ids).where(Game.id.in_(archived_ids))
+        archived = {row.id: row for row in db.execute(query)}
+
+    return [
+        {**{name: getattr(row, name) for name in keys}, **_extras(archived.get(row.id, row), include)}
+        for row in rows
+    ]
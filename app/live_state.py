@@ -0,0 +1,238 @@
+"""
+In-memory state for live games.
+
+Live games are a small, very hot subset of the games table. Their metadata
+and event history are kept here in slotted records so reads of a live game
+(GET /games/{game_id}, the WebSocket handshake, create_event's existence
+check) never touch the database. Changes can be written through to an
+EventJournal (app/journal.py) so a restart does not start cold.
+"""
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+import itertools
+import os
+import sys
+import time
+
+from app import models
+
+LIVE_STATE_IDLE_SECONDS = float(os.getenv("LIVE_STATE_IDLE_SECONDS", "600"))
+LIVE_STATE_SWEEP_SECONDS = 30.0
+
+
+class LiveEvent:
+    """Compact copy of a PlayByPlayEvent row."""
+    __slots__ = ("id", "game_id", "team", "minute", "description", "points", "created_at")
+
+    def __init__(self, id, game_id, team, minute, description, points, created_at):
+        self.id = id
+        self.game_id = game_id
+        self.team = team
+        self.minute = minute
+        self.description = description
+        self.points = points
+        self.created_at = created_at
+
+    @classmethod
+    def from_model(cls, event: models.PlayByPlayEvent) -> "LiveEvent":
+        return cls(
+            event.id, event.game_id, event.team, event.minute,
+            event.description, event.points, event.created_at,
+        )
+
+
+class LiveGame:
+    """Compact copy of a Game row and its event history."""
+    __slots__ = (
+        "id", "sport_id", "team_a_name", "team_b_name", "status",
+        "start_time", "created_at", "events", "last_access", "version",
+    )
+
+    def __init__(self, game: models.Game, events: List[LiveEvent]):
+        self.id = game.id
+        self.sport_id = game.sport_id
+        self.team_a_name = game.team_a_name
+        self.team_b_name = game.team_b_name
+        self.status = game.status
+        self.start_time = game.start_time
+        self.created_at = game.created_at
+        self.events = events
+        self.last_access = time.monotonic()
+        # Changes on every write; identifies cached serializations of this state
+        self.version = 0
+
+
+class LiveGameStore:
+    """
+    Write-through store of live games.
+
+    Games are loaded when they go LIVE or get their first subscriber, updated
+    by create_event, and evicted when they finish or sit idle without
+    subscribers for `idle_seconds`.
+    """
+
+    def __init__(self, idle_seconds: float = LIVE_STATE_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        # Games with subscribers are never evicted for idleness
+        self.is_active: Callable[[int], bool] = lambda game_id: False
+        # Optional EventJournal receiving every change
+        self.journal = None
+        self._games: Dict[int, LiveGame] = {}
+        self._lock = Lock()
+        # Versions are unique across games and reloads
+        self._versions = itertools.count(1)
+        self._last_sweep = time.monotonic()
+
+    def get(self, game_id: int) -> Optional[LiveGame]:
+        """Return a loaded game, or None."""
+        self._maybe_sweep()
+        game = self._games.get(game_id)
+        if game is not None:
+            game.last_access = time.monotonic()
+        return game
+
+    def load_game(self, game: models.Game) -> LiveGame:
+        """Load a game (and its events) from an ORM row, replacing any existing copy."""
+        events = [LiveEvent.from_model(event) for event in game.events]
+        live_game = LiveGame(game, events)
+        live_game.version = next(self._versions)
+        with self._lock:
+            self._games[game.id] = live_game
+        if self.journal is not None:
+            self.journal.record_game(live_game)
+        print(f"🔥 Loaded game {game.id} into live state ({len(events)} events)")
+        return live_game
+
+    def restore(self, live_game: LiveGame):
+        """Add a game rebuilt from the journal."""
+        live_game.version = next(self._versions)
+        with self._lock:
+            self._games[live_game.id] = live_game
+
+    def append_event(self, event: models.PlayByPlayEvent):
+        """Write-through a newly committed event, if its game is loaded."""
+        game = self._games.get(event.game_id)
+        if game is None:
+            return
+        live_event = LiveEvent.from_model(event)
+        with self._lock:
+            game.events.append(live_event)
+            game.last_access = time.monotonic()
+            game.version = next(self._versions)
+        if self.journal is not None:
+            self.journal.record_event(live_event)
+
+    def _find(self, game: LiveGame, event_id: int) -> int:
+        """Index of an event in a game's history, or -1 (corrections are usually recent)."""
+        events = game.events
+        for index in range(len(events) - 1, -1, -1):
+            if events[index].id == event_id:
+                return index
+        return -1
+
+    def update_event(self, event: models.PlayByPlayEvent):
+        """Patch a corrected event in place, if its game is loaded."""
+        game = self._games.get(event.game_id)
+        if game is None:
+            return
+        live_event = LiveEvent.from_model(event)
+        with self._lock:
+            index = self._find(game, event.id)
+            if index < 0:
+                return
+            game.events[index] = live_event
+            game.version = next(self._versions)
+        if self.journal is not None:
+            self.journal.record_update(live_event)
+
+    def remove_event(self, game_id: int, event_id: int):
+        """Drop a deleted event, if its game is loaded."""
+        game = self._games.get(game_id)
+        if game is None:
+            return
+        with self._lock:
+            index = self._find(game, event_id)
+            if index < 0:
+                return
+            del game.events[index]
+            game.version = next(self._versions)
+        if self.journal is not None:
+            self.journal.record_remove(game_id, event_id)
+
+    def set_status(self, game_id: int, status: models.GameStatus):
+        """Update a loaded game's status; finished games are evicted."""
+        if status == models.GameStatus.FINISHED:
+            self.evict(game_id)
+            return
+        game = self._games.get(game_id)
+        if game is not None:
+            game.status = status
+            game.version = next(self._versions)
+            if self.journal is not None:
+                self.journal.record_status(game_id, status)
+
+    def evict(self, game_id: int):
+        """Drop a game from the store."""
+        with self._lock:
+            evicted = self._games.pop(game_id, None) is not None
+        if evicted:
+            if self.journal is not None:
+                self.journal.record_evict(game_id)
+            print(f"🧊 Evicted game {game_id} from live state")
+
+    def evict_idle(self, now: Optional[float] = None) -> List[int]:
+        """Evict games without subscribers that have not been read or written recently."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                game_id for game_id, game in self._games.items()
+                if now - game.last_access > self.idle_seconds and not self.is_active(game_id)
+            ]
+            for game_id in idle:
+                del self._games[game_id]
+        if idle:
+            if self.journal is not None:
+                for game_id in idle:
+                    self.journal.record_evict(game_id)
+            print(f"🧊 Evicted idle games from live state: {idle}")
+        return idle
+
+    def _maybe_sweep(self):
+        """Run the idle sweep at most every LIVE_STATE_SWEEP_SECONDS."""
+        now = time.monotonic()
+        if now - self._last_sweep >= LIVE_STATE_SWEEP_SECONDS:
+            self._last_sweep = now
+            self.evict_idle(now)
+
+    def memory_usage(self) -> dict:
+        """Approximate memory held by the store, in bytes."""
+        total = sys.getsizeof(self._games)
+        events = 0
+        for game in list(self._games.values()):
+            total += sys.getsizeof(game)
+            total += sys.getsizeof(game.team_a_name) + sys.getsizeof(game.team_b_name)
+            total += sys.getsizeof(game.events)
+            for event in game.events:
+                total += sys.getsizeof(event) + sys.getsizeof(event.description)
+                total += sys.getsizeof(event.created_at)
+            events += len(game.events)
+        return {
+            "games": len(self._games),
+            "events": events,
+            "bytes": total,
+        }
+
+    def game_ids(self) -> List[int]:
+        """Ids of every loaded game."""
+        return list(self._games.keys())
+
+    def clear(self):
+        """Drop every game."""
+        with self._lock:
+            self._games.clear()
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self._games
+
+
+live_games = LiveGameStore()
@@ -1,101 +1,109 @@
 """
 FastAPI application main file.
 """
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Dict
-import json
-from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
 
-from app.database import get_db, init_db
-from app import models, schemas
+from app.database import get_db, new_session, verify_schema
+from app import bulk, listing, models, schemas, search, standings
+from app.ingest import EventBatcher, INGEST_BATCH_WINDOW_MS, INGEST_BATCH_MAX_EVENTS
+from app.live_state import LiveEvent, live_games
+from app.journal import EventJournal, EVENT_JOURNAL_DIR, restore_live_games
+from app.cache import finished_games, game_bodies, choose_encoding, FINISHED_CACHE_CONTROL, LIVE_CACHE_CONTROL
+from app.admission import admission, origin_allowed, retry_reason, ALLOWED_ORIGINS, RETRY_CLOSE_CODE
+from app.connections import manager, sse_frame, sse_unseen, StreamSubscriber
+from app.notify import notifier
+from app.drain import drainer, drain_reason, DRAIN_CLOSE_CODE
+from app.stats import game_stats
+from app.scheduler import AUTO_START_GAMES, kickoffs
+from app.tracing import tracer, TracingMiddleware
+from app.idempotency import IDEMPOTENCY_KEY_MAX_CHARS, event_response, recent_keys
+from app.router import owner
+from app.archive import ARCHIVE_AFTER_DAYS, run_periodically as run_archiving, with_history
+from app.fields import (
+    EVENT_FIELDS, GAME_FIELDS, columns, encode, game_events_query, parse_fields, shape
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan.
+    Startup only verifies the schema revision; run `alembic upgrade head`
+    to create or migrate tables. With a journal configured, live games are
+    restored from it before serving. With ARCHIVE_AFTER_DAYS set, old
+    finished games are archived in the background; with AUTO_START_GAMES=1,
+    scheduled games are pre-warmed and started at their start_time.
+    With TRACE_FILE or TRACE_OTLP_ENDPOINT set, sampled traces are exported
+    in the background.
+    """
+    verify_schema()
+    tracer.start()
+    if event_journal is not None:
+        db = new_session()
+        try:
+            restore_live_games(event_journal, live_games, db)
+        finally:
+            db.close()
+        live_games.journal = event_journal
+    drainer.install_signal_handler()
+    archiving = (
+        asyncio.get_running_loop().create_task(run_archiving(new_session))
+        if ARCHIVE_AFTER_DAYS > 0 else None
+    )
+    if AUTO_START_GAMES:
+        kickoffs.start()
+    yield
+    kickoffs.stop()
+    if archiving is not None:
+        archiving.cancel()
+    # Flush queued event inserts and coalesced broadcasts before the process exits
+    if event_batcher is not None:
+        await event_batcher.close()
+    await manager.flush_all()
+    if event_journal is not None:
+        live_games.journal = None
+        event_journal.close()
+    tracer.stop()
 
-# Initialize database
-init_db()
 
 # Create FastAPI app
 app = FastAPI(
     title="Real-Time Scoreboard API",
     description="Live play-by-play scoreboard application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "https://micho8cho93.github.io",
-        "https://micho8cho93.github.io/scoreboard_frontend",
-        "https://micho8cho93.github.io/scoreboard_frontend/",
-    ],  # In production, restrict to GitHub Pages domains
+    allow_origins=list(ALLOWED_ORIGINS),  # Shared with the WebSocket handshake
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
-# WebSocket connection manager
-class ConnectionManager:
-    """Manages WebSocket connections per game."""
-    
-    def __init__(self):
-        # game_id -> List[WebSocket]
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, game_id: int):
-        """Connect a client to a game's WebSocket."""
-        await websocket.accept()
-        if game_id not in self.active_connections:
-            self.active_connections[game_id] = []
-        self.active_connections[game_id].append(websocket)
-        connection_count = len(self.active_connections[game_id])
-        print(f"✅ WebSocket client connected for game {game_id}")
-        print(f"   Total connections for this game: {connection_count}")
-        print(f"   All active games: {list(self.active_connections.keys())}")
-    
-    def disconnect(self, websocket: WebSocket, game_id: int):
-        """Disconnect a client from a game's WebSocket."""
-        if game_id in self.active_connections:
-            if websocket in self.active_connections[game_id]:
-                self.active_connections[game_id].remove(websocket)
-                print(f"🔌 Client disconnected from game {game_id}")
-            if not self.active_connections[game_id]:
-                del self.active_connections[game_id]
-                print(f"   No more connections for game {game_id}")
-            else:
-                print(f"   Remaining connections for game {game_id}: {len(self.active_connections[game_id])}")
-    
-    async def broadcast(self, game_id: int, message: dict):
-        """Broadcast a message to all connected clients for a game."""
-        print(f"\n{'='*50}")
-        print(f"BROADCAST ATTEMPT for game {game_id}")
-        print(f"Message: {message}")
-        print(f"Active games: {list(self.active_connections.keys())}")
-        
-        if game_id in self.active_connections:
-            connections = self.active_connections[game_id]
-            print(f"Broadcasting to {len(connections)} clients")
-            
-            disconnected = []
-            for i, connection in enumerate(connections):
-                try:
-                    await connection.send_json(message)
-                    print(f"✅ Sent to client {i+1}/{len(connections)}")
-                except Exception as e:
-                    print(f"❌ Failed to send to client {i+1}: {e}")
-                    disconnected.append(connection)
-            
-            for conn in disconnected:
-                self.disconnect(conn, game_id)
-            
-            print(f"Broadcast complete. Disconnected: {len(disconnected)}")
-        else:
-            print(f"❌ NO ACTIVE CONNECTIONS for game {game_id}")
-            print(f"Available games with connections: {list(self.active_connections.keys())}")
-        print(f"{'='*50}\n")
+live_games.is_active = lambda game_id: (
+    game_id in manager.active_connections or notifier.waiting(game_id) > 0
+    or kickoffs.is_upcoming(game_id)
+)
 
+# Group-commit writer for event inserts (disabled unless INGEST_BATCH_WINDOW_MS is set)
+event_batcher = (
+    EventBatcher(new_session, INGEST_BATCH_WINDOW_MS, INGEST_BATCH_MAX_EVENTS)
+    if INGEST_BATCH_WINDOW_MS > 0 else None
+)
 
-manager = ConnectionManager()
+# Local journal of live-game state for warm restarts (disabled unless EVENT_JOURNAL_DIR is set)
+event_journal = EventJournal(EVENT_JOURNAL_DIR) if EVENT_JOURNAL_DIR else None
 
 
 # REST API Endpoints
@@ -130,19 +138,79 @@ def create_sport(sport: schemas.SportCreate, db: Session = Depends(get_db)):
     return db_sport
 
 
+def requested_fields(value: Optional[str], allowed) -> Optional[List[str]]:
+    """Parse a ?fields= style parameter, rejecting unknown names with 400."""
+    try:
+        return parse_fields(value, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/sports/{sport_id}/games", response_model=List[schemas.GameResponse])
-def get_sport_games(sport_id: int, db: Session = Depends(get_db)):
+def get_sport_games(
+    sport_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated game fields to return"),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="objects or columnar"),
+    status: Optional[str] = Query(None, description="Comma-separated statuses, e.g. Live"),
+    after_id: Optional[int] = Query(None, ge=0, description="Return games after this id (keyset pagination)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size"),
+    include: Optional[str] = Query(None, description="Comma-separated: score, last_event"),
+    db: Session = Depends(get_db)
+):
     """
     GET /sports/{sport_id}/games
-    List games for a sport.
+    List games for a sport in id order. `fields` selects columns in the SQL
+    query itself; `format=columnar` returns one array per field. `status`
+    filters, `after_id`/`limit` page by id (a `Link: rel="next"` header
+    points at the next page), and `include=score,last_event` embeds each
+    game's score and latest event from the same query.
+    """
+    selected = requested_fields(fields, GAME_FIELDS)
+    try:
+        statuses = listing.parse_statuses(status)
+        included = listing.parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    projected = selected is not None or format == "columnar" or bool(included)
+    if not projected:
+        rows = listing.games_query(db, sport_id, statuses, after_id, limit).all()
+        last_id = rows[-1].id if rows else None
+    else:
+        rows = listing.game_rows(db, sport_id, selected or GAME_FIELDS, statuses, after_id, limit, included)
+        last_id = rows[-1]["id"] if rows else None
+    
+    # Verify sport exists (only needed when there is nothing to list)
+    if not rows and db.query(models.Sport.id).filter(models.Sport.id == sport_id).first() is None:
+        raise HTTPException(status_code=404, detail="Sport not found")
+    
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        headers["Link"] = f'<{request.url.include_query_params(after_id=last_id)}>; rel="next"'
+    
+    if not projected:
+        response.headers.update(headers)
+        return rows
+    
+    keys = [*(selected or GAME_FIELDS), *included]
+    return Response(
+        content=encode(shape(rows, keys, format == "columnar")), media_type="application/json", headers=headers
+    )
+
+
+@app.get("/sports/{sport_id}/standings", response_model=List[schemas.StandingResponse])
+def get_sport_standings(sport_id: int, db: Session = Depends(get_db)):
+    """
+    GET /sports/{sport_id}/standings
+    Wins/draws/losses and points for/against per team, from finished games.
     """
-    # Verify sport exists
     sport = db.query(models.Sport).filter(models.Sport.id == sport_id).first()
     if not sport:
         raise HTTPException(status_code=404, detail="Sport not found")
     
-    games = db.query(models.Game).filter(models.Game.sport_id == sport_id).all()
-    return games
+    return standings.get_standings(db, sport_id)
 
 
 @app.post("/games", response_model=schemas.GameResponse, status_code=201)
@@ -156,82 +224,316 @@ def create_game(game: schemas.GameCreate, db: Session = Depends(get_db)):
     if not sport:
         raise HTTPException(status_code=404, detail="Sport not found")
     
-    db_game = models.Game(**game.dict())
+    # Without a start_time the column default (now) applies
+    db_game = models.Game(**game.dict(exclude_none=True))
     db.add(db_game)
     db.commit()
     db.refresh(db_game)
+    # Only the scheduler loop takes entries off its queue
+    if kickoffs.running and db_game.status == models.GameStatus.SCHEDULED:
+        kickoffs.add(db_game.id, db_game.start_time)
     return db_game
 
 
 @app.get("/games/{game_id}", response_model=schemas.GameStateResponse)
-def get_game_state(game_id: int, db: Session = Depends(get_db)):
+def get_game_state(
+    game_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated game fields, `events` included"),
+    event_fields: Optional[str] = Query(None, description="Comma-separated event fields"),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="Event list format"),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     GET /games/{game_id}
     Get game metadata and play-by-play history.
+    Finished games are served from an in-process cache and marked immutable.
+    Cached bodies are sent gzip or brotli compressed per Accept-Encoding,
+    compressing each state version once.
+    `fields`/`event_fields` project the response (and the SQL behind it);
+    `format=columnar` returns events as one array per field.
     """
+    if fields is not None or event_fields is not None or format != "objects":
+        return projected_game_state(
+            db, game_id,
+            requested_fields(fields, GAME_FIELDS + ("events",)) or list(GAME_FIELDS + ("events",)),
+            requested_fields(event_fields, EVENT_FIELDS) or list(EVENT_FIELDS),
+            format == "columnar",
+        )
+    
+    body = finished_games.get(game_id)
+    if body is not None:
+        return game_body_response(game_id, FINAL_VERSION, body, FINISHED_CACHE_CONTROL, accept_encoding)
+    
+    # Live games are served from memory, serialized once per state version
+    live_game = live_games.get(game_id)
+    if live_game is not None:
+        version = live_game.version
+        body = game_bodies.get(game_id, version, "identity")
+        if body is None:
+            body = schemas.GameStateResponse.model_validate(live_game).model_dump_json().encode()
+            game_bodies.put(game_id, version, "identity", body)
+        return game_body_response(game_id, version, body, LIVE_CACHE_CONTROL, accept_encoding)
+    
     game = db.query(models.Game).filter(models.Game.id == game_id).first()
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
+    if game.status == models.GameStatus.FINISHED:
+        body = schemas.GameStateResponse.model_validate(with_history(db, game)).model_dump_json().encode()
+        finished_games.put(game_id, body)
+        return game_body_response(game_id, FINAL_VERSION, body, FINISHED_CACHE_CONTROL, accept_encoding)
+    
     # Events are already loaded via relationship and ordered by created_at
+    response.headers["Cache-Control"] = LIVE_CACHE_CONTROL
     return game
 
 
+# Cache version of a finished game's body, which never changes
+FINAL_VERSION = "final"
+
+
+def game_body_response(
+    game_id: int, version, body: bytes, cache_control: str, accept_encoding: Optional[str]
+) -> Response:
+    """A cached game-state body, using its precompressed variant when the client accepts one."""
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    encoding = choose_encoding(accept_encoding) if len(body) >= game_bodies.min_bytes else None
+    if encoding is not None:
+        body = game_bodies.variant(game_id, version, body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def projected_game_state(
+    db: Session, game_id: int, game_fields: List[str], event_fields: List[str], columnar: bool
+) -> Response:
+    """GET /games/{game_id} restricted to the given fields."""
+    with_events = "events" in game_fields
+    game_fields = [name for name in game_fields if name != "events"]
+    
+    game = live_games.get(game_id)
+    if game is not None:
+        events = game.events
+    else:
+        # Status decides cacheability, so it is always loaded
+        needed = list(dict.fromkeys(game_fields + ["status", "archived_at"]))
+        game = db.query(*columns(models.Game, needed)).filter(models.Game.id == game_id).first()
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        archived = game.archived_at is not None
+        events = game_events_query(db, game_id, event_fields, archived) if with_events else []
+    
+    body = shape([game], game_fields)[0]
+    if with_events:
+        body["events"] = shape(events, event_fields, columnar)
+    cache_control = FINISHED_CACHE_CONTROL if game.status == models.GameStatus.FINISHED else LIVE_CACHE_CONTROL
+    return Response(content=encode(body), media_type="application/json", headers={"Cache-Control": cache_control})
+
+
+@app.patch("/games/{game_id}/status", response_model=schemas.GameResponse)
+async def update_game_status(
+    game_id: int,
+    update: schemas.GameStatusUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    PATCH /games/{game_id}/status
+    Move a game through SCHEDULED -> LIVE -> FINISHED.
+    Finishing a game closes its WebSocket subscriptions.
+    """
+    game = db.query(models.Game).filter(models.Game.id == game_id).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    if update.status not in models.GAME_STATUS_TRANSITIONS[game.status]:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot change status from {game.status.value} to {update.status.value}"
+        )
+    
+    game.status = update.status
+    if game.status == models.GameStatus.FINISHED:
+        # Same transaction as the status change
+        standings.apply_result(db, game)
+    db.commit()
+    db.refresh(game)
+    await announce_status(game)
+    return game
+
+
+async def announce_status(game: models.Game):
+    """Apply a committed status change to live state and tell subscribers."""
+    game_id = game.id
+    print(f"🏁 Game {game_id} is now {game.status.value}")
+    kickoffs.discard(game_id)
+    
+    if game.status == models.GameStatus.LIVE and live_games.get(game_id) is None:
+        live_games.load_game(game)
+    else:
+        # Already loaded (pre-warmed or subscribed to) and kept current by write-through
+        live_games.set_status(game_id, game.status)
+    notifier.notify(game_id)
+    
+    payload = schemas.WebSocketStatusPayload(game_id=game_id, status=game.status.value)
+    await manager.broadcast(game_id, payload.dict())
+    
+    if game.status == models.GameStatus.FINISHED:
+        await manager.close_game(game_id, code=1000, reason="Game finished")
+
+
+def prewarm_game(db: Session, game_id: int):
+    """Load a game about to kick off into memory: live state, stats and broadcast state."""
+    game = db.query(models.Game).filter(
+        models.Game.id == game_id, models.Game.status == models.GameStatus.SCHEDULED
+    ).first()
+    if game is None:
+        return
+    if live_games.get(game_id) is None:
+        live_games.load_game(game)
+    game_stats.get_or_build(db, game_id)
+    manager.prepare(game_id)
+    print(f"♨️ Pre-warmed game {game_id} for kickoff at {game.start_time}")
+
+
+async def kick_off(db: Session, game_id: int) -> bool:
+    """Move a scheduled game to Live at its start time. False if it was no longer scheduled."""
+    started = db.query(models.Game).filter(
+        models.Game.id == game_id, models.Game.status == models.GameStatus.SCHEDULED
+    ).update({models.Game.status: models.GameStatus.LIVE}, synchronize_session=False)
+    db.commit()
+    if not started:
+        return False  # started by hand, or by another worker
+    game = db.query(models.Game).filter(models.Game.id == game_id).first()
+    await announce_status(game)
+    return True
+
+
+kickoffs.prewarm = prewarm_game
+kickoffs.kick_off = kick_off
+
+
+def event_payload(event) -> schemas.WebSocketEventPayload:
+    """Broadcast payload for an event row (ORM or live-state copy)."""
+    return schemas.WebSocketEventPayload(
+        event_id=event.id,
+        game_id=event.game_id,
+        team=event.team.value,
+        minute=event.minute,
+        description=event.description,
+        points=event.points,
+        timestamp=event.created_at
+    )
+
+
 @app.post("/games/{game_id}/events", response_model=schemas.EventResponse, status_code=201)
 async def create_event(
     game_id: int,
     event: schemas.EventCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=IDEMPOTENCY_KEY_MAX_CHARS),
     db: Session = Depends(get_db)
 ):
     """
     POST /games/{game_id}/events
     Create a new play-by-play event.
+    With a `source_event_id` (or an `Idempotency-Key` header), a retry of an
+    event already recorded returns that event with status 200 and
+    `Idempotent-Replayed: true`, without writing or broadcasting it again.
     """
+    source_event_id = event.source_event_id or idempotency_key
+    if event.source_event_id and idempotency_key and event.source_event_id != idempotency_key:
+        raise HTTPException(status_code=400, detail="Idempotency-Key does not match source_event_id")
+    if source_event_id is not None:
+        replayed = recent_keys.get(game_id, source_event_id)
+        if replayed is not None:
+            return replay_event(response, replayed)
+
     print(f"\n{'='*60}")
     print(f"CREATE EVENT CALLED")
     print(f"Game ID: {game_id}")
     print(f"Event data: {event.dict()}")
-    print(f"Current manager state: {dict(manager.active_connections)}")
+    print(f"Current manager state: {manager.total_connections} connections")
     print(f"{'='*60}\n")
     
-    # Verify game exists
-    game = db.query(models.Game).filter(models.Game.id == game_id).first()
+    # Verify game exists (live games are checked in memory)
+    game = live_games.get(game_id)
+    if game is None:
+        game = db.query(models.Game).filter(models.Game.id == game_id).first()
     if not game:
         print(f"❌ Game {game_id} not found in database")
         raise HTTPException(status_code=404, detail="Game not found")
     
     print(f"✅ Game found: {game.team_a_name} vs {game.team_b_name}")
     
+    # Finished games are immutable
+    if game.status == models.GameStatus.FINISHED:
+        print(f"❌ Game {game_id} is finished")
+        raise HTTPException(status_code=409, detail="Game is finished")
+    
     # Validate team is A or B
     if event.team not in [models.TeamSide.A, models.TeamSide.B]:
         print(f"❌ Invalid team: {event.team}")
         raise HTTPException(status_code=400, detail="Team must be A or B")
     
     # Create event
-    db_event = models.PlayByPlayEvent(
-        game_id=game_id,
-        team=event.team,
-        minute=event.minute,
-        description=event.description
-    )
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    with tracer.span("event.write", **{"game_id": game_id}):
+        if event_batcher is not None:
+            # Committed together with other concurrent inserts
+            try:
+                db_event = await event_batcher.submit(
+                    game_id=game_id,
+                    team=event.team,
+                    minute=event.minute,
+                    description=event.description,
+                    points=event.points,
+                    source_event_id=source_event_id
+                )
+            except IntegrityError:
+                if source_event_id is None:
+                    raise
+                return replay_recorded_event(db, response, game_id, source_event_id)
+        else:
+            db_event = models.PlayByPlayEvent(
+                game_id=game_id,
+                team=event.team,
+                minute=event.minute,
+                description=event.description,
+                points=event.points,
+                source_event_id=source_event_id
+            )
+            db.add(db_event)
+            try:
+                db.flush()
+            except IntegrityError:
+                # Recorded before this worker last saw the key
+                db.rollback()
+                if source_event_id is None:
+                    raise
+                return replay_recorded_event(db, response, game_id, source_event_id)
+            search.index_events(db, [db_event.id])
+            db.commit()
+            db.refresh(db_event)
     
     print(f"✅ Event created with ID: {db_event.id}")
+    if source_event_id is not None:
+        recent_keys.put(game_id, source_event_id, event_response(db_event))
+    live_games.append_event(db_event)
+    game_stats.record(db_event)
+    notifier.notify(game_id)
     
     # Broadcast to WebSocket clients
-    payload = schemas.WebSocketEventPayload(
-        event_id=db_event.id,
-        game_id=game_id,
-        team=db_event.team.value,
-        minute=db_event.minute,
-        description=db_event.description,
-        timestamp=db_event.created_at
-    )
+    payload = event_payload(db_event)
+    message = payload.dict()
+    trace_id = tracer.current_trace_id()
+    if trace_id is not None:
+        # Lets a client's delivery delay be looked up in the trace
+        message["trace_id"] = trace_id
     
-    print(f"📡 Broadcasting payload: {payload.dict()}")
-    await manager.broadcast(game_id, payload.dict())
+    print(f"📡 Broadcasting payload: {message}")
+    with tracer.span("event.broadcast", **{"game_id": game_id}):
+        await manager.broadcast_event(game_id, message)
     
     print(f"\n{'='*60}")
     print(f"EVENT CREATION COMPLETE")
@@ -240,111 +542,572 @@ async def create_event(
     return db_event
 
 
+def replay_event(response: Response, recorded: dict) -> dict:
+    """Answer a retried event post with the event it recorded."""
+    print(f"♻️ Event {recorded['id']} of game {recorded['game_id']} replayed")
+    response.status_code = 200
+    response.headers["Idempotent-Replayed"] = "true"
+    return recorded
+
+
+def replay_recorded_event(db: Session, response: Response, game_id: int, source_event_id: str) -> dict:
+    """Replay the event stored under a key the unique index rejected."""
+    db_event = db.query(models.PlayByPlayEvent).filter(
+        models.PlayByPlayEvent.game_id == game_id,
+        models.PlayByPlayEvent.source_event_id == source_event_id
+    ).first()
+    if db_event is None:
+        raise HTTPException(status_code=409, detail="Event could not be recorded")
+    recorded = event_response(db_event)
+    recent_keys.put(game_id, source_event_id, recorded)
+    return replay_event(response, recorded)
+
+
+def get_correctable_event(db: Session, game_id: int, event_id: int) -> models.PlayByPlayEvent:
+    """Load an event for correction; its game must exist and not be finished."""
+    game = live_games.get(game_id)
+    if game is None:
+        game = db.query(models.Game).filter(models.Game.id == game_id).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    # Finished games are immutable (and cached as such)
+    if game.status == models.GameStatus.FINISHED:
+        raise HTTPException(status_code=409, detail="Game is finished")
+    
+    db_event = db.query(models.PlayByPlayEvent).filter(
+        models.PlayByPlayEvent.id == event_id,
+        models.PlayByPlayEvent.game_id == game_id
+    ).first()
+    if not db_event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return db_event
+
+
+@app.patch("/games/{game_id}/events/{event_id}", response_model=schemas.EventResponse)
+async def update_event(
+    game_id: int,
+    event_id: int,
+    update: schemas.EventUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    PATCH /games/{game_id}/events/{event_id}
+    Correct a play-by-play event. Subscribers receive an `event_updated`
+    message with only the changed fields; in-memory state is patched in place.
+    """
+    db_event = get_correctable_event(db, game_id, event_id)
+    
+    old_team, old_minute = db_event.team, db_event.minute
+    changes = {
+        field: value
+        for field, value in update.dict(exclude_unset=True).items()
+        if value is not None and value != getattr(db_event, field)
+    }
+    if not changes:
+        return db_event
+    
+    for field, value in changes.items():
+        setattr(db_event, field, value)
+    if "description" in changes or "team" in changes or "minute" in changes:
+        db.flush()
+        search.reindex_events(db, [event_id])
+    db.commit()
+    db.refresh(db_event)
+    print(f"✏️ Event {event_id} of game {game_id} corrected: {sorted(changes)}")
+    recent_keys.discard(game_id, db_event.source_event_id)
+    
+    live_games.update_event(db_event)
+    game_stats.correct(db_event, old_team, old_minute)
+    
+    if "team" in changes:
+        changes["team"] = changes["team"].value
+    payload = schemas.WebSocketEventUpdatedPayload(event_id=event_id, game_id=game_id, changes=changes)
+    await manager.broadcast(game_id, payload.dict())
+    
+    return db_event
+
+
+@app.delete("/games/{game_id}/events/{event_id}", status_code=204)
+async def delete_event(game_id: int, event_id: int, db: Session = Depends(get_db)):
+    """
+    DELETE /games/{game_id}/events/{event_id}
+    Remove a play-by-play event entered by mistake. Subscribers receive an
+    `event_removed` message; in-memory state is patched in place.
+    """
+    db_event = get_correctable_event(db, game_id, event_id)
+    
+    # Keep a detached copy for the in-memory updates below
+    removed = LiveEvent.from_model(db_event)
+    # A later retry of a removed event records it again
+    recent_keys.discard(game_id, db_event.source_event_id)
+    db.delete(db_event)
+    search.remove_events(db, [event_id])
+    db.commit()
+    print(f"🗑️ Event {event_id} of game {game_id} removed")
+    
+    live_games.remove_event(game_id, event_id)
+    game_stats.remove(removed)
+    
+    payload = schemas.WebSocketEventRemovedPayload(event_id=event_id, game_id=game_id)
+    await manager.broadcast(game_id, payload.dict())
+    
+    return Response(status_code=204)
+
+
+@app.get("/search/events", response_model=schemas.EventSearchResponse)
+def search_events(
+    q: str = Query(..., min_length=1, description="Words to find; a trailing * matches a prefix"),
+    sport_id: Optional[int] = None,
+    game_id: Optional[int] = None,
+    team: Optional[str] = Query(None, pattern="^[ABab]$"),
+    order: str = Query("rank", pattern="^(rank|recent)$", description="Best match or newest first"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    GET /search/events
+    Full-text search across event descriptions, archived games included,
+    with optional sport/game/team filters and offset pagination.
+    """
+    try:
+        hits = search.search(
+            db, q, sport_id, game_id, team.upper() if team else None, order, limit + 1, offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.EventSearchResponse(
+        query=q,
+        results=hits[:limit],
+        next_offset=offset + limit if len(hits) > limit else None,
+    )
+
+
+@app.post("/import", response_model=schemas.ImportResponse)
+async def import_records(request: Request, db: Session = Depends(get_db)):
+    """
+    POST /import
+    Bulk-load sports, games and events from an NDJSON or CSV body
+    (Content-Type: application/x-ndjson or text/csv). The body is parsed as
+    it arrives and written in batches, one transaction each; invalid
+    records are skipped and reported by line.
+    """
+    importer = bulk.Importer(db)
+    records = bulk.records_for(request.headers.get("content-type"))
+    try:
+        async for line, record in records(bulk.read_lines(request.stream())):
+            if importer.add(line, record):
+                await run_in_threadpool(importer.flush)
+    except ValueError as e:
+        # Malformed stream; batches already written stay
+        await run_in_threadpool(importer.finish)
+        raise HTTPException(status_code=400, detail=f"{e} ({importer.batches} batches written)")
+    return await run_in_threadpool(importer.finish)
+
+
+@app.get("/export")
+def export_records(
+    sport_id: Optional[int] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    db: Session = Depends(get_db)
+):
+    """
+    GET /export
+    Stream every sport, game and event (or one sport's) in the import
+    format, read with a server-side cursor.
+    """
+    if sport_id is not None and db.get(models.Sport, sport_id) is None:
+        raise HTTPException(status_code=404, detail="Sport not found")
+    return StreamingResponse(
+        bulk.export_stream(db, sport_id, format),
+        media_type=bulk.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="scoreboard-export.{format}"'},
+    )
+
+
+@app.get("/games/{game_id}/stats", response_model=schemas.GameStatsResponse)
+def get_game_stats(game_id: int, db: Session = Depends(get_db)):
+    """
+    GET /games/{game_id}/stats
+    Per-team event counts, per-minute histograms and running totals.
+    Built once per game, then maintained as events are created.
+    """
+    stats = game_stats.get(game_id)
+    if stats is None:
+        if game_id not in live_games:
+            game = db.query(models.Game.id).filter(models.Game.id == game_id).first()
+            if not game:
+                raise HTTPException(status_code=404, detail="Game not found")
+        stats = game_stats.get_or_build(db, game_id)
+    return stats.to_dict()
+
+
+def events_after(events, after_id: int) -> list:
+    """
+    Events with an id above after_id. Live lists are in commit order, which
+    concurrent writes can make differ from id order, so every event is checked.
+    """
+    return [event for event in events if event.id > after_id]
+
+
+@app.get("/games/{game_id}/events/wait", response_model=schemas.EventWaitResponse)
+async def wait_for_events(
+    game_id: int,
+    after_id: int = Query(0, ge=0, description="Return events with a larger id"),
+    timeout: float = Query(25.0, ge=0, le=60, description="Seconds to wait for a new event"),
+    db: Session = Depends(get_db)
+):
+    """
+    GET /games/{game_id}/events/wait
+    Long-poll for events newer than after_id. Returns as soon as one is
+    published, or 204 No Content after timeout seconds. Waiting requests are
+    parked in memory and do no database reads. Finished games answer at once.
+    """
+    game = live_games.get(game_id)
+    if game is None:
+        game = db.query(models.Game).filter(models.Game.id == game_id).first()
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        if game.status != models.GameStatus.FINISHED:
+            game = live_games.load_game(game)
+        else:
+            game = with_history(db, game)
+    
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        newer = events_after(game.events, after_id)
+        if newer or game.status == models.GameStatus.FINISHED:
+            return schemas.EventWaitResponse(
+                game_id=game_id,
+                status=game.status,
+                events=[schemas.EventResponse.model_validate(event) for event in newer]
+            )
+        
+        # Release any pooled connection before parking
+        db.close()
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0 or not await notifier.wait(game_id, remaining):
+            return Response(status_code=204)
+        
+        live_game = live_games.get(game_id)
+        if live_game is None:
+            # Evicted because the game finished: read its final state once
+            game = db.query(models.Game).filter(models.Game.id == game_id).first()
+        else:
+            game = live_game
+
+
 # WebSocket Endpoint
 
 @app.websocket("/ws/games/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: int):
+async def websocket_endpoint(websocket: WebSocket, game_id: int, db: Session = Depends(get_db)):
     """
     WebSocket endpoint for real-time game updates.
     /ws/games/{game_id}
     """
     origin = websocket.headers.get("origin")
-    allowed_origins = [
-        "https://micho8cho93.github.io",
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:5500",
-        "http://127.0.0.1:5500",
-        None
-    ]
     
-    print(f"\n{'='*60}")
-    print(f"WEBSOCKET CONNECTION ATTEMPT")
-    print(f"Game ID: {game_id}")
-    print(f"Origin: {origin}")
-    print(f"All headers: {dict(websocket.headers)}")
-    print(f"{'='*60}\n")
+    # Origin check against the shared allowlist
+    if not origin_allowed(origin):
+        print(f"❌ Origin not allowed: {origin}")
+        await websocket.close(code=1008, reason="Origin not allowed")
+        return
     
-    # More permissive origin check
-    if origin:
-        origin_normalized = origin.rstrip('/')
-        allowed_normalized = [o.rstrip('/') if o else None for o in allowed_origins]
-        if origin_normalized not in allowed_normalized:
-            print(f"❌ Origin not allowed: {origin}")
-            print(f"   Allowed origins: {allowed_origins}")
-            await websocket.close(code=1008, reason="Origin not allowed")
-            return
-        else:
-            print(f"✅ Origin allowed: {origin}")
+    # A draining instance sends new clients on to the next one
+    if drainer.draining:
+        await websocket.accept()
+        await websocket.close(code=DRAIN_CLOSE_CODE, reason=drain_reason(drainer.retry_after_ms(), None))
+        return
     
-    # Verify game exists
-    db = next(get_db())
-    try:
+    # Admission control runs before any database work
+    client_ip = websocket.client.host if websocket.client else None
+    retry_after_ms = admission.admit(
+        client_ip,
+        len(manager.active_connections.get(game_id, ())),
+        manager.total_connections,
+    )
+    if retry_after_ms is not None:
+        # Accept first so the client sees the close code and retry delay
+        await websocket.accept()
+        await websocket.close(code=RETRY_CLOSE_CODE, reason=retry_reason(retry_after_ms))
+        return
+    
+    # Verify game exists (live games are checked in memory)
+    game = live_games.get(game_id)
+    if game is None:
         game = db.query(models.Game).filter(models.Game.id == game_id).first()
         if not game:
             print(f"❌ Game {game_id} not found in database")
             await websocket.close(code=1008, reason="Game not found")
             return
+        if game.status != models.GameStatus.FINISHED:
+            # First subscriber: keep this game's state in memory from now on
+            game = live_games.load_game(game)
+    # The game is in hand; release the pooled connection for the socket's lifetime
+    db.close()
+    
+    print(f"✅ Game found: {game.team_a_name} vs {game.team_b_name}")
+    
+    # Finished games have no live updates: report the final status and close
+    if game.status == models.GameStatus.FINISHED:
+        await websocket.accept()
+        payload = schemas.WebSocketStatusPayload(game_id=game_id, status=game.status.value)
+        await websocket.send_json(payload.dict())
+        await websocket.close(code=1000, reason="Game finished")
+        return
+    
+    # Connect client
+    await manager.connect(websocket, game_id)
+    
+    try:
+        # Send initial connection confirmation
+        await websocket.send_json({
+            "type": "connection_established",
+            "game_id": game_id,
+            "message": "Connected to live updates"
+        })
+        print(f"✅ Sent connection confirmation to client")
         
-        print(f"✅ Game found: {game.team_a_name} vs {game.team_b_name}")
-        
-        # Connect client
-        await manager.connect(websocket, game_id)
+        # Keep connection alive with periodic pings
+        last_ping = asyncio.get_event_loop().time()
         
+        while True:
+            try:
+                # Wait for messages with a timeout
+                data = await asyncio.wait_for(
+                    websocket.receive_text(),
+                    timeout=30.0
+                )
+                
+                print(f"📨 Received from client (game {game_id}): {data}")
+                
+                # Echo back for ping/pong
+                if data == "ping":
+                    await websocket.send_text("pong")
+                    print(f"   Sent pong response")
+                    last_ping = asyncio.get_event_loop().time()
+                    
+            except asyncio.TimeoutError:
+                # Send keepalive ping to client
+                current_time = asyncio.get_event_loop().time()
+                if current_time - last_ping > 25:
+                    try:
+                        await websocket.send_json({
+                            "type": "keepalive",
+                            "timestamp": current_time
+                        })
+                        print(f"📡 Sent keepalive to game {game_id}")
+                        last_ping = current_time
+                    except Exception as e:
+                        print(f"❌ Keepalive failed: {e}")
+                        break
+                continue
+                
+    except WebSocketDisconnect:
+        print(f"🔌 WebSocket disconnected normally for game {game_id}")
+    except Exception as e:
+        print(f"❌ WebSocket error for game {game_id}: {type(e).__name__}: {e}")
+    finally:
+        manager.disconnect(websocket, game_id)
+        print(f"🧹 Cleaned up connection for game {game_id}")
+
+
+# Server-Sent Events Endpoint
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+@app.get("/games/{game_id}/stream")
+async def stream_game(
+    game_id: int,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    GET /games/{game_id}/stream
+    Server-Sent Events feed of a game's live updates, for read-only clients.
+    Shares the WebSocket subscription registry and pre-encoded payloads.
+    Sending Last-Event-ID replays the events after that id before going live.
+    """
+    if drainer.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is draining",
+            headers={"Retry-After": str(max(1, drainer.retry_after_ms() // 1000))}
+        )
+    
+    client_ip = request.client.host if request.client else None
+    retry_after_ms = admission.admit(
+        client_ip,
+        len(manager.active_connections.get(game_id, ())),
+        manager.total_connections,
+    )
+    if retry_after_ms is not None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many connections",
+            headers={"Retry-After": str(max(1, retry_after_ms // 1000))}
+        )
+    
+    game = live_games.get(game_id)
+    if game is None:
+        game = db.query(models.Game).filter(models.Game.id == game_id).first()
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        if game.status != models.GameStatus.FINISHED:
+            game = live_games.load_game(game)
+        else:
+            game = with_history(db, game)
+    
+    try:
+        after_id = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
+    
+    finished = game.status == models.GameStatus.FINISHED
+    subscriber = None
+    if not finished:
+        # Subscribe before reading history so no event falls in between
+        subscriber = StreamSubscriber()
+        manager.subscribe(subscriber, game_id, client_ip)
+    
+    missed = [event_payload(event) for event in game.events if event.id > after_id]
+    replayed = {payload.event_id for payload in missed}
+    status = schemas.WebSocketStatusPayload(game_id=game_id, status=game.status.value)
+    # History is in hand; release the pooled connection for the stream's lifetime
+    db.close()
+    
+    async def frames():
+        yield "retry: 3000\n\n"
+        for payload in missed:
+            yield sse_frame(payload.model_dump_json(), "event", payload.event_id)
+        if subscriber is None:
+            yield sse_frame(status.model_dump_json(), status.type)
+            return
         try:
-            # Send initial connection confirmation
-            await websocket.send_json({
-                "type": "connection_established",
-                "game_id": game_id,
-                "message": "Connected to live updates"
-            })
-            print(f"✅ Sent connection confirmation to client")
-            
-            # Keep connection alive with periodic pings
-            import asyncio
-            last_ping = asyncio.get_event_loop().time()
-            
             while True:
                 try:
-                    # Wait for messages with a timeout
-                    data = await asyncio.wait_for(
-                        websocket.receive_text(),
-                        timeout=30.0
-                    )
-                    
-                    print(f"📨 Received from client (game {game_id}): {data}")
-                    
-                    # Echo back for ping/pong
-                    if data == "ping":
-                        await websocket.send_text("pong")
-                        print(f"   Sent pong response")
-                        last_ping = asyncio.get_event_loop().time()
-                        
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
                 except asyncio.TimeoutError:
-                    # Send keepalive ping to client
-                    current_time = asyncio.get_event_loop().time()
-                    if current_time - last_ping > 25:
-                        try:
-                            await websocket.send_json({
-                                "type": "keepalive",
-                                "timestamp": current_time
-                            })
-                            print(f"📡 Sent keepalive to game {game_id}")
-                            last_ping = current_time
-                        except Exception as e:
-                            print(f"❌ Keepalive failed: {e}")
-                            break
+                    yield ": keepalive\n\n"
                     continue
-                    
-        except WebSocketDisconnect:
-            print(f"🔌 WebSocket disconnected normally for game {game_id}")
-        except Exception as e:
-            print(f"❌ WebSocket error for game {game_id}: {type(e).__name__}: {e}")
+                if frame is None:
+                    return
+                # Drop events the client had or was just sent in the replay
+                frame = sse_unseen(frame, lambda event_id: event_id <= after_id or event_id in replayed)
+                if frame is not None:
+                    yield frame
         finally:
-            manager.disconnect(websocket, game_id)
-            print(f"🧹 Cleaned up connection for game {game_id}")
-    finally:
-        db.close()
+            manager.disconnect(subscriber, game_id)
+    
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Admin Endpoints
+
+@app.get("/admin/live-games")
+def get_live_games():
+    """
+    GET /admin/live-games
+    Report the games held in the live-state store and its memory use.
+    """
+    return {**live_games.memory_usage(), "game_ids": live_games.game_ids()}
+
+
+@app.get("/admin/connections")
+def get_connections(top: int = Query(10, ge=1, le=100, description="Number of games to list")):
+    """
+    GET /admin/connections
+    Report subscriber totals, registry memory and the games with the largest audiences.
+    """
+    return {**manager.memory_usage(), "top_games": manager.top_games(top)}
+
+
+@app.get("/admin/compression")
+def get_compression_stats():
+    """
+    GET /admin/compression
+    Size, hit rate and compression counters of the game-state body cache.
+    """
+    return game_bodies.stats()
+
+
+@app.get("/admin/kickoffs")
+def get_kickoffs():
+    """
+    GET /admin/kickoffs
+    Kickoffs queued by the scheduler, games pre-warmed, games started.
+    """
+    return kickoffs.stats()
+
+
+@app.get("/admin/idempotency")
+def get_idempotency():
+    """
+    GET /admin/idempotency
+    Size and hit counts of the recent event keys cache.
+    """
+    return recent_keys.stats()
+
+
+@app.get("/admin/tracing")
+def get_tracing():
+    """
+    GET /admin/tracing
+    Sample rate and counts of traces started, spans exported and spans dropped.
+    """
+    return tracer.stats()
+
+
+@app.post("/admin/drain", status_code=202)
+async def start_drain():
+    """
+    POST /admin/drain
+    Stop accepting subscribers and close existing ones in waves, each with a
+    randomized reconnect delay. Used before taking an instance out of rotation.
+    """
+    started = drainer.start()
+    return {"draining": True, "started": started, "connections": manager.total_connections}
+
+
+@app.post("/admin/stats/rebuild")
+def rebuild_stats(game_ids: Optional[List[int]] = Query(None), db: Session = Depends(get_db)):
+    """
+    POST /admin/stats/rebuild
+    Recompute game statistics in one aggregate pass (backfills, imports).
+    Defaults to every game whose stats are currently held in memory.
+    """
+    rebuilt = game_stats.rebuild(db, game_ids if game_ids is not None else game_stats.game_ids())
+    return {"games": len(rebuilt)}
+
+
+@app.post("/admin/release")
+def release_games(release: schemas.ReleaseRequest):
+    """
+    POST /admin/release
+    Drop the in-memory state (live state, stats, cached bodies) of games this
+    worker no longer owns. Called by the router when games move between
+    workers, so a game that later moves back is reloaded from the database
+    rather than served from a copy that missed events.
+    """
+    held = set(live_games.game_ids()) | set(game_stats.game_ids())
+    held |= set(game_bodies.game_ids()) | set(finished_games.game_ids())
+    if release.worker is None:
+        released = held
+    else:
+        released = {game_id for game_id in held if owner(game_id, release.workers) != release.worker}
+    for game_id in released:
+        live_games.evict(game_id)
+        game_stats.discard(game_id)
+        game_bodies.discard(game_id)
+        finished_games.discard(game_id)
+    return {"games": len(released)}
 
 
 @app.get("/")
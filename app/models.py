@@ -1,7 +1,7 @@
 """
 Database models for Sport, Game, and PlayByPlayEvent.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -15,6 +15,15 @@ class GameStatus(enum.Enum):
     FINISHED = "Finished"
 
 
+# Allowed status changes. FINISHED is terminal: a finished game never changes
+# again, which is what lets its responses be cached indefinitely.
+GAME_STATUS_TRANSITIONS = {
+    GameStatus.SCHEDULED: {GameStatus.LIVE},
+    GameStatus.LIVE: {GameStatus.FINISHED},
+    GameStatus.FINISHED: set(),
+}
+
+
 class TeamSide(enum.Enum):
     """Team side enumeration."""
     A = "A"
@@ -44,21 +53,53 @@ class Game(Base):
     status = Column(Enum(GameStatus), default=GameStatus.SCHEDULED, nullable=False)
     start_time = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set when the game's events are moved to the archive (app/archive.py)
+    archived_at = Column(DateTime, nullable=True)
 
     sport = relationship("Sport", back_populates="games")
     events = relationship("PlayByPlayEvent", back_populates="game", order_by="PlayByPlayEvent.created_at")
 
+    __table_args__ = (
+        # Upcoming kickoffs: scheduled games by start time (app/scheduler.py)
+        Index("ix_games_status_start_time", "status", "start_time"),
+        # Sport listings in id order, with or without a status filter (app/listing.py)
+        Index("ix_games_sport_id_id", "sport_id", "id"),
+        Index("ix_games_sport_id_status_id", "sport_id", "status", "id"),
+    )
+
 
 class PlayByPlayEvent(Base):
     """Play-by-play event model."""
     __tablename__ = "play_by_play_events"
+    __table_args__ = (
+        # Retried posts of the same provider event (app/idempotency.py)
+        Index("ix_play_by_play_events_game_id_source_event_id", "game_id", "source_event_id", unique=True),
+        # Ids are never reused on SQLite, even after the newest rows are archived
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False, index=True)
     team = Column(Enum(TeamSide), nullable=False)
     minute = Column(Integer, nullable=False)
     description = Column(String, nullable=False)
+    points = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    source_event_id = Column(String(128), nullable=True)
 
     game = relationship("Game", back_populates="events")
 
+
+class Standing(Base):
+    """Standings row: one team's record in a sport, built from finished games."""
+    __tablename__ = "standings"
+
+    sport_id = Column(Integer, ForeignKey("sports.id"), primary_key=True)
+    team_name = Column(String, primary_key=True)
+    played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    draws = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    points_for = Column(Integer, nullable=False, default=0)
+    points_against = Column(Integer, nullable=False, default=0)
+
@@ -0,0 +1,80 @@
+"""
+In-memory wakeups for long-poll waiters.
+
+Every waiter on a game awaits the same future, so one notification wakes
+thousands of parked requests and none of them touch the database while
+they wait.
+"""
+from threading import Lock
+from typing import Dict
+import asyncio
+
+
+class _Waiters:
+    """The shared future for one game on one event loop, and who awaits it."""
+    __slots__ = ("future", "count")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.count = 0
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class GameNotifier:
+    """Per-game wakeup channel for parked requests."""
+
+    def __init__(self):
+        # game_id -> event loop -> shared future
+        self._waiters: Dict[int, Dict[asyncio.AbstractEventLoop, _Waiters]] = {}
+        self._lock = Lock()
+
+    async def wait(self, game_id: int, timeout: float) -> bool:
+        """Park until the game is notified. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            by_loop = self._waiters.setdefault(game_id, {})
+            waiters = by_loop.get(loop)
+            if waiters is None:
+                waiters = by_loop[loop] = _Waiters(loop.create_future())
+            waiters.count += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiters.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                waiters.count -= 1
+                by_loop = self._waiters.get(game_id)
+                if waiters.count == 0 and by_loop is not None and by_loop.get(loop) is waiters:
+                    del by_loop[loop]
+                    if not by_loop:
+                        del self._waiters[game_id]
+
+    def notify(self, game_id: int):
+        """Wake every waiter on a game."""
+        with self._lock:
+            by_loop = self._waiters.pop(game_id, None)
+        if not by_loop:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for loop, waiters in by_loop.items():
+            if loop is running:
+                _resolve(waiters.future)
+            else:
+                loop.call_soon_threadsafe(_resolve, waiters.future)
+
+    def waiting(self, game_id: int) -> int:
+        """Number of requests parked on a game."""
+        with self._lock:
+            return sum(w.count for w in self._waiters.get(game_id, {}).values())
+
+
+notifier = GameNotifier()
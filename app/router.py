@@ -0,0 +1,425 @@
+"""
+Game-affinity router.
+
+A small front process for running several workers on one host. Every
+request for a game (`/games/{game_id}...` and `/ws/games/{game_id}`) is sent
+to one worker, chosen by rendezvous (highest random weight) hashing of the
+game id over the healthy workers, so a game's events and its subscribers
+meet in the same process and fan-out never crosses workers. Other requests
+are spread round-robin.
+
+Workers are health-checked every ROUTER_HEALTH_INTERVAL seconds and taken
+out of rotation after ROUTER_UNHEALTHY_AFTER consecutive failed probes (or
+proxied requests); they can also be added or removed at runtime through
+/_router/workers. Membership changes only move the games of the worker that
+joined or left; proxied WebSockets of moved games are closed with 1012
+(Service Restart) so their clients reconnect to the new owner.
+
+Workers keep per-game state in memory (live state, stats, cached bodies).
+Whenever membership changes, every healthy worker is told to drop the games
+it no longer owns (POST /admin/release), and a worker coming back is told to
+drop all of them before it gets traffic: while it was away its games took
+events elsewhere.
+
+Usage:
+    python -m app.router --port 8000 --worker http://127.0.0.1:8001 --worker http://127.0.0.1:8002
+
+Workers should trust the router's X-Forwarded-For header (uvicorn does for
+127.0.0.1 by default) so per-client admission limits still apply.
+"""
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Set
+import argparse
+import asyncio
+import itertools
+import os
+import re
+
+import httpx
+import websockets
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.admission import RETRY_CLOSE_CODE, retry_reason
+
+ROUTER_HEALTH_INTERVAL = float(os.getenv("ROUTER_HEALTH_INTERVAL", "2"))
+# Kept below the interval so a hung worker cannot stall the probe loop
+ROUTER_PROBE_TIMEOUT = float(os.getenv("ROUTER_PROBE_TIMEOUT", "1"))
+ROUTER_UNHEALTHY_AFTER = int(os.getenv("ROUTER_UNHEALTHY_AFTER", "3"))
+REBALANCE_CLOSE_CODE = 1012
+# Close codes that report a local condition and must not appear in a Close
+# frame (no status, abnormal closure, TLS failure)
+UNSENDABLE_CLOSE_CODES = frozenset((1005, 1006, 1015))
+
+GAME_PATH = re.compile(r"^/(?:ws/)?games/(\d+)(?:/|$)")
+HOP_BY_HOP = frozenset((
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host",
+))
+
+
+def _weight(worker: str, game_id: int) -> int:
+    digest = blake2b(f"{worker}|{game_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def owner(game_id: int, workers: Iterable[str]) -> Optional[str]:
+    """The worker with the highest weight for a game (rendezvous hashing)."""
+    return max(workers, key=lambda worker: _weight(worker, game_id), default=None)
+
+
+def game_id_for(path: str) -> Optional[int]:
+    """The game a request path belongs to, if any."""
+    match = GAME_PATH.match(path)
+    return int(match.group(1)) if match else None
+
+
+def relay_close_code(code: Optional[int]) -> int:
+    """
+    The close code to send a client for its worker's close. A worker that
+    went away without a Close frame is reported as a restart, so the client
+    reconnects (and is routed to the game's new owner).
+    """
+    if code is None:
+        return 1000
+    return REBALANCE_CLOSE_CODE if code in UNSENDABLE_CLOSE_CODES else code
+
+
+class ProxiedSocket:
+    """One client WebSocket relayed to a worker."""
+    __slots__ = ("game_id", "worker", "client", "upstream")
+
+    def __init__(self, game_id: int, worker: str, client: WebSocket, upstream):
+        self.game_id = game_id
+        self.worker = worker
+        self.client = client
+        self.upstream = upstream
+
+    async def close(self, code: int, reason: str = ""):
+        try:
+            # Client first, so it sees this code rather than the relayed upstream close
+            await self.client.close(code=code, reason=reason)
+            await self.upstream.close()
+        except Exception as e:
+            print(f"❌ Failed to close proxied socket for game {self.game_id}: {e}")
+
+
+class GameRouter:
+    """Worker membership, game ownership and the proxied sockets per game."""
+
+    def __init__(self, workers: Iterable[str]):
+        self.workers: List[str] = [worker.rstrip("/") for worker in workers]
+        self.healthy: Set[str] = set(self.workers)
+        self.sockets: Dict[int, Set[ProxiedSocket]] = {}
+        self._round_robin = itertools.count()
+
+    def route(self, path: str) -> Optional[str]:
+        """Worker for a request path: the game's owner, or round-robin."""
+        healthy = sorted(self.healthy)
+        if not healthy:
+            return None
+        game_id = game_id_for(path)
+        if game_id is None:
+            return healthy[next(self._round_robin) % len(healthy)]
+        return owner(game_id, healthy)
+
+    def add_worker(self, worker: str) -> bool:
+        """Add a worker (or mark one healthy). Returns True if membership changed."""
+        worker = worker.rstrip("/")
+        if worker not in self.workers:
+            self.workers.append(worker)
+        if worker in self.healthy:
+            return False
+        self.healthy.add(worker)
+        print(f"➕ Worker {worker} joined")
+        return True
+
+    def remove_worker(self, worker: str, forget: bool = False) -> bool:
+        """Take a worker out of rotation. Returns True if membership changed."""
+        worker = worker.rstrip("/")
+        if forget and worker in self.workers:
+            self.workers.remove(worker)
+        if worker not in self.healthy:
+            return False
+        self.healthy.discard(worker)
+        print(f"➖ Worker {worker} left")
+        return True
+
+    def register(self, socket: ProxiedSocket):
+        self.sockets.setdefault(socket.game_id, set()).add(socket)
+
+    def unregister(self, socket: ProxiedSocket):
+        sockets = self.sockets.get(socket.game_id)
+        if sockets is not None:
+            sockets.discard(socket)
+            if not sockets:
+                del self.sockets[socket.game_id]
+
+    async def rebalance(self) -> int:
+        """Close proxied sockets whose game is now owned by another worker."""
+        healthy = list(self.healthy)
+        moved = []
+        for game_id, sockets in list(self.sockets.items()):
+            target = owner(game_id, healthy)
+            moved.extend(socket for socket in sockets if socket.worker != target)
+        for socket in moved:
+            self.unregister(socket)
+            await socket.close(REBALANCE_CLOSE_CODE, "Game moved to another worker")
+        if moved:
+            print(f"🔀 Rebalanced {len(moved)} sockets")
+        return len(moved)
+
+
+class RouterApp:
+    """ASGI application proxying HTTP and WebSocket traffic by game affinity."""
+
+    def __init__(
+        self,
+        router: GameRouter,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        health_interval: float = ROUTER_HEALTH_INTERVAL,
+        probe_timeout: float = ROUTER_PROBE_TIMEOUT,
+        unhealthy_after: int = ROUTER_UNHEALTHY_AFTER,
+    ):
+        self.router = router
+        self.transport = transport
+        self.health_interval = health_interval
+        self.probe_timeout = min(probe_timeout, health_interval / 2)
+        self.unhealthy_after = unhealthy_after
+        self._failures: Dict[str, int] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self.transport, timeout=None)
+        return self._client
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "websocket":
+            await self._proxy_websocket(WebSocket(scope, receive, send))
+        elif scope["path"].startswith("/_router/"):
+            response = await self._admin(Request(scope, receive))
+            await response(scope, receive, send)
+        else:
+            await self._proxy_http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._health_task is not None:
+                    self._health_task.cancel()
+                if self._client is not None:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _health_loop(self):
+        """Probe every configured worker and rebalance on membership changes."""
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.health_interval)
+
+    async def probe(self) -> bool:
+        """Probe every configured worker once. Returns True if membership changed."""
+        changed = False
+        for worker in list(self.router.workers):
+            try:
+                response = await self.client.get(worker + "/", timeout=self.probe_timeout)
+                healthy = response.status_code == 200
+            except httpx.HTTPError:
+                healthy = False
+            if healthy:
+                self._failures.pop(worker, None)
+                changed |= await self._admit(worker)
+            else:
+                changed |= self._failed(worker)
+        if changed:
+            await self._rebalance()
+        return changed
+
+    def _failed(self, worker: str) -> bool:
+        """Count a failed probe or request; remove the worker after enough in a row."""
+        failures = self._failures[worker] = self._failures.get(worker, 0) + 1
+        return failures >= self.unhealthy_after and self.router.remove_worker(worker)
+
+    async def _admit(self, worker: str) -> bool:
+        """Put a worker into rotation once it has dropped any game state it held before."""
+        if worker.rstrip("/") in self.router.healthy:
+            return False
+        if not await self._release(worker, None):
+            return False
+        return self.router.add_worker(worker)
+
+    async def _release(self, worker: str, workers: Optional[List[str]]) -> bool:
+        """Tell a worker to drop the games it does not own among `workers` (all games if None)."""
+        body = {"worker": worker, "workers": workers} if workers is not None else {}
+        try:
+            response = await self.client.post(worker + "/admin/release", json=body, timeout=self.probe_timeout)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
+            print(f"❌ Worker {worker} did not release games: {e}")
+            return False
+
+    async def _rebalance(self):
+        """Move sockets to their games' new owners and have workers drop the games they lost."""
+        await self.router.rebalance()
+        healthy = sorted(self.router.healthy)
+        await asyncio.gather(*(self._release(worker, healthy) for worker in healthy))
+
+    async def _admin(self, request: Request):
+        """GET/POST/DELETE /_router/workers: list, add or remove workers."""
+        if request.url.path != "/_router/workers":
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+        worker = request.query_params.get("url")
+        if request.method in ("POST", "DELETE"):
+            if not worker:
+                return JSONResponse({"detail": "url is required"}, status_code=400)
+            if request.method == "POST":
+                worker = worker.rstrip("/")
+                if worker not in self.router.workers:
+                    self.router.workers.append(worker)
+                changed = await self._admit(worker)
+            else:
+                changed = self.router.remove_worker(worker, forget=True)
+            if changed:
+                await self._rebalance()
+        return JSONResponse({
+            "workers": self.router.workers,
+            "healthy": sorted(self.router.healthy),
+            "games_with_sockets": len(self.router.sockets),
+        })
+
+    def _forward_headers(self, headers, client) -> Dict[str, str]:
+        forwarded = {
+            key: value for key, value in headers.items()
+            if key.lower() not in HOP_BY_HOP and not key.lower().startswith("sec-websocket")
+        }
+        if client is not None:
+            previous = headers.get("x-forwarded-for")
+            forwarded["x-forwarded-for"] = f"{previous}, {client.host}" if previous else client.host
+        return forwarded
+
+    async def _proxy_http(self, scope, receive, send):
+        request = Request(scope, receive)
+        worker = self.router.route(request.url.path)
+        if worker is None:
+            response = JSONResponse({"detail": "No healthy workers"}, status_code=503)
+            await response(scope, receive, send)
+            return
+
+        url = worker + request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        # Bodies are streamed through (POST /import can be large); Content-Length is kept
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        upstream_request = self.client.build_request(
+            request.method, url,
+            headers=self._forward_headers(request.headers, request.client),
+            content=request.stream() if has_body else None,
+        )
+        try:
+            upstream = await self.client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            print(f"❌ Worker {worker} unreachable: {e}")
+            if self._failed(worker):
+                await self._rebalance()
+            response = JSONResponse({"detail": "Worker unavailable"}, status_code=502)
+            await response(scope, receive, send)
+            return
+
+        headers = {
+            key: value for key, value in upstream.headers.items()
+            if key.lower() not in HOP_BY_HOP
+        }
+        response = StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers=headers,
+            background=BackgroundTask(upstream.aclose),
+        )
+        await response(scope, receive, send)
+
+    async def _proxy_websocket(self, websocket: WebSocket):
+        path = websocket.url.path
+        game_id = game_id_for(path)
+        worker = self.router.route(path)
+        if worker is None or game_id is None:
+            await websocket.accept()
+            await websocket.close(code=RETRY_CLOSE_CODE, reason=retry_reason(1000))
+            return
+
+        url = "ws" + worker[len("http"):] + path + (f"?{websocket.url.query}" if websocket.url.query else "")
+        try:
+            upstream = await websockets.connect(
+                url,
+                extra_headers=self._forward_headers(websocket.headers, websocket.client),
+                max_queue=None,
+            )
+        except (OSError, websockets.InvalidHandshake) as e:
+            print(f"❌ Worker {worker} refused WebSocket: {e}")
+            await websocket.accept()
+            await websocket.close(code=RETRY_CLOSE_CODE, reason=retry_reason(1000))
+            return
+
+        await websocket.accept()
+        socket = ProxiedSocket(game_id, worker, websocket, upstream)
+        self.router.register(socket)
+        try:
+            await asyncio.gather(self._client_to_worker(socket), self._worker_to_client(socket))
+        finally:
+            self.router.unregister(socket)
+
+    async def _client_to_worker(self, socket: ProxiedSocket):
+        try:
+            while True:
+                message = await socket.client.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("text") is not None:
+                    await socket.upstream.send(message["text"])
+                elif message.get("bytes") is not None:
+                    await socket.upstream.send(message["bytes"])
+        except (WebSocketDisconnect, websockets.ConnectionClosed, RuntimeError):
+            pass
+        await socket.upstream.close()
+
+    async def _worker_to_client(self, socket: ProxiedSocket):
+        try:
+            async for message in socket.upstream:
+                if isinstance(message, str):
+                    await socket.client.send_text(message)
+                else:
+                    await socket.client.send_bytes(message)
+        except websockets.ConnectionClosed:
+            pass
+        except RuntimeError:
+            return  # client already gone
+        # Relay the worker's close code and reason (game finished, drain, ...)
+        code = relay_close_code(socket.upstream.close_code)
+        try:
+            await socket.client.close(code=code, reason=socket.upstream.close_reason or "")
+        except RuntimeError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route each game's traffic to one worker.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--worker", action="append", required=True, help="Worker base URL (repeatable)")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(RouterApp(GameRouter(args.worker)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
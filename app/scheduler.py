@@ -0,0 +1,203 @@
+"""
+Kickoff scheduler: scheduled games go Live at their start_time.
+
+Upcoming kickoffs are read with an indexed query on (status, start_time)
+every KICKOFF_SCAN_SECONDS, looking KICKOFF_LOOKAHEAD_SECONDS ahead, and
+kept in a heap. While the scheduler runs, games created in this process
+are added as they are created; a game whose status changes otherwise is
+dropped from it. KICKOFF_PREWARM_SECONDS before a kickoff the game is pre-warmed
+(loaded into the live-state store, its stats and broadcast state created),
+so the first viewers at kickoff hit memory rather than the database. At
+start_time the game is moved to Live with a conditional UPDATE, so a game
+started by hand or by another worker is left alone.
+
+Disabled unless AUTO_START_GAMES=1. Games created without a start_time
+start at their creation time.
+"""
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import os
+import time
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import new_session
+
+AUTO_START_GAMES = os.getenv("AUTO_START_GAMES", "0") == "1"
+KICKOFF_PREWARM_SECONDS = float(os.getenv("KICKOFF_PREWARM_SECONDS", "300"))
+KICKOFF_LOOKAHEAD_SECONDS = float(os.getenv("KICKOFF_LOOKAHEAD_SECONDS", "3600"))
+KICKOFF_SCAN_SECONDS = float(os.getenv("KICKOFF_SCAN_SECONDS", "60"))
+# Games this late (e.g. after downtime) are not started automatically
+KICKOFF_MAX_LATE_SECONDS = float(os.getenv("KICKOFF_MAX_LATE_SECONDS", "3600"))
+
+PREWARM = 0
+KICKOFF = 1
+
+
+class KickoffScheduler:
+    """Heap of upcoming kickoffs, pre-warmed ahead of time and started on time."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = new_session,
+        lead_seconds: float = KICKOFF_PREWARM_SECONDS,
+        lookahead_seconds: float = KICKOFF_LOOKAHEAD_SECONDS,
+        scan_seconds: float = KICKOFF_SCAN_SECONDS,
+        max_late_seconds: float = KICKOFF_MAX_LATE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.lead = timedelta(seconds=lead_seconds)
+        self.lookahead = timedelta(seconds=lookahead_seconds)
+        self.scan_seconds = scan_seconds
+        self.max_late = timedelta(seconds=max_late_seconds)
+        # Set by the application: prewarm(db, game_id), await kick_off(db, game_id)
+        self.prewarm: Callable[[Session, int], None] = lambda db, game_id: None
+        self.kick_off: Optional[Callable[[Session, int], Awaitable[bool]]] = None
+        self.started = 0
+        self._heap: List[Tuple[datetime, int, int]] = []
+        # game_id -> start_time queued for it; heap entries for other times are stale
+        self._queued: Dict[int, datetime] = {}
+        self._warm: Set[int] = set()
+        self._lock = Lock()
+        self._next_scan = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, game_id: int, start_time: Optional[datetime], now: Optional[datetime] = None):
+        """Queue a scheduled game's kickoff if it falls within the lookahead window."""
+        now = now or datetime.utcnow()
+        if start_time is None or start_time > now + self.lookahead or start_time < now - self.max_late:
+            return
+        with self._lock:
+            if self._queued.get(game_id) == start_time:
+                return
+            self._queued[game_id] = start_time
+            heapq.heappush(self._heap, (start_time - self.lead, PREWARM, game_id))
+            heapq.heappush(self._heap, (start_time, KICKOFF, game_id))
+        if self._loop is not None:
+            # May be called from a request thread
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def discard(self, game_id: int):
+        """Forget a game's kickoff (its status changed); its heap entries go stale."""
+        with self._lock:
+            self._queued.pop(game_id, None)
+            self._warm.discard(game_id)
+
+    def is_upcoming(self, game_id: int) -> bool:
+        """Whether a game is queued (pre-warmed games stay in memory until kickoff)."""
+        return game_id in self._queued
+
+    def _pop_due(self, now: datetime) -> List[Tuple[int, int]]:
+        """Due (action, game_id) pairs, dropping entries made stale by a re-queue."""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                when, action, game_id = heapq.heappop(self._heap)
+                start_time = self._queued.get(game_id)
+                if start_time is None or when != (start_time - self.lead if action == PREWARM else start_time):
+                    continue
+                if action == KICKOFF:
+                    del self._queued[game_id]
+                due.append((action, game_id))
+        return due
+
+    def scan(self, db: Session, now: datetime):
+        """Queue every scheduled game starting within the lookahead window (indexed)."""
+        rows = (
+            db.query(models.Game.id, models.Game.start_time)
+            .filter(
+                models.Game.status == models.GameStatus.SCHEDULED,
+                models.Game.start_time >= now - self.max_late,
+                models.Game.start_time <= now + self.lookahead,
+            )
+            .order_by(models.Game.start_time)
+        )
+        for game_id, start_time in rows:
+            self.add(game_id, start_time, now)
+
+    async def tick(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Rescan if due, then pre-warm and kick off due games. Returns the next due time."""
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            if time.monotonic() >= self._next_scan:
+                self.scan(db, now)
+                self._next_scan = time.monotonic() + self.scan_seconds
+            for action, game_id in self._pop_due(now):
+                try:
+                    if action == PREWARM:
+                        if game_id not in self._warm:
+                            self.prewarm(db, game_id)
+                            self._warm.add(game_id)
+                    else:
+                        self._warm.discard(game_id)
+                        if self.kick_off is not None and await self.kick_off(db, game_id):
+                            self.started += 1
+                except Exception as e:
+                    db.rollback()
+                    print(f"❌ Kickoff {'pre-warm' if action == PREWARM else 'start'} failed for game {game_id}: {e}")
+        finally:
+            db.close()
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    async def run(self):
+        """Scheduler loop: sleep until the next kickoff, pre-warm or rescan."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        print(f"⏰ Kickoff scheduler running (pre-warm {self.lead.total_seconds():.0f} s ahead)")
+        while True:
+            try:
+                next_due = await self.tick()
+            except Exception as e:
+                print(f"❌ Kickoff scheduler error: {e}")
+                next_due = None
+            delay = max(0.0, self._next_scan - time.monotonic())
+            if next_due is not None:
+                delay = min(delay, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        """Run the scheduler on the current event loop."""
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            upcoming = sorted(self._queued.items(), key=lambda item: item[1])
+        return {
+            "running": self.running,
+            "upcoming": [{"game_id": game_id, "start_time": start.isoformat()} for game_id, start in upcoming],
+            "warm": sorted(self._warm),
+            "started": self.started,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+            self._queued.clear()
+            self._warm.clear()
+        self.started = 0
+        self._next_scan = 0.0
+
+
+kickoffs = KickoffScheduler()
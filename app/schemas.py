@@ -2,10 +2,20 @@
 Pydantic schemas for request/response validation.
 """
 from pydantic import BaseModel, Field, validator
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from app.models import GameStatus, TeamSide
 
+# Upper bound on event minutes: game stats keep a dense bucket per minute
+MAX_EVENT_MINUTE = 1440
+
+
+def naive_utc(v: Optional[datetime]) -> Optional[datetime]:
+    """Store timestamps as naive UTC, like the column defaults."""
+    if v is not None and v.tzinfo is not None:
+        v = v.astimezone(timezone.utc).replace(tzinfo=None)
+    return v
+
 
 class SportBase(BaseModel):
     """Base sport schema."""
@@ -37,7 +47,29 @@ class GameBase(BaseModel):
 
 class GameCreate(GameBase):
     """Schema for creating a game."""
-    pass
+    start_time: Optional[datetime] = Field(None, description="Kickoff time; defaults to now")
+
+    @validator('start_time')
+    def validate_start_time(cls, v):
+        """Store kickoff times as naive UTC, like every other timestamp."""
+        return naive_utc(v)
+
+
+class GameImport(GameCreate):
+    """A game record of a bulk import; the sport is given by id or slug."""
+    sport_id: Optional[int] = Field(None, description="Sport ID")
+    sport: Optional[str] = Field(None, description="Sport slug")
+    ref: Optional[str] = Field(None, description="Name events of the same import refer to this game by")
+
+    @validator('ref', 'sport', pre=True)
+    def validate_names(cls, v):
+        """Accept numeric refs (an export uses game ids)."""
+        return str(v) if isinstance(v, int) else v
+
+
+class GameStatusUpdate(BaseModel):
+    """Schema for changing a game's status."""
+    status: GameStatus = Field(..., description="New game status")
 
 
 class GameResponse(GameBase):
@@ -53,8 +85,9 @@ class GameResponse(GameBase):
 class EventBase(BaseModel):
     """Base event schema."""
     team: TeamSide = Field(..., description="Team side (A or B)")
-    minute: int = Field(..., ge=0, description="Minute of the event")
+    minute: int = Field(..., ge=0, le=MAX_EVENT_MINUTE, description="Minute of the event")
     description: str = Field(..., min_length=1, description="Event description")
+    points: int = Field(0, ge=0, description="Points scored by this event")
 
     @validator('team', pre=True)
     def validate_team(cls, v):
@@ -69,7 +102,39 @@ class EventBase(BaseModel):
 
 class EventCreate(EventBase):
     """Schema for creating an event."""
-    pass
+    source_event_id: Optional[str] = Field(
+        None, min_length=1, max_length=128,
+        description="Provider's id for this event; retries with the same id are not recorded twice"
+    )
+
+
+class EventImport(EventCreate):
+    """An event record of a bulk import, for a game of the same import or an existing one."""
+    game: Optional[str] = Field(None, description="Ref of a game earlier in the import")
+    game_id: Optional[int] = Field(None, description="ID of an existing game")
+    created_at: Optional[datetime] = Field(None, description="Event time; defaults to now")
+
+    @validator('game', pre=True)
+    def validate_game(cls, v):
+        """Accept numeric refs (an export uses game ids)."""
+        return str(v) if isinstance(v, int) else v
+
+    @validator('created_at')
+    def validate_created_at(cls, v):
+        return naive_utc(v)
+
+
+class EventUpdate(BaseModel):
+    """Schema for correcting an event; omitted fields are left unchanged."""
+    team: Optional[TeamSide] = Field(None, description="Team side (A or B)")
+    minute: Optional[int] = Field(None, ge=0, le=MAX_EVENT_MINUTE, description="Minute of the event")
+    description: Optional[str] = Field(None, min_length=1, description="Event description")
+    points: Optional[int] = Field(None, ge=0, description="Points scored by this event")
+
+    @validator('team', pre=True)
+    def validate_team(cls, v):
+        """Validate team is A or B."""
+        return EventBase.validate_team(v)
 
 
 class EventResponse(EventBase):
@@ -90,6 +155,87 @@ class GameStateResponse(GameResponse):
         from_attributes = True
 
 
+class EventWaitResponse(BaseModel):
+    """Schema for long-poll event responses."""
+    game_id: int
+    status: GameStatus
+    events: List[EventResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class EventSearchHit(BaseModel):
+    """One event matching a search."""
+    event_id: int
+    game_id: int
+    sport_id: int
+    team: TeamSide
+    minute: int
+    description: str
+    created_at: Optional[datetime] = None
+    score: float
+    highlight: str = Field(..., description="Description with matches wrapped in <mark>")
+
+
+class EventSearchResponse(BaseModel):
+    """Schema for event search results."""
+    query: str
+    results: List[EventSearchHit] = []
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, if any")
+
+
+class ImportFailure(BaseModel):
+    """A record a bulk import skipped."""
+    line: int
+    error: str
+
+
+class ImportResponse(BaseModel):
+    """Schema for bulk import results."""
+    sports: int = Field(..., description="Sports created")
+    games: int = Field(..., description="Games created")
+    events: int = Field(..., description="Events created")
+    batches: int = Field(..., description="Transactions committed")
+    failed: int = Field(..., description="Records skipped")
+    errors: List[ImportFailure] = Field([], description="The first skipped records and why")
+
+
+class ReleaseRequest(BaseModel):
+    """Schema for a router telling a worker which games it owns."""
+    worker: Optional[str] = Field(None, description="This worker's URL at the router; omit to release every game")
+    workers: List[str] = Field([], description="Healthy workers games are spread over")
+
+
+class StandingResponse(BaseModel):
+    """Schema for one team's standings row."""
+    team_name: str
+    played: int
+    wins: int
+    draws: int
+    losses: int
+    points_for: int
+    points_against: int
+
+    class Config:
+        from_attributes = True
+
+
+class TeamStats(BaseModel):
+    """Schema for one team's event statistics."""
+    count: int
+    per_minute: List[int] = Field(..., description="Events per minute of play")
+    running: List[int] = Field(..., description="Cumulative events at the end of each minute")
+
+
+class GameStatsResponse(BaseModel):
+    """Schema for game statistics."""
+    game_id: int
+    total_events: int
+    minutes: int
+    teams: Dict[str, TeamStats]
+
+
 class WebSocketEventPayload(BaseModel):
     """Schema for WebSocket event payload."""
     event_id: int
@@ -97,8 +243,30 @@ class WebSocketEventPayload(BaseModel):
     team: str
     minute: int
     description: str
+    points: int = 0
     timestamp: datetime
 
     class Config:
         from_attributes = True
 
+
+class WebSocketEventUpdatedPayload(BaseModel):
+    """Schema for WebSocket event correction payload (changed fields only)."""
+    type: str = "event_updated"
+    event_id: int
+    game_id: int
+    changes: Dict[str, Any]
+
+
+class WebSocketEventRemovedPayload(BaseModel):
+    """Schema for WebSocket event removal payload."""
+    type: str = "event_removed"
+    event_id: int
+    game_id: int
+
+
+class WebSocketStatusPayload(BaseModel):
+    """Schema for WebSocket game status payload."""
+    type: str = "game_status"
+    game_id: int
+    status: str
@@ -0,0 +1,223 @@
+"""
+Full-text search over play-by-play descriptions.
+
+Events are copied into an `event_search` index as they are written:
+
+- SQLite: an FTS5 virtual table (unicode61 tokenizer, diacritics folded),
+  ranked with bm25.
+- PostgreSQL: a table with a generated tsvector column and a GIN index,
+  ranked with ts_rank_cd.
+
+Each row carries the event's game, sport, team, minute and timestamp, so a
+search never joins back to play_by_play_events and archived events (see
+app/archive.py) stay searchable. On SQLite the filters are also written as
+tokens (`game12 sport3 teamA`) in an indexed `keys` column, so they are
+matched through the index rather than checked row by row. Rows are written
+in the same transaction as the event insert, correction or deletion that
+changes them.
+
+Queries match every word; a trailing `*` makes a word a prefix
+(`pen*` finds "penalty").
+
+Usage:
+    python -m app.search rebuild
+"""
+from typing import Iterable, List, Optional
+import argparse
+import re
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+SEARCH_TABLE = "event_search"
+TERM = re.compile(r"\w+\*?")
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    " description, keys, game_id UNINDEXED, sport_id UNINDEXED, team UNINDEXED,"
+    " minute UNINDEXED, created_at UNINDEXED,"
+    " tokenize = 'unicode61 remove_diacritics 2'"
+    ")",
+)
+
+POSTGRES_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    " event_id integer PRIMARY KEY,"
+    " game_id integer NOT NULL,"
+    " sport_id integer NOT NULL,"
+    " team varchar(1) NOT NULL,"
+    " minute integer NOT NULL,"
+    " description varchar NOT NULL,"
+    " created_at timestamp without time zone,"
+    " document tsvector GENERATED ALWAYS AS (to_tsvector('simple', description)) STORED"
+    ")",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING gin (document)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_game_id ON {SEARCH_TABLE} (game_id)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_sport_id ON {SEARCH_TABLE} (sport_id)",
+)
+
+
+def create_index(conn):
+    """Create the search index (tests and scratch databases; migration 0005 does this otherwise)."""
+    for statement in POSTGRES_DDL if conn.dialect.name == "postgresql" else SQLITE_DDL:
+        conn.exec_driver_sql(statement)
+
+
+def _key(conn) -> str:
+    """Column holding the event id: FTS5 rows are keyed by rowid."""
+    return "event_id" if conn.dialect.name == "postgresql" else "rowid"
+
+
+def _copy_sql(conn, source: str, where: str = "") -> str:
+    if conn.dialect.name == "postgresql":
+        columns, keys = "event_id", ""
+    else:
+        columns = "rowid, keys"
+        keys = "'game' || e.game_id || ' sport' || g.sport_id || ' team' || CAST(e.team AS VARCHAR), "
+    return (
+        f"INSERT INTO {SEARCH_TABLE} ({columns}, description, game_id, sport_id, team, minute, created_at) "
+        f"SELECT e.id, {keys}e.description, e.game_id, g.sport_id, CAST(e.team AS VARCHAR), e.minute, e.created_at "
+        f"FROM {source} e JOIN games g ON g.id = e.game_id {where}"
+    )
+
+
+def index_events(db: Session, event_ids: Iterable[int]):
+    """Add events to the index, in the caller's transaction."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+    conn = db.connection()
+    statement = text(_copy_sql(conn, "play_by_play_events", "WHERE e.id IN :ids"))
+    conn.execute(statement.bindparams(bindparam("ids", expanding=True)), {"ids": event_ids})
+
+
+def remove_events(db: Session, event_ids: Iterable[int]):
+    """Drop events from the index, in the caller's transaction."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+    conn = db.connection()
+    statement = text(f"DELETE FROM {SEARCH_TABLE} WHERE {_key(conn)} IN :ids")
+    conn.execute(statement.bindparams(bindparam("ids", expanding=True)), {"ids": event_ids})
+
+
+def reindex_events(db: Session, event_ids: Iterable[int]):
+    """Refresh corrected events."""
+    event_ids = list(event_ids)
+    remove_events(db, event_ids)
+    index_events(db, event_ids)
+
+
+def remove_games(conn, first_game_id: int, last_game_id: int):
+    """Drop every event of a range of games from the index."""
+    conn.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE game_id BETWEEN :first AND :last"),
+        {"first": first_game_id, "last": last_game_id},
+    )
+
+
+def rebuild(db: Session) -> int:
+    """Recreate the index from every event, archived ones included. Returns rows indexed."""
+    from app.archive import ARCHIVE_TABLE, has_archive
+
+    conn = db.connection()
+    create_index(conn)
+    conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    sources = ["play_by_play_events"] + ([ARCHIVE_TABLE] if has_archive(conn) else [])
+    for source in sources:
+        conn.exec_driver_sql(_copy_sql(conn, source))
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    count = conn.exec_driver_sql(f"SELECT count(*) FROM {SEARCH_TABLE}").scalar()
+    db.commit()
+    return count
+
+
+def parse_query(q: str) -> List[str]:
+    """Search terms of a query string; raises ValueError if there are none."""
+    terms = TERM.findall(q)
+    if not terms:
+        raise ValueError("Search query has no words")
+    return terms
+
+
+def _match(conn, terms: List[str], keys: List[str] = ()) -> str:
+    """
+    The backend's query syntax for 'all of these words' (terms are \\w+
+    with an optional *), plus filter tokens on SQLite.
+    """
+    if conn.dialect.name == "postgresql":
+        return " & ".join(f"{term[:-1]}:*" if term.endswith("*") else term for term in terms)
+    words = " ".join(f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"' for term in terms)
+    match = f"description : ({words})"
+    if keys:
+        match += " AND keys : (" + " ".join(f'"{key}"' for key in keys) + ")"
+    return match
+
+
+def search(
+    db: Session,
+    q: str,
+    sport_id: Optional[int] = None,
+    game_id: Optional[int] = None,
+    team: Optional[str] = None,
+    order: str = "rank",
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    """
+    Matching events, best first (order="rank") or newest first
+    (order="recent", which stops at the limit instead of scoring every match).
+    """
+    conn = db.connection()
+    params = {"limit": limit, "offset": offset}
+    filters, keys = [], []
+    for name, prefix, value in (("sport_id", "sport", sport_id), ("game_id", "game", game_id), ("team", "team", team)):
+        if value is not None:
+            filters.append(f"AND {name} = :{name}")
+            params[name] = value
+            keys.append(f"{prefix}{value}")
+    columns = "game_id, sport_id, team, minute, description, created_at"
+
+    if conn.dialect.name == "postgresql":
+        params["match"] = _match(conn, parse_query(q))
+        ordering = "score DESC, event_id DESC" if order == "rank" else "event_id DESC"
+        sql = (
+            f"SELECT event_id, {columns}, ts_rank_cd(document, query) AS score, "
+            f"ts_headline('simple', description, query, "
+            f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, HighlightAll=true') AS highlight "
+            f"FROM {SEARCH_TABLE}, to_tsquery('simple', :match) AS query "
+            f"WHERE document @@ query {' '.join(filters)} "
+            f"ORDER BY {ordering} LIMIT :limit OFFSET :offset"
+        )
+    else:
+        # Filters are part of the MATCH; keys carry no weight in the ranking
+        params["match"] = _match(conn, parse_query(q), keys)
+        ordering = "score DESC" if order == "rank" else "rowid DESC"
+        sql = (
+            f"SELECT rowid AS event_id, {columns}, -bm25({SEARCH_TABLE}, 1.0, 0.0) AS score, "
+            f"highlight({SEARCH_TABLE}, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') AS highlight "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match "
+            f"ORDER BY {ordering} LIMIT :limit OFFSET :offset"
+        )
+    return [dict(row._mapping) for row in conn.execute(text(sql), params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the event search index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="Rebuild the index from all events")
+    parser.parse_args()
+
+    from app.database import new_session
+
+    db = new_session()
+    try:
+        print(f"🔎 Indexed {rebuild(db)} events")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
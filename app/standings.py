@@ -0,0 +1,163 @@
+"""
+Per-sport standings, kept as a materialized projection.
+
+The standings table holds one row per (sport, team name). When a game
+finishes its result is applied with atomic increments; `rebuild` recomputes
+the whole table (or one sport) in a single set-based INSERT ... SELECT.
+Reads are O(teams).
+
+Usage:
+    python -m app.standings rebuild [--sport-id N]
+"""
+import argparse
+from typing import Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.archive import all_events
+
+Event = models.PlayByPlayEvent
+Game = models.Game
+Standing = models.Standing
+
+
+def game_score(db: Session, game_id: int) -> Tuple[int, int]:
+    """Total points scored by team A and team B in a game."""
+    a, b = db.query(
+        func.coalesce(func.sum(case((Event.team == models.TeamSide.A, Event.points), else_=0)), 0),
+        func.coalesce(func.sum(case((Event.team == models.TeamSide.B, Event.points), else_=0)), 0),
+    ).filter(Event.game_id == game_id).one()
+    return int(a), int(b)
+
+
+def _apply_team(db: Session, sport_id: int, team_name: str, scored: int, conceded: int):
+    """Add one result to a team's row, creating the row if needed."""
+    values = {
+        Standing.played: Standing.played + 1,
+        Standing.wins: Standing.wins + int(scored > conceded),
+        Standing.draws: Standing.draws + int(scored == conceded),
+        Standing.losses: Standing.losses + int(scored < conceded),
+        Standing.points_for: Standing.points_for + scored,
+        Standing.points_against: Standing.points_against + conceded,
+    }
+    updated = db.execute(
+        update(Standing)
+        .where(Standing.sport_id == sport_id, Standing.team_name == team_name)
+        .values(values)
+    )
+    if updated.rowcount == 0:
+        db.add(Standing(
+            sport_id=sport_id,
+            team_name=team_name,
+            played=1,
+            wins=int(scored > conceded),
+            draws=int(scored == conceded),
+            losses=int(scored < conceded),
+            points_for=scored,
+            points_against=conceded,
+        ))
+
+
+def apply_result(db: Session, game: models.Game):
+    """
+    Apply a finished game's result to its sport's standings.
+    Runs in the caller's transaction, alongside the status change.
+    """
+    score_a, score_b = game_score(db, game.id)
+    _apply_team(db, game.sport_id, game.team_a_name, score_a, score_b)
+    _apply_team(db, game.sport_id, game.team_b_name, score_b, score_a)
+    print(f"🏆 Standings updated for game {game.id}: {game.team_a_name} {score_a} - {score_b} {game.team_b_name}")
+
+
+def rebuild(db: Session, sport_id: Optional[int] = None):
+    """Recompute standings from every finished game, archived ones included, in one INSERT ... SELECT."""
+    events = all_events(db).c
+    scores = (
+        select(
+            events.game_id,
+            func.sum(case((events.team == models.TeamSide.A, events.points), else_=0)).label("a"),
+            func.sum(case((events.team == models.TeamSide.B, events.points), else_=0)).label("b"),
+        )
+        .group_by(events.game_id)
+        .subquery()
+    )
+    score_a = func.coalesce(scores.c.a, 0)
+    score_b = func.coalesce(scores.c.b, 0)
+
+    def side(team_name, scored, conceded):
+        query = (
+            select(
+                Game.sport_id.label("sport_id"),
+                team_name.label("team_name"),
+                scored.label("scored"),
+                conceded.label("conceded"),
+            )
+            .select_from(Game)
+            .outerjoin(scores, scores.c.game_id == Game.id)
+            .where(Game.status == models.GameStatus.FINISHED)
+        )
+        if sport_id is not None:
+            query = query.where(Game.sport_id == sport_id)
+        return query
+
+    results = union_all(
+        side(Game.team_a_name, score_a, score_b),
+        side(Game.team_b_name, score_b, score_a),
+    ).subquery()
+
+    totals = select(
+        results.c.sport_id,
+        results.c.team_name,
+        func.count(),
+        func.sum(case((results.c.scored > results.c.conceded, 1), else_=0)),
+        func.sum(case((results.c.scored == results.c.conceded, 1), else_=0)),
+        func.sum(case((results.c.scored < results.c.conceded, 1), else_=0)),
+        func.sum(results.c.scored),
+        func.sum(results.c.conceded),
+    ).group_by(results.c.sport_id, results.c.team_name)
+
+    clear = delete(Standing)
+    if sport_id is not None:
+        clear = clear.where(Standing.sport_id == sport_id)
+    db.execute(clear)
+    db.execute(insert(Standing).from_select(
+        ["sport_id", "team_name", "played", "wins", "draws", "losses", "points_for", "points_against"],
+        totals,
+    ))
+    db.commit()
+
+
+def get_standings(db: Session, sport_id: int):
+    """A sport's table: most wins first, then draws, then points difference."""
+    return (
+        db.query(Standing)
+        .filter(Standing.sport_id == sport_id)
+        .order_by(
+            Standing.wins.desc(),
+            Standing.draws.desc(),
+            (Standing.points_for - Standing.points_against).desc(),
+            Standing.team_name,
+        )
+        .all()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the standings projection.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--sport-id", type=int, default=None, help="Only rebuild this sport")
+    args = parser.parse_args()
+
+    from app.database import new_session
+    db = new_session()
+    try:
+        rebuild(db, args.sport_id)
+        print(f"✅ Standings rebuilt ({'all sports' if args.sport_id is None else f'sport {args.sport_id}'})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
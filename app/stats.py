@@ -0,0 +1,186 @@
+"""
+Incrementally maintained game statistics.
+
+Per-team event counts and per-minute histograms are kept in compact
+array-backed buckets. A game's stats are built once with a GROUP BY query
+and then updated by create_event as rows are inserted, so reads never
+rescan play_by_play_events.
+"""
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+import os
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.archive import all_events
+
+STATS_CACHE_SIZE = int(os.getenv("STATS_CACHE_SIZE", "10000"))
+
+TEAMS = (models.TeamSide.A, models.TeamSide.B)
+
+
+class GameStats:
+    """Per-team, per-minute event counts for one game."""
+    __slots__ = ("game_id", "counts", "buckets", "last_event_id")
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.counts = [0, 0]
+        self.buckets = [array("I"), array("I")]
+        # Highest event id already counted; older events are never counted twice
+        self.last_event_id = 0
+
+    def add(self, team: models.TeamSide, minute: int, count: int = 1):
+        """Add `count` events for a team at a minute (negative to remove)."""
+        side = TEAMS.index(team)
+        buckets = self.buckets[side]
+        if minute >= len(buckets):
+            buckets.extend([0] * (minute + 1 - len(buckets)))
+        buckets[minute] += count
+        self.counts[side] += count
+
+    def to_dict(self) -> dict:
+        """Counts, histograms and running totals, with histograms padded to the same length."""
+        minutes = max(len(b) for b in self.buckets)
+        teams = {}
+        for side, team in enumerate(TEAMS):
+            per_minute = list(self.buckets[side]) + [0] * (minutes - len(self.buckets[side]))
+            running, total = [], 0
+            for value in per_minute:
+                total += value
+                running.append(total)
+            teams[team.value] = {
+                "count": self.counts[side],
+                "per_minute": per_minute,
+                "running": running,
+            }
+        return {
+            "game_id": self.game_id,
+            "total_events": sum(self.counts),
+            "minutes": minutes,
+            "teams": teams,
+        }
+
+
+class StatsStore:
+    """Bounded LRU of GameStats, built on first read and updated on insert."""
+
+    def __init__(self, max_games: int = STATS_CACHE_SIZE):
+        self.max_games = max_games
+        self._games: "OrderedDict[int, GameStats]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, game_id: int) -> Optional[GameStats]:
+        """Return a game's stats if already built."""
+        with self._lock:
+            stats = self._games.get(game_id)
+            if stats is not None:
+                self._games.move_to_end(game_id)
+            return stats
+
+    def get_or_build(self, db: Session, game_id: int) -> GameStats:
+        """Return a game's stats, building them from the database on first use."""
+        stats = self.get(game_id)
+        if stats is None:
+            stats = self.rebuild(db, [game_id])[game_id]
+        return stats
+
+    def rebuild(self, db: Session, game_ids: Optional[Iterable[int]] = None) -> Dict[int, GameStats]:
+        """
+        Recompute stats for the given games (or every game) in one set-based
+        GROUP BY pass over hot and archived events, replacing any cached copies.
+        """
+        if game_ids is not None:
+            game_ids = list(game_ids)
+        built = self._snapshot(db, game_ids)
+        with self._lock:
+            for game_id, stats in built.items():
+                self._games[game_id] = stats
+                self._games.move_to_end(game_id)
+            # Holding the lock, so record() cannot interleave with the catch-up
+            self._catch_up(db, built)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+        return built
+
+    def _snapshot(self, db: Session, game_ids: Optional[List[int]]) -> Dict[int, GameStats]:
+        """Stats for the given games (or every game) from one GROUP BY query."""
+        Event = all_events(db, game_ids).c
+        query = db.query(
+            Event.game_id, Event.team, Event.minute, func.count(Event.id), func.max(Event.id)
+        ).group_by(Event.game_id, Event.team, Event.minute)
+
+        built: Dict[int, GameStats] = {game_id: GameStats(game_id) for game_id in game_ids or ()}
+        for game_id, team, minute, count, max_id in query:
+            stats = built.get(game_id)
+            if stats is None:
+                stats = built[game_id] = GameStats(game_id)
+            stats.add(team, minute, count)
+            stats.last_event_id = max(stats.last_event_id, max_id)
+        return built
+
+    def _catch_up(self, db: Session, built: Dict[int, GameStats]):
+        """
+        Count events committed after the snapshot query: record() found no
+        stats for them (or only the copies the snapshot replaced) and dropped
+        them. New events are only ever written to the hot table.
+        """
+        if not built:
+            return
+        Event = models.PlayByPlayEvent
+        query = db.query(Event.game_id, Event.team, Event.minute, Event.id).filter(
+            Event.game_id.in_(list(built)),
+            Event.id > min(stats.last_event_id for stats in built.values()),
+        ).order_by(Event.id)
+        for game_id, team, minute, event_id in query:
+            stats = built[game_id]
+            if event_id > stats.last_event_id:
+                stats.add(team, minute)
+                stats.last_event_id = event_id
+
+    def record(self, event: models.PlayByPlayEvent):
+        """Count a newly committed event, if its game's stats are built."""
+        with self._lock:
+            stats = self._games.get(event.game_id)
+            if stats is None or event.id <= stats.last_event_id:
+                return
+            stats.add(event.team, event.minute)
+            stats.last_event_id = event.id
+
+    def correct(self, event, old_team: models.TeamSide, old_minute: int):
+        """Move a corrected event between buckets, if it was already counted."""
+        with self._lock:
+            stats = self._games.get(event.game_id)
+            if stats is None or event.id > stats.last_event_id:
+                return
+            stats.add(old_team, old_minute, -1)
+            stats.add(event.team, event.minute)
+
+    def remove(self, event):
+        """Uncount a deleted event, if it was already counted."""
+        with self._lock:
+            stats = self._games.get(event.game_id)
+            if stats is None or event.id > stats.last_event_id:
+                return
+            stats.add(event.team, event.minute, -1)
+
+    def discard(self, game_id: int):
+        """Drop a game's stats; they are rebuilt on next use."""
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def game_ids(self) -> List[int]:
+        """Ids of every game with built stats."""
+        return list(self._games.keys())
+
+    def clear(self):
+        """Drop every game's stats."""
+        with self._lock:
+            self._games.clear()
+
+
+game_stats = StatsStore()
@@ -0,0 +1,411 @@
+"""
+Lightweight request tracing.
+
+Spans cover HTTP requests (TracingMiddleware), SQL statements (engine
+events) and WebSocket fan-out, and nest through a context variable, so
+spans started in the threadpool or in tasks created by a request join its
+trace. A sampled request's trace id is added to the events it broadcasts
+(`trace_id`), so a fan's delay can be matched to the commit, coalescing and
+send spans behind it. Incoming W3C `traceparent` headers are honoured and
+sampled responses carry one.
+
+Finished spans are queued and written by a background thread, either to
+TRACE_FILE (one JSON span per line) or to TRACE_OTLP_ENDPOINT as OTLP/HTTP
+JSON. Tracing is off unless one of them is set. TRACE_SAMPLE_RATE (0..1)
+picks the share of requests traced; unsampled requests pay one random()
+call, and the queue drops spans rather than grow when the exporter falls
+behind.
+
+Usage:
+    python -m app.tracing collect [--port 4318] [--out spans.jsonl]
+"""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+from typing import Deque, List, Optional
+import argparse
+import json
+import os
+import random
+import re
+import time
+import urllib.request
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")  # e.g. http://localhost:4318/v1/traces
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "scoreboard")
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+TRACE_EXPORT_INTERVAL_SECONDS = float(os.getenv("TRACE_EXPORT_INTERVAL_SECONDS", "1"))
+# Statements longer than this are cut in db.statement
+TRACE_SQL_MAX_CHARS = 500
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """One timed operation of a trace."""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes):
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class FileExporter:
+    """Appends spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpExporter:
+    """Posts spans to an OTLP/HTTP collector as JSON (ExportTraceServiceRequest)."""
+
+    def __init__(self, endpoint: str, service_name: str = TRACE_SERVICE_NAME, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def payload(self, spans: List[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(self.service_name)}]},
+            "scopeSpans": [{
+                "scope": {"name": "app.tracing"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                    "name": span.name,
+                    "kind": 2 if span.parent_id is None else 1,  # SERVER for roots, else INTERNAL
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def export(self, spans: List[Span]):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+class Tracer:
+    """Samples traces, tracks the current span and exports finished spans in the background."""
+
+    def __init__(self, exporter=None, sample_rate: float = TRACE_SAMPLE_RATE, max_queue: int = TRACE_QUEUE_SIZE,
+                 export_interval: float = TRACE_EXPORT_INTERVAL_SECONDS):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.export_interval = export_interval
+        self.traces = 0
+        self.exported = 0
+        self.dropped = 0
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+        self._queue: Deque[Span] = deque()
+        self._max_queue = max_queue
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current(self) -> Optional[Span]:
+        return self._current.get()
+
+    def current_trace_id(self) -> Optional[str]:
+        span = self._current.get()
+        return span.trace_id if span is not None else None
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+        """
+        A root span if this request is sampled, else None. A valid incoming
+        traceparent decides for itself (its sampled flag) and becomes the parent.
+        """
+        if not self.enabled:
+            return None
+        match = TRACEPARENT.match(traceparent) if traceparent else None
+        if match:
+            if not int(match.group(3), 16) & 1:
+                return None
+            trace_id, parent_id = match.group(1), match.group(2)
+        elif random.random() < self.sample_rate:
+            trace_id, parent_id = "%032x" % random.getrandbits(128), None
+        else:
+            return None
+        self.traces += 1
+        return Span(name, trace_id, parent_id, **attributes)
+
+    def start_span(self, name: str, **attributes) -> Optional[Span]:
+        """A child of the current span, without making it current; None outside a trace."""
+        parent = self._current.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, **attributes)
+
+    def activate(self, span: Span):
+        """Make a span current; returns the token for deactivate()."""
+        return self._current.set(span)
+
+    def deactivate(self, token):
+        self._current.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block as a child of the current span (yields None, at no cost, outside a trace)."""
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            self._current.reset(token)
+            self.end(span)
+
+    def end(self, span: Span, error: Optional[str] = None):
+        """Finish a span and queue it for export."""
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = error
+        with self._lock:
+            if len(self._queue) >= self._max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+
+    def flush(self) -> int:
+        """Export every queued span now. Returns spans exported."""
+        with self._lock:
+            spans = list(self._queue)
+            self._queue.clear()
+        if not spans or self.exporter is None:
+            return 0
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            self.dropped += len(spans)
+            print(f"❌ Trace export failed ({len(spans)} spans dropped): {e}")
+            return 0
+        self.exported += len(spans)
+        return len(spans)
+
+    def _run(self):
+        while not self._stop.wait(self.export_interval):
+            self.flush()
+        self.flush()
+
+    def start(self):
+        """Export in a background thread until stop()."""
+        if self.enabled and self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+            print(f"🔭 Tracing {self.sample_rate:.1%} of requests to {type(self.exporter).__name__}")
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "traces": self.traces,
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+        }
+
+
+def exporter_from_env():
+    if TRACE_OTLP_ENDPOINT:
+        return OtlpExporter(TRACE_OTLP_ENDPOINT)
+    if TRACE_FILE:
+        return FileExporter(TRACE_FILE)
+    return None
+
+
+tracer = Tracer(exporter_from_env())
+
+
+class TracingMiddleware:
+    """ASGI middleware: one root span per sampled HTTP request, named by route."""
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        traceparent = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"traceparent"), None)
+        span = self.tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent,
+                                       **{"http.method": scope["method"], "http.target": scope["path"]})
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                span.set(**{"http.status_code": message["status"]})
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", span.traceparent.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = self.tracer.activate(span)
+        error = None
+        try:
+            await self.app(scope, receive, traced_send)
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path}"
+                span.set(**{"http.route": route.path})
+            self.tracer.deactivate(token)
+            self.tracer.end(span, error)
+
+
+# SQL statements, as children of whatever span is current (requests run
+# sync endpoints in the threadpool with their context copied)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.start_span("db.query")
+    if span is not None:
+        span.set(**{
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:TRACE_SQL_MAX_CHARS],
+            "db.executemany": executemany,
+        })
+    if context is not None:
+        context._trace_span = span
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set(**{"db.rowcount": cursor.rowcount})
+        tracer.end(span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        tracer.end(span, repr(exception_context.original_exception))
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    out: Optional[str] = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        lines = []
+        for resource in body.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for span in scope.get("spans", []):
+                    lines.append(json.dumps(span) + "\n")
+        if self.out:
+            with open(self.out, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                span = json.loads(line)
+                duration = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                print(f"{span['traceId'][:8]} {span['name']:40} {duration:9.3f} ms")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    collect = commands.add_parser("collect", help="Run a stand-in OTLP/HTTP JSON collector")
+    collect.add_argument("--port", type=int, default=4318)
+    collect.add_argument("--out", help="Append received spans here (default: print them)")
+    args = parser.parse_args()
+
+    _CollectorHandler.out = args.out
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), _CollectorHandler)
+    print(f"🔭 Collecting OTLP spans on http://127.0.0.1:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
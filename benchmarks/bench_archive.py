@@ -0,0 +1,175 @@
+"""
+Benchmark: event insert and lookup latency on a large play_by_play_events
+table, before and after archiving old games, and live insert latency while
+the archive job runs.
+
+Usage:
+    python benchmarks/bench_archive.py [--rows 1000000] [--events-per-game 200] [--old 0.9]
+
+    # The 100M-row run, on PostgreSQL
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/bench_archive.py --rows 100000000
+
+Uses a temporary SQLite file by default. On PostgreSQL, point
+BENCH_DATABASE_URL at an empty database migrated with `alembic upgrade head`
+(the partitioned archive table comes from the migration). Rows are generated
+in the database itself, so loading 100M rows takes minutes, not hours.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import archive, models
+from app.database import Base
+from app.search import create_index
+
+Event = models.PlayByPlayEvent.__table__
+
+SQLITE_SERIES = "WITH RECURSIVE series(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM series WHERE n < :count - 1)"
+POSTGRES_SERIES = "generate_series(0, :count - 1) AS series(n)"
+
+
+def generate(conn, insert_sql, select_sql, count, **params):
+    """INSERT ... SELECT over n = 0..count-1, generated by the database."""
+    if conn.dialect.name == "postgresql":
+        sql = f"{insert_sql} SELECT {select_sql} FROM {POSTGRES_SERIES}"
+    else:
+        sql = f"{SQLITE_SERIES} {insert_sql} SELECT {select_sql} FROM series"
+    conn.execute(text(sql), {"count": count, **params})
+
+
+def load(engine, rows, per_game, old_fraction):
+    """Create one sport, rows / per_game games and their events. Returns (old ids, live ids)."""
+    games = max(2, rows // per_game)
+    old = int(games * old_fraction)
+    team = "CAST(CASE WHEN n % 2 = 0 THEN 'A' ELSE 'B' END AS teamside)" \
+        if engine.dialect.name == "postgresql" else "CASE WHEN n % 2 = 0 THEN 'A' ELSE 'B' END"
+    with engine.begin() as conn:
+        slug = f"bench-{time.time()}"
+        sport_id = conn.execute(insert(models.Sport.__table__).values(name=slug, slug=slug)).inserted_primary_key[0]
+        base = (conn.execute(select(func.max(models.Game.id))).scalar() or 0) + 1
+        generate(
+            conn,
+            "INSERT INTO games (id, sport_id, team_a_name, team_b_name, status, start_time, created_at)",
+            "n + :base, :sport_id, 'A', 'B', "
+            "CASE WHEN n < :old THEN 'FINISHED' ELSE 'LIVE' END, "
+            "CASE WHEN n < :old THEN :last_season ELSE :now END, :now",
+            games, base=base, sport_id=sport_id, old=old,
+            last_season=datetime(2020, 1, 1), now=datetime.utcnow(),
+        )
+        generate(
+            conn,
+            "INSERT INTO play_by_play_events (game_id, team, minute, description, points, created_at)",
+            f"n / :per_game + :base, {team}, n % 90, 'Event', 0, :now",
+            games * per_game, per_game=per_game, base=base, now=datetime.utcnow(),
+        )
+    return list(range(base, base + old)), list(range(base + old, base + games))
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+    return f"p50 {pick(50):.2f} ms, p99 {pick(99):.2f} ms, max {ordered[-1] * 1000:.2f} ms"
+
+
+def insert_latency(engine, live_ids, samples):
+    """Single-event insert + commit into random live games."""
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(Event).values(
+                game_id=random.choice(live_ids), team=models.TeamSide.A, minute=i % 90,
+                description="Bench", points=0, created_at=datetime.utcnow(),
+            ))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def lookup_latency(engine, table, game_ids, samples):
+    """History of a random game, as GET /games/{game_id} reads it."""
+    query = select(table.c.id, table.c.team, table.c.minute, table.c.description) \
+        .where(table.c.game_id == bindparam("game_id")).order_by(table.c.created_at, table.c.id)
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(samples):
+            start = time.perf_counter()
+            conn.execute(query, {"game_id": random.choice(game_ids)}).fetchall()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def hot_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Event)).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Events to generate")
+    parser.add_argument("--events-per-game", type=int, default=200)
+    parser.add_argument("--old", type=float, default=0.9, help="Fraction of games finished in a past season")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--batch-events", type=int, default=archive.ARCHIVE_BATCH_EVENTS)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 60})
+    else:
+        engine = create_engine(url, pool_size=5)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        create_index(conn)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    start = time.perf_counter()
+    old_ids, live_ids = load(engine, args.rows, args.events_per_game, args.old)
+    print(f"Loaded {hot_rows(engine)} events for {len(old_ids) + len(live_ids)} games "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    print("\nBefore archiving")
+    print(f"  insert:           {percentiles(insert_latency(engine, live_ids, args.samples))}")
+    print(f"  lookup (live):    {percentiles(lookup_latency(engine, Event, live_ids, args.samples))}")
+    print(f"  lookup (old):     {percentiles(lookup_latency(engine, Event, old_ids, args.samples))}")
+
+    # Live writes keep going while the job runs
+    concurrent, done = [], threading.Event()
+
+    def writer():
+        while not done.is_set():
+            concurrent.extend(insert_latency(engine, live_ids, 10))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    db = sessionmaker(bind=engine)()
+    try:
+        totals = archive.archive_finished(db, datetime(2021, 1, 1), args.batch_events)
+    finally:
+        db.close()
+        done.set()
+        thread.join()
+    print(f"\nArchived {totals['events']} events of {totals['games']} games in {totals['batches']} batches "
+          f"({totals['events'] / max(totals['seconds'], 1e-9):,.0f} events/s)")
+    if concurrent:
+        print(f"  insert during archiving: {percentiles(concurrent)} ({len(concurrent)} inserts)")
+
+    print(f"\nAfter archiving ({hot_rows(engine)} events in the hot table)")
+    print(f"  insert:           {percentiles(insert_latency(engine, live_ids, args.samples))}")
+    print(f"  lookup (live):    {percentiles(lookup_latency(engine, Event, live_ids, args.samples))}")
+    print(f"  lookup (archive): {percentiles(lookup_latency(engine, archive.archived_events, old_ids, args.samples))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: loading a competition through per-record POSTs vs one streamed
+POST /import, and streaming it back out with GET /export.
+
+Usage:
+    python benchmarks/bench_bulk.py [--games 200] [--events-per-game 200] [--single-games 10]
+
+Per-record requests go through the ASGI app in-process. The import and
+export run the endpoints' streaming pipeline directly (the test client
+buffers whole bodies), with peak memory traced by tracemalloc; it should stay
+flat as --games grows. Uses a temporary SQLite file by default; set
+BENCH_DATABASE_URL to an empty PostgreSQL database migrated with
+`alembic upgrade head` to run there.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import bulk
+from app.database import Base, get_db
+from app.main import app
+from app.search import create_index
+
+
+def records(prefix, games, per_game):
+    """Generate one sport's import records without holding them in memory."""
+    yield {"type": "sport", "name": f"Bench {prefix}", "slug": f"bench-{prefix}"}
+    for g in range(games):
+        yield {"type": "game", "ref": f"g{g}", "sport": f"bench-{prefix}",
+               "team_a_name": f"Home {g}", "team_b_name": f"Away {g}", "status": "Live"}
+        for e in range(per_game):
+            yield {"type": "event", "game": f"g{g}", "team": "A" if e % 2 else "B",
+                   "minute": e % 90, "description": f"Event {e} of game {g}", "points": e % 3 == 0}
+
+
+async def body(prefix, games, per_game, chunk_bytes=65536):
+    """NDJSON request body as a stream of chunks, as request.stream() yields them."""
+    pending = b""
+    for record in records(prefix, games, per_game):
+        pending += (json.dumps(record) + "\n").encode()
+        if len(pending) >= chunk_bytes:
+            yield pending[:chunk_bytes]
+            pending = pending[chunk_bytes:]
+    yield pending
+
+
+async def import_stream(db, chunks):
+    """What POST /import does with a request body."""
+    importer = bulk.Importer(db)
+    async for line, record in bulk.ndjson_records(bulk.read_lines(chunks)):
+        if importer.add(line, record):
+            importer.flush()
+    return importer.finish()
+
+
+def one_by_one(client, games, per_game):
+    """The old way: one request (and one commit) per sport, game and event."""
+    slug = f"single-{time.time()}"
+    sport_id = client.post("/sports", json={"name": slug, "slug": slug}).json()["id"]
+    start = time.perf_counter()
+    for g in range(games):
+        game_id = client.post("/games", json={
+            "sport_id": sport_id, "team_a_name": f"Home {g}", "team_b_name": f"Away {g}", "status": "Live"
+        }).json()["id"]
+        for e in range(per_game):
+            client.post(f"/games/{game_id}/events", json={
+                "team": "A" if e % 2 else "B", "minute": e % 90, "description": f"Event {e} of game {g}"
+            })
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--events-per-game", type=int, default=200)
+    parser.add_argument("--single-games", type=int, default=10, help="Games loaded one request at a time")
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    if url.startswith("sqlite"):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            create_index(conn)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    rows = args.single_games * (args.events_per_game + 1)
+    seconds = one_by_one(client, args.single_games, args.events_per_game)
+    print(f"\nOne request per record: {rows} records in {seconds:.1f} s ({rows / seconds:,.0f} records/s)")
+
+    rows = 1 + args.games * (args.events_per_game + 1)
+    tracemalloc.start()
+    start = time.perf_counter()
+    db = factory()
+    result = asyncio.run(import_stream(db, body(time.time(), args.games, args.events_per_game)))
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Streamed import:        {rows} records in {seconds:.1f} s ({rows / seconds:,.0f} records/s), "
+          f"{result['batches']} batches, peak {peak / 2**20:.1f} MiB traced")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    exported = sum(chunk.count(b"\n") for chunk in bulk.export_stream(db))
+    db.close()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Streamed export:        {exported} records in {seconds:.1f} s ({exported / seconds:,.0f} records/s), "
+          f"peak {peak / 2**20:.1f} MiB traced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: per-request commit vs group-commit event inserts.
+
+Usage:
+    python benchmarks/bench_group_commit.py [--events 2000] [--concurrency 100]
+
+Uses a temporary SQLite file by default; set BENCH_DATABASE_URL to run
+against PostgreSQL (tables are created if missing).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.database import Base
+from app.ingest import EventBatcher
+from app.search import create_index
+
+
+def make_session_factory(url):
+    """Create tables and return a session factory for the benchmark database."""
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url, pool_size=20, max_overflow=80)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        create_index(conn)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def create_game(session_factory):
+    """Create a sport and game to attach events to."""
+    session = session_factory()
+    try:
+        sport = models.Sport(name=f"Bench {time.time()}", slug=f"bench-{time.time()}")
+        session.add(sport)
+        session.commit()
+        game = models.Game(sport_id=sport.id, team_a_name="A", team_b_name="B")
+        session.add(game)
+        session.commit()
+        return game.id
+    finally:
+        session.close()
+
+
+def insert_one(session_factory, game_id, i):
+    """The per-request path: one session, one commit, one refresh."""
+    session = session_factory()
+    try:
+        event = models.PlayByPlayEvent(
+            game_id=game_id, team=models.TeamSide.A, minute=i % 90, description=f"Event {i}"
+        )
+        session.add(event)
+        session.commit()
+        session.refresh(event)
+        return event.id
+    finally:
+        session.close()
+
+
+async def run_clients(total, concurrency, submit):
+    """Run `total` inserts from `concurrency` concurrent clients."""
+    per_client = total // concurrency
+
+    async def client(c):
+        for i in range(per_client):
+            await submit(c * per_client + i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(c) for c in range(concurrency)])
+    return per_client * concurrency, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-events", type=int, default=100)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    session_factory = make_session_factory(url)
+    game_id = create_game(session_factory)
+    print(f"Database: {url}")
+
+    count, elapsed = await run_clients(
+        args.events, args.concurrency,
+        lambda i: run_in_threadpool(insert_one, session_factory, game_id, i),
+    )
+    print(f"per-request commit: {count} events in {elapsed:.2f}s = {count / elapsed:,.0f} events/s")
+
+    batcher = EventBatcher(session_factory, args.window_ms, args.max_events)
+    count, elapsed = await run_clients(
+        args.events, args.concurrency,
+        lambda i: batcher.submit(
+            game_id=game_id, team=models.TeamSide.A, minute=i % 90, description=f"Event {i}"
+        ),
+    )
+    print(f"group commit:       {count} events in {elapsed:.2f}s = {count / elapsed:,.0f} events/s "
+          f"({batcher.batches_flushed} commits, {count / batcher.batches_flushed:.1f} events/commit)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark: a sport page showing every live game's score and latest event,
+as N+1 requests (list, then GET /games/{id} per game) vs one listing with
+?include=score,last_event.
+
+Usage:
+    python benchmarks/bench_listing.py [--games 200] [--events-per-game 200] [--finished 5000]
+
+Requests go through the ASGI app in-process against a temporary SQLite file
+(or BENCH_DATABASE_URL, migrated with `alembic upgrade head`). Games are
+read from the database, not the live-state store, as on a cold worker.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import finished_games, game_bodies
+from app.database import Base, get_db
+from app.live_state import live_games
+from app.main import app
+from app.search import create_index
+
+SERIES = "WITH RECURSIVE series(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM series WHERE n < :count - 1)"
+
+
+def load(engine, live, per_game, finished):
+    """One sport with `finished` past games and `live` live games with events."""
+    with engine.begin() as conn:
+        slug = f"bench-{time.time()}"
+        sport_id = conn.execute(text("INSERT INTO sports (name, slug) VALUES (:s, :s) RETURNING id"),
+                                {"s": slug}).scalar()
+        base = (conn.execute(text("SELECT max(id) FROM games")).scalar() or 0) + 1
+        now = datetime.utcnow()
+        conn.execute(text(
+            f"{SERIES} INSERT INTO games (id, sport_id, team_a_name, team_b_name, status, start_time, created_at) "
+            f"SELECT n + :base, :sport_id, 'Home', 'Away', CASE WHEN n < :finished THEN 'FINISHED' ELSE 'LIVE' END, "
+            f":now, :now FROM series"
+        ), {"count": finished + live, "base": base, "sport_id": sport_id, "finished": finished, "now": now})
+        conn.execute(text(
+            f"{SERIES} INSERT INTO play_by_play_events (game_id, team, minute, description, points, created_at) "
+            f"SELECT n / :per_game + :first, CASE WHEN n % 2 = 0 THEN 'A' ELSE 'B' END, n % 90, "
+            f"'Event ' || n, n % 3 = 0, :now FROM series"
+        ), {"count": live * per_game, "per_game": per_game, "first": base + finished, "now": now})
+    return sport_id
+
+
+def timed(engine, runs, request):
+    """Median latency and SQL statements per run."""
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(engine, "before_cursor_execute", listener)
+    timings = []
+    for _ in range(runs):
+        finished_games.clear()
+        game_bodies.clear()
+        live_games.clear()
+        start = time.perf_counter()
+        request()
+        timings.append(time.perf_counter() - start)
+    event.remove(engine, "before_cursor_execute", listener)
+    return sorted(timings)[len(timings) // 2] * 1000, len(statements) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=200, help="Live games on the page")
+    parser.add_argument("--events-per-game", type=int, default=200)
+    parser.add_argument("--finished", type=int, default=5000, help="Past games of the same sport")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    if url.startswith("sqlite"):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            create_index(conn)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    sport_id = load(engine, args.games, args.events_per_game, args.finished)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"{args.games} live games x {args.events_per_game} events, {args.finished} finished games\n")
+
+    def n_plus_one():
+        for game in client.get(f"/sports/{sport_id}/games", params={"status": "Live"}).json():
+            client.get(f"/games/{game['id']}")
+
+    def embedded():
+        client.get(f"/sports/{sport_id}/games", params={"status": "Live", "include": "score,last_event"})
+
+    for name, request in (("list + GET per game", n_plus_one), ("include=score,last_event", embedded)):
+        ms, statements = timed(engine, args.runs, request)
+        print(f"  {name:26} p50 {ms:8.1f} ms, {statements:.0f} SQL statements")
+
+
+if __name__ == "__main__":
+    main()
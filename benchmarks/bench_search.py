@@ -0,0 +1,101 @@
+"""
+Benchmark: full-text event search latency on a large index.
+
+Usage:
+    python benchmarks/bench_search.py [--rows 1000000] [--samples 200]
+
+    # Tens of millions of events, on PostgreSQL
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/bench_search.py --rows 30000000
+
+Fills event_search directly with generated descriptions (rows are produced
+by the database), then times GET /search/events queries of different
+selectivity: a player's name (rare), a common word ranked by relevance, the
+same word newest-first, and a word within one game. Uses a temporary SQLite
+file by default; on PostgreSQL use an empty database migrated with
+`alembic upgrade head`.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import search
+
+WORDS = ("penalty", "corner", "goal", "foul", "offside", "substitution", "header")
+PLAYERS = 50000
+EVENTS_PER_GAME = 200
+
+
+def load(engine, rows):
+    """Generate rows events: '<word> by player<k> minute <m>'."""
+    words = " ".join(f"WHEN {i} THEN '{word}'" for i, word in enumerate(WORDS))
+    description = f"(CASE n % {len(WORDS)} {words} END) || ' by player' || (n % {PLAYERS}) || ' minute ' || (n % 90)"
+    game, sport = f"n / {EVENTS_PER_GAME} + 1", f"n / {EVENTS_PER_GAME * 100} + 1"
+    team = "CASE WHEN n % 2 = 0 THEN 'A' ELSE 'B' END"
+    with engine.begin() as conn:
+        search.create_index(conn)
+        if conn.dialect.name == "postgresql":
+            insert_sql = "INSERT INTO event_search (event_id, description, game_id, sport_id, team, minute, created_at)"
+            select_sql = f"n + 1, {description}, {game}, {sport}, {team}, n % 90, NULL"
+        else:
+            insert_sql = "INSERT INTO event_search (rowid, description, keys, game_id, sport_id, team, minute, created_at)"
+            keys = f"'game' || ({game}) || ' sport' || ({sport}) || ' team' || {team}"
+            select_sql = f"n + 1, {description}, {keys}, {game}, {sport}, {team}, n % 90, NULL"
+        if conn.dialect.name == "postgresql":
+            sql = f"{insert_sql} SELECT {select_sql} FROM generate_series(0, :count - 1) AS series(n)"
+        else:
+            sql = (f"WITH RECURSIVE series(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM series WHERE n < :count - 1) "
+                   f"{insert_sql} SELECT {select_sql} FROM series")
+        conn.execute(text(sql), {"count": rows})
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("INSERT INTO event_search(event_search) VALUES ('optimize')")
+        else:
+            conn.exec_driver_sql("ANALYZE event_search")
+
+
+def timed(db, samples, make_params):
+    timings, hits = [], 0
+    for _ in range(samples):
+        params = make_params()
+        start = time.perf_counter()
+        hits += len(search.search(db, **params))
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    pick = lambda p: timings[min(len(timings) - 1, int(len(timings) * p / 100))] * 1000
+    return f"p50 {pick(50):.2f} ms, p99 {pick(99):.2f} ms ({hits / samples:.1f} hits/query)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_engine(url)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    start = time.perf_counter()
+    load(engine, args.rows)
+    print(f"Indexed {args.rows} events in {time.perf_counter() - start:.1f} s\n")
+
+    games = max(1, args.rows // EVENTS_PER_GAME)
+    db = sessionmaker(bind=engine)()
+    try:
+        print(f"player name:          {timed(db, args.samples, lambda: {'q': f'player{random.randrange(PLAYERS)}'})}")
+        print(f"common word, ranked:  {timed(db, args.samples, lambda: {'q': random.choice(WORDS)})}")
+        print(f"common word, recent:  {timed(db, args.samples, lambda: {'q': random.choice(WORDS), 'order': 'recent'})}")
+        print(f"word within one game: {timed(db, args.samples, lambda: {'q': random.choice(WORDS), 'game_id': random.randrange(1, games + 1)})}")
+        print(f"two words:            {timed(db, args.samples, lambda: {'q': f'{random.choice(WORDS)} player{random.randrange(PLAYERS)}'})}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: cold start, from interpreter start to the first served request.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10]
+
+Each run is a fresh interpreter that imports app.main, runs the lifespan
+startup (schema check) and serves GET /. A temporary SQLite database is
+migrated once up front.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/")
+served = time.perf_counter()
+print(f"{imported - start:.6f} {served - start:.6f}")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT, env=env, check=True, capture_output=True,
+    )
+
+    imports, firsts = [], []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+        ).stdout.split()
+        imports.append(float(out[-2]))
+        firsts.append(float(out[-1]))
+
+    print(f"import app.main:        median {statistics.median(imports) * 1000:.1f} ms")
+    print(f"import to first request: median {statistics.median(firsts) * 1000:.1f} ms "
+          f"(min {min(firsts) * 1000:.1f}, max {max(firsts) * 1000:.1f}) over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Replay recorded games against a running server, for matchday rehearsals.
+
+Usage:
+    # Record a finished game's events as JSONL
+    python benchmarks/replay.py export GAME_ID [GAME_ID ...] > matchday.jsonl
+
+    # Replay it 200 times concurrently at 10x speed with 20 viewers per game
+    python benchmarks/replay.py run matchday.jsonl --copies 200 --speed 10 --viewers 20
+
+    # Or replay straight from the database
+    python benchmarks/replay.py run --from-db 12 13 --speed 60
+
+Each replay creates a fresh game on the target server, sets it Live, posts
+the recorded events to POST /games/{game_id}/events with their original
+spacing (divided by --speed), then finishes it. Simulated viewers hold a
+WebSocket per game; the time from starting an event's POST to each viewer
+receiving it is reported as ingest-to-delivery latency.
+
+JSONL lines hold `game_id`, `team`, `minute`, `description` and optionally
+`points` and `created_at` (ISO 8601). Without timestamps, events are spaced
+by their minute. Start the server with WS_IP_CONNECT_RATE / _BURST raised
+when running many viewers from one machine; rejected viewers retry after the
+server's retry_after_ms.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import websockets
+
+def export_games(game_ids):
+    """Write the events of the given games to stdout as JSONL, in id order."""
+    from app import models
+    from app.database import new_session
+
+    db = new_session()
+    try:
+        events = (
+            db.query(models.PlayByPlayEvent)
+            .filter(models.PlayByPlayEvent.game_id.in_(game_ids))
+            .order_by(models.PlayByPlayEvent.game_id, models.PlayByPlayEvent.id)
+        )
+        for event in events:
+            print(json.dumps({
+                "game_id": event.game_id,
+                "team": event.team.value,
+                "minute": event.minute,
+                "description": event.description,
+                "points": event.points,
+                "created_at": event.created_at.isoformat() if event.created_at else None,
+            }))
+    finally:
+        db.close()
+
+
+def load_jsonl(path):
+    """Recorded games from a JSONL file: game_id -> list of event dicts."""
+    games = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                games[record.get("game_id", 0)].append(record)
+    return dict(games)
+
+
+def load_db(game_ids):
+    """Recorded games read directly from play_by_play_events."""
+    from app import models
+    from app.database import new_session
+
+    db = new_session()
+    try:
+        games = defaultdict(list)
+        events = (
+            db.query(models.PlayByPlayEvent)
+            .filter(models.PlayByPlayEvent.game_id.in_(game_ids))
+            .order_by(models.PlayByPlayEvent.id)
+        )
+        for event in events:
+            games[event.game_id].append({
+                "team": event.team.value,
+                "minute": event.minute,
+                "description": event.description,
+                "points": event.points,
+                "created_at": event.created_at.isoformat() if event.created_at else None,
+            })
+        return dict(games)
+    finally:
+        db.close()
+
+
+def schedule(events, speed):
+    """Offsets in seconds from the start of the replay, one per event."""
+    stamps = [e.get("created_at") for e in events]
+    if all(stamps):
+        times = [datetime.fromisoformat(s).timestamp() for s in stamps]
+    else:
+        times = [e["minute"] * 60.0 for e in events]
+    start = times[0] if times else 0.0
+    return [max(0.0, t - start) / speed for t in times]
+
+
+def fan_out(recordings, copies):
+    """The games to replay: every recording `copies` times, interleaved."""
+    return [recordings[i % len(recordings)] for i in range(copies * len(recordings))]
+
+
+class Results:
+    """Timings collected across every replayed game."""
+
+    def __init__(self):
+        self.sent_at = {}             # event_id -> perf_counter when its POST started
+        self.ingest = []              # POST round trips, seconds
+        self.received = defaultdict(list)  # event_id -> perf_counter per viewer
+        self.expected = 0             # deliveries expected: events x viewers of their game
+        self.errors = 0
+        self.viewers = 0
+
+    def report(self, elapsed):
+        latencies = sorted(
+            t - self.sent_at[event_id]
+            for event_id, stamps in self.received.items() if event_id in self.sent_at
+            for t in stamps
+        )
+        print(f"events posted:      {len(self.sent_at)} ({self.errors} errors) in {elapsed:.1f} s")
+        if self.ingest:
+            ingest = sorted(self.ingest)
+            print(f"ingest (POST):      p50 {percentile(ingest, 50):.1f} ms, "
+                  f"p99 {percentile(ingest, 99):.1f} ms")
+        print(f"viewers:            {self.viewers}, deliveries {len(latencies)}/{self.expected}")
+        if latencies:
+            print(f"ingest-to-delivery: p50 {percentile(latencies, 50):.1f} ms, "
+                  f"p95 {percentile(latencies, 95):.1f} ms, p99 {percentile(latencies, 99):.1f} ms, "
+                  f"max {latencies[-1] * 1000:.1f} ms, mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+def percentile(ordered, p):
+    """Percentile of sorted seconds, in milliseconds."""
+    index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+    return ordered[index] * 1000
+
+
+async def view(url, results, ready, done):
+    """Hold one WebSocket, recording when each event arrives."""
+    while True:
+        try:
+            async with websockets.connect(url, max_queue=None) as ws:
+                async for raw in ws:
+                    now = time.perf_counter()
+                    message = json.loads(raw)
+                    kind = message.get("type", "event")
+                    if kind == "connection_established":
+                        results.viewers += 1
+                        ready.set()
+                    elif kind == "event":
+                        results.received[message["event_id"]].append(now)
+                    elif kind == "event_batch":
+                        for event in message["events"]:
+                            results.received[event["event_id"]].append(now)
+                ready.set()
+                return
+        except websockets.ConnectionClosed as e:
+            reason = e.rcvd.reason if e.rcvd else ""
+            if done.is_set() or not reason.startswith("retry_after_ms="):
+                ready.set()
+                return
+            # Rejected by admission control: back off as instructed
+            await asyncio.sleep(int(reason.split("=", 1)[1]) / 1000)
+        except (OSError, websockets.InvalidHandshake) as e:
+            print(f"❌ Viewer failed to connect: {e}")
+            ready.set()
+            return
+
+
+async def replay_game(client, base_url, sport_id, events, speed, viewers, results):
+    """Create a game, replay events into it with viewers attached, then finish it."""
+    game = (await client.post("/games", json={
+        "sport_id": sport_id, "team_a_name": "Home", "team_b_name": "Away"
+    })).json()
+    game_id = game["id"]
+    await client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+
+    ws_url = base_url.replace("http", "ws", 1) + f"/ws/games/{game_id}"
+    done = asyncio.Event()
+    readies = [asyncio.Event() for _ in range(viewers)]
+    tasks = [asyncio.create_task(view(ws_url, results, ready, done)) for ready in readies]
+    for ready in readies:
+        await ready.wait()
+
+    start = time.perf_counter()
+    for offset, event in zip(schedule(events, speed), events):
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent = time.perf_counter()
+        response = await client.post(f"/games/{game_id}/events", json={
+            "team": event["team"],
+            "minute": event["minute"],
+            "description": event["description"],
+            "points": event.get("points", 0),
+        })
+        if response.status_code != 201:
+            results.errors += 1
+            continue
+        results.ingest.append(time.perf_counter() - sent)
+        results.sent_at[response.json()["id"]] = sent
+        results.expected += viewers
+
+    done.set()
+    # Finishing closes the viewers' sockets
+    await client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+    await asyncio.gather(*tasks)
+
+
+async def run(args):
+    games = load_db(args.from_db) if args.from_db else load_jsonl(args.file)
+    if not games:
+        sys.exit("No recorded events to replay")
+    recordings = list(games.values())
+
+    results = Results()
+    limits = httpx.Limits(max_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        slug = f"replay-{int(time.time())}"
+        sport = (await client.post("/sports", json={"name": slug, "slug": slug})).json()
+        replays = fan_out(recordings, args.copies)
+        print(f"Replaying {len(replays)} games at {args.speed}x with {args.viewers} viewers each")
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            replay_game(client, args.url, sport["id"], events, args.speed, args.viewers, results)
+            for events in replays
+        ))
+        elapsed = time.perf_counter() - start
+    results.report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Write recorded games as JSONL")
+    export.add_argument("game_ids", type=int, nargs="+")
+
+    replay = commands.add_parser("run", help="Replay recorded games against a server")
+    replay.add_argument("file", nargs="?", help="JSONL recording")
+    replay.add_argument("--from-db", type=int, nargs="+", metavar="GAME_ID",
+                        help="Read the recording from play_by_play_events instead")
+    replay.add_argument("--url", default="http://127.0.0.1:8000")
+    replay.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    replay.add_argument("--copies", type=int, default=1, help="Concurrent replays of each recorded game")
+    replay.add_argument("--viewers", type=int, default=0, help="WebSocket viewers per replayed game")
+    replay.add_argument("--max-connections", type=int, default=200, help="HTTP connection pool size")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_games(args.game_ids)
+    else:
+        if not args.file and not args.from_db:
+            parser.error("run needs a JSONL file or --from-db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Initial schema: sports, games and play-by-play events.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations (via init_db) already match this
+revision; mark them with `alembic stamp 0001`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sports",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("slug", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+        sa.UniqueConstraint("slug"),
+    )
+    op.create_index("ix_sports_id", "sports", ["id"])
+
+    op.create_table(
+        "games",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sport_id", sa.Integer(), nullable=False),
+        sa.Column("team_a_name", sa.String(), nullable=False),
+        sa.Column("team_b_name", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("SCHEDULED", "LIVE", "FINISHED", name="gamestatus"),
+            nullable=False,
+        ),
+        sa.Column("start_time", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["sport_id"], ["sports.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_games_id", "games", ["id"])
+
+    op.create_table(
+        "play_by_play_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_id", sa.Integer(), nullable=False),
+        sa.Column("team", sa.Enum("A", "B", name="teamside"), nullable=False),
+        sa.Column("minute", sa.Integer(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["game_id"], ["games.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_play_by_play_events_id", "play_by_play_events", ["id"])
+    op.create_index("ix_play_by_play_events_created_at", "play_by_play_events", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_play_by_play_events_created_at", table_name="play_by_play_events")
+    op.drop_index("ix_play_by_play_events_id", table_name="play_by_play_events")
+    op.drop_table("play_by_play_events")
+    op.drop_index("ix_games_id", table_name="games")
+    op.drop_table("games")
+    op.drop_index("ix_sports_id", table_name="sports")
+    op.drop_table("sports")
+    sa.Enum(name="teamside").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="gamestatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,41 @@
+"""Event points and per-sport standings.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+After upgrading an existing database, fill the standings table with
+`python -m app.standings rebuild`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("play_by_play_events") as batch_op:
+        batch_op.add_column(sa.Column("points", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "standings",
+        sa.Column("sport_id", sa.Integer(), nullable=False),
+        sa.Column("team_name", sa.String(), nullable=False),
+        sa.Column("played", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("draws", sa.Integer(), nullable=False),
+        sa.Column("losses", sa.Integer(), nullable=False),
+        sa.Column("points_for", sa.Integer(), nullable=False),
+        sa.Column("points_against", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["sport_id"], ["sports.id"]),
+        sa.PrimaryKeyConstraint("sport_id", "team_name"),
+    )
+
+
+def downgrade():
+    op.drop_table("standings")
+    with op.batch_alter_table("play_by_play_events") as batch_op:
+        batch_op.drop_column("points")
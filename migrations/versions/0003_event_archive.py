@@ -0,0 +1,57 @@
+"""Event retention: game_id index, archived flag and the events archive.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+On PostgreSQL this creates play_by_play_events_archive partitioned by
+game_id range; partitions are added by app/archive.py as games are archived.
+On SQLite the archive is a set of range tables created on demand behind a
+view of the same name, so nothing is created here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_play_by_play_events_game_id", "play_by_play_events", ["game_id"])
+    with op.batch_alter_table("games") as batch_op:
+        batch_op.add_column(sa.Column("archived_at", sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE play_by_play_events_archive ("
+            " id integer NOT NULL,"
+            " game_id integer NOT NULL,"
+            " team teamside NOT NULL,"
+            " minute integer NOT NULL,"
+            " description varchar NOT NULL,"
+            " points integer NOT NULL DEFAULT 0,"
+            " created_at timestamp without time zone"
+            ") PARTITION BY RANGE (game_id)"
+        )
+        op.execute(
+            "CREATE INDEX ix_play_by_play_events_archive_game_id "
+            "ON play_by_play_events_archive (game_id, id)"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Partitions go with their parent
+        op.execute("DROP TABLE IF EXISTS play_by_play_events_archive CASCADE")
+    else:
+        op.execute("DROP VIEW IF EXISTS play_by_play_events_archive")
+        for name in sa.inspect(bind).get_table_names():
+            if name.startswith("play_by_play_events_archive_"):
+                op.drop_table(name)
+
+    with op.batch_alter_table("games") as batch_op:
+        batch_op.drop_column("archived_at")
+    op.drop_index("ix_play_by_play_events_game_id", table_name="play_by_play_events")
@@ -0,0 +1,20 @@
+"""Index scheduled games by start time for the kickoff scheduler.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_games_status_start_time", "games", ["status", "start_time"])
+
+
+def downgrade():
+    op.drop_index("ix_games_status_start_time", table_name="games")
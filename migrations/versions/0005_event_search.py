@@ -0,0 +1,60 @@
+"""Full-text search index over event descriptions.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Creates event_search: an FTS5 table on SQLite, a tsvector table with a GIN
+index on PostgreSQL. After upgrading an existing database, fill it with
+`python -m app.search rebuild`.
+
+On SQLite, play_by_play_events is also rebuilt with AUTOINCREMENT: event
+ids key the search index (and Last-Event-ID), and without it SQLite reuses
+the ids of archived events once the newest rows have left the table.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE event_search ("
+            " event_id integer PRIMARY KEY,"
+            " game_id integer NOT NULL,"
+            " sport_id integer NOT NULL,"
+            " team varchar(1) NOT NULL,"
+            " minute integer NOT NULL,"
+            " description varchar NOT NULL,"
+            " created_at timestamp without time zone,"
+            " document tsvector GENERATED ALWAYS AS (to_tsvector('simple', description)) STORED"
+            ")"
+        )
+        op.execute("CREATE INDEX ix_event_search_document ON event_search USING gin (document)")
+        op.execute("CREATE INDEX ix_event_search_game_id ON event_search (game_id)")
+        op.execute("CREATE INDEX ix_event_search_sport_id ON event_search (sport_id)")
+    else:
+        with op.batch_alter_table(
+            "play_by_play_events", recreate="always", table_kwargs={"sqlite_autoincrement": True}
+        ):
+            pass
+        op.execute(
+            "CREATE VIRTUAL TABLE event_search USING fts5("
+            " description, keys, game_id UNINDEXED, sport_id UNINDEXED, team UNINDEXED,"
+            " minute UNINDEXED, created_at UNINDEXED,"
+            " tokenize = 'unicode61 remove_diacritics 2'"
+            ")"
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE event_search")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table(
+            "play_by_play_events", recreate="always", table_kwargs={"sqlite_autoincrement": False}
+        ):
+            pass
@@ -0,0 +1,22 @@
+"""Index games by sport for keyset-paged, status-filtered listings.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_games_sport_id_id", "games", ["sport_id", "id"])
+    op.create_index("ix_games_sport_id_status_id", "games", ["sport_id", "status", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_games_sport_id_status_id", table_name="games")
+    op.drop_index("ix_games_sport_id_id", table_name="games")
@@ -0,0 +1,30 @@
+"""Provider event ids, unique per game, for idempotent event posts.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("play_by_play_events", sa.Column("source_event_id", sa.String(length=128), nullable=True))
+    # Existing rows are NULL, which the unique index does not compare
+    op.create_index(
+        "ix_play_by_play_events_game_id_source_event_id",
+        "play_by_play_events",
+        ["game_id", "source_event_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_play_by_play_events_game_id_source_event_id", table_name="play_by_play_events")
+    with op.batch_alter_table("play_by_play_events", table_kwargs={"sqlite_autoincrement": True}) as batch_op:
+        batch_op.drop_column("source_event_id")
@@ -9,6 +9,14 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
+from app.cache import finished_games, game_bodies
+from app.live_state import live_games
+from app.admission import admission
+from app.stats import game_stats
+from app.drain import drainer
+from app.scheduler import kickoffs
+from app.search import create_index
+from app.idempotency import recent_keys
 
 
 @pytest.fixture(scope="function")
@@ -23,6 +31,8 @@ def test_db():
         poolclass=StaticPool,
     )
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        create_index(conn)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     session = TestingSessionLocal()
@@ -46,9 +56,56 @@ def client(test_db):
             pass  # Don't close test_db here, it's managed by test_db fixture
     
     app.dependency_overrides[get_db] = override_get_db
+    finished_games.clear()
+    game_bodies.clear()
+    live_games.clear()
+    admission.reset()
+    game_stats.clear()
+    drainer.reset()
+    kickoffs.clear()
+    recent_keys.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+    drainer.reset()
+    finished_games.clear()
+    live_games.clear()
+
+
+@pytest.fixture
+def create_sport(client):
+    """
+    Create a sport through the API (once per slug), returning its id.
+    """
+    sport_ids = {}
+
+    def create(slug="soccer"):
+        if slug not in sport_ids:
+            sport_ids[slug] = client.post("/sports", json={"name": slug.title(), "slug": slug}).json()["id"]
+        return sport_ids[slug]
+    return create
+
+
+@pytest.fixture
+def create_game(client, create_sport):
+    """
+    Create a game through the API, returning its id.
+    `status` moves it to Live (or through Live to Finished), `events` are
+    event bodies posted while it is open (minute defaults to their index),
+    and other keyword arguments go into the game body.
+    """
+    def create(sport="soccer", status=None, events=(), **fields):
+        game_id = client.post("/games", json={
+            "sport_id": create_sport(sport), "team_a_name": "Lions", "team_b_name": "Tigers", **fields
+        }).json()["id"]
+        if status in ("Live", "Finished"):
+            client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        for minute, event in enumerate(events):
+            client.post(f"/games/{game_id}/events", json={"minute": minute, **event})
+        if status == "Finished":
+            client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        return game_id
+    return create
 
 
 @pytest.fixture
@@ -0,0 +1,128 @@
+"""
+WebSocket Admission Control Tests
+
+Validate origin checks, rate limits, caps and retry hints.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app import main
+from app.admission import AdmissionController, TokenBucket, origin_allowed, RETRY_CLOSE_CODE
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOrigins:
+    """Test the shared origin allowlist."""
+
+    def test_origin_allowed(self):
+        """
+        Test: origin_allowed
+        Intent: Allowlisted origins (with or without trailing slash) and no origin pass
+        Expected: Unknown origins rejected
+        """
+        assert origin_allowed(None)
+        assert origin_allowed("https://micho8cho93.github.io")
+        assert origin_allowed("http://localhost:3000/")
+        assert not origin_allowed("https://evil.example.com")
+
+
+class TestTokenBucket:
+    """Test TokenBucket."""
+
+    def test_bucket_refills(self):
+        """
+        Test: bucket_refills
+        Intent: Burst is admitted, then tokens refill at the configured rate
+        Expected: Wait time reported once empty, admitted after refill
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+        assert bucket.take() == 0
+        assert bucket.take() == 0
+        assert bucket.take() == pytest.approx(0.5)
+
+        clock.now = 0.5
+        assert bucket.take() == 0
+
+
+class TestAdmissionController:
+    """Test AdmissionController decisions."""
+
+    def test_per_ip_rate_limit(self):
+        """
+        Test: per_ip_rate_limit
+        Intent: One client IP cannot exceed its burst
+        Expected: Retry delay for that IP, other IPs still admitted
+        """
+        controller = AdmissionController(ip_connect_rate=1, ip_connect_burst=2, jitter_ms=0, clock=FakeClock())
+        assert controller.admit("1.1.1.1", 0, 0) is None
+        assert controller.admit("1.1.1.1", 0, 0) is None
+        assert controller.admit("1.1.1.1", 0, 0) == 1000
+        assert controller.admit("2.2.2.2", 0, 0) is None
+
+    def test_connection_caps(self):
+        """
+        Test: connection_caps
+        Intent: Per-game and global caps reject with a jittered delay
+        Expected: Delay between 1s and 1s + jitter
+        """
+        controller = AdmissionController(max_per_game=10, max_total=100, jitter_ms=500, clock=FakeClock())
+        for retry_after_ms in (controller.admit("1.1.1.1", 10, 10), controller.admit("1.1.1.1", 0, 100)):
+            assert 1000 <= retry_after_ms <= 1500
+        assert controller.rejected == 2
+
+    def test_global_rate_limit(self):
+        """
+        Test: global_rate_limit
+        Intent: Global handshake rate applies across IPs
+        Expected: Rejected once the global burst is spent
+        """
+        controller = AdmissionController(connect_rate=1, connect_burst=2, jitter_ms=0, clock=FakeClock())
+        assert controller.admit("1.1.1.1", 0, 0) is None
+        assert controller.admit("2.2.2.2", 0, 0) is None
+        assert controller.admit("3.3.3.3", 0, 0) == 1000
+
+
+class TestHandshakeAdmission:
+    """Test admission in the WebSocket handshake."""
+
+    def test_rejected_handshake_gets_retry_hint(self, client, monkeypatch):
+        """
+        Test: rejected_handshake_gets_retry_hint
+        Intent: A connection over the per-game cap is closed with a retry delay
+        Expected: Close code 1013 with retry_after_ms in the reason
+        """
+        monkeypatch.setattr(main, "admission", AdmissionController(max_per_game=1, jitter_ms=0))
+        sport_id = client.post("/sports", json={"name": "Soccer", "slug": "soccer"}).json()["id"]
+        game_id = client.post("/games", json={
+            "sport_id": sport_id,
+            "team_a_name": "A",
+            "team_b_name": "B"
+        }).json()["id"]
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as first:
+            first.receive_json()
+            with client.websocket_connect(f"/ws/games/{game_id}") as second:
+                with pytest.raises(WebSocketDisconnect) as exc_info:
+                    second.receive_json()
+        assert exc_info.value.code == RETRY_CLOSE_CODE
+        assert exc_info.value.reason == "retry_after_ms=1000"
+
+    def test_disallowed_origin_rejected(self, client):
+        """
+        Test: disallowed_origin_rejected
+        Intent: Unknown browser origins are refused before accept
+        Expected: Connection rejected
+        """
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/ws/games/1", headers={"origin": "https://evil.example.com"}):
+                pass
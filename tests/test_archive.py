@@ -0,0 +1,135 @@
+"""
+Event Archive Tests
+
+Validate moving old finished games out of play_by_play_events.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, inspect, select
+
+from app import archive, models, standings
+from app.cache import finished_games
+from app.stats import game_stats
+
+LAST_SEASON = datetime(2020, 1, 1)
+
+
+def play_game(create_game, goals_a, goals_b, finish=True):
+    """Create a game, score the given goals and optionally finish it."""
+    goals = [{"team": "A", "minute": minute, "description": "Goal", "points": 1} for minute in range(goals_a)]
+    goals += [{"team": "B", "minute": minute, "description": "Goal", "points": 1} for minute in range(goals_b)]
+    return create_game(status="Finished" if finish else "Live", events=goals)
+
+
+def start_in(db, game_id, when):
+    """Move a game's start time."""
+    db.query(models.Game).filter(models.Game.id == game_id).update({"start_time": when})
+    db.commit()
+
+
+def hot_count(db, game_id):
+    return db.query(models.PlayByPlayEvent).filter(models.PlayByPlayEvent.game_id == game_id).count()
+
+
+def archived_count(db, game_id):
+    return db.execute(
+        select(func.count()).select_from(archive.archived_events).where(archive.archived_events.c.game_id == game_id)
+    ).scalar()
+
+
+class TestBatches:
+    """Test plan_batches."""
+
+    def test_plan_batches(self):
+        """
+        Test: plan_batches
+        Intent: Batches hold whole games and stay within the event budget
+        Expected: Games grouped up to the limit; an oversized game alone
+        """
+        counts = [(1, 40), (2, 50), (3, 20), (4, 500), (5, 0), (6, 10)]
+        assert archive.plan_batches(counts, 100) == [[1, 2], [3], [4], [5, 6]]
+        assert archive.plan_batches([], 100) == []
+
+
+class TestArchive:
+    """Test archive_finished and reads of archived games."""
+
+    def test_old_finished_games_archived(self, client, test_db, create_game):
+        """
+        Test: old_finished_games_archived
+        Intent: Only finished games older than the cutoff leave the hot table
+        Expected: Old game's events in its archive range; recent and live games untouched
+        """
+        old = play_game(create_game, 2, 1)
+        recent = play_game(create_game, 1, 1)
+        live = play_game(create_game, 1, 0, finish=False)
+        start_in(test_db, old, LAST_SEASON)
+        start_in(test_db, live, LAST_SEASON)
+
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        totals = archive.archive_finished(test_db, cutoff, pause_ms=0)
+        assert totals["games"] == 1
+        assert totals["events"] == 3
+
+        assert hot_count(test_db, old) == 0
+        assert archived_count(test_db, old) == 3
+        assert hot_count(test_db, recent) == 2
+        assert hot_count(test_db, live) == 1
+        assert test_db.get(models.Game, old).archived_at is not None
+        assert archive.range_table(archive.range_number(old)).name in inspect(test_db.connection()).get_table_names()
+
+        # Nothing left to do on the next run
+        assert archive.archive_finished(test_db, cutoff, pause_ms=0)["games"] == 0
+
+    def test_bounded_batches(self, client, test_db, create_game):
+        """
+        Test: bounded_batches
+        Intent: Each transaction moves at most the batch budget of events
+        Expected: One batch per game when the budget fits a single game
+        """
+        for _ in range(3):
+            start_in(test_db, play_game(create_game, 2, 2), LAST_SEASON)
+
+        totals = archive.archive_finished(test_db, datetime(2021, 1, 1), batch_events=5, pause_ms=0)
+        assert totals == {"games": 3, "events": 12, "batches": 3, "seconds": totals["seconds"]}
+
+    def test_archived_game_reads(self, client, test_db, create_game, create_sport):
+        """
+        Test: archived_game_reads
+        Intent: Archived games read the same as before they were moved
+        Expected: Same state, projected events, stats and standings
+        """
+        sport_id = create_sport()
+        game_id = play_game(create_game, 3, 1)
+        start_in(test_db, game_id, LAST_SEASON)
+        before = client.get(f"/games/{game_id}").json()
+        stats_before = client.get(f"/games/{game_id}/stats").json()
+        table_before = client.get(f"/sports/{sport_id}/standings").json()
+
+        archive.archive_finished(test_db, datetime(2021, 1, 1), pause_ms=0)
+        finished_games.clear()
+        game_stats.clear()
+
+        assert client.get(f"/games/{game_id}").json() == before
+        projected = client.get(f"/games/{game_id}?fields=id,events&event_fields=id,team&format=columnar").json()
+        assert projected["events"]["id"] == [event["id"] for event in before["events"]]
+        assert client.get(f"/games/{game_id}/stats").json() == stats_before
+        assert client.get(f"/games/{game_id}/events/wait?after_id=0").json()["events"] == before["events"]
+
+        standings.rebuild(test_db, sport_id)
+        assert client.get(f"/sports/{sport_id}/standings").json() == table_before
+
+    def test_drop_range(self, client, test_db, create_game):
+        """
+        Test: drop_range
+        Intent: A whole archive range is removed with one DROP TABLE
+        Expected: Range table and the SQLite view are gone
+        """
+        game_id = play_game(create_game, 1, 0)
+        start_in(test_db, game_id, LAST_SEASON)
+        archive.archive_finished(test_db, datetime(2021, 1, 1), pause_ms=0)
+        assert archive.range_numbers(test_db.connection()) == [archive.range_number(game_id)]
+
+        archive.drop_range(test_db, archive.range_number(game_id))
+        assert archive.range_numbers(test_db.connection()) == []
+        assert not archive.has_archive(test_db.connection())
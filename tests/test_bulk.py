@@ -0,0 +1,181 @@
+"""
+Bulk Import/Export Tests
+
+Validate streaming NDJSON/CSV import and export of sports, games and events.
+"""
+import asyncio
+import csv
+import io
+import json
+
+from app import bulk
+
+NDJSON = {"content-type": "application/x-ndjson"}
+CSV = {"content-type": "text/csv"}
+
+
+def ndjson(*records) -> str:
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def competition(games=2, events=3):
+    """Records for one sport with finished games and their events."""
+    records = [{"type": "sport", "name": "Soccer", "slug": "soccer"}]
+    for g in range(games):
+        records.append({
+            "type": "game", "ref": f"g{g}", "sport": "soccer", "team_a_name": f"Home {g}",
+            "team_b_name": f"Away {g}", "status": "Finished", "start_time": "2024-05-01T18:00:00+02:00",
+        })
+        for e in range(events):
+            records.append({
+                "type": "event", "game": f"g{g}", "team": "A" if e % 2 == 0 else "B",
+                "minute": e * 10, "description": f"Goal number {e}", "points": 1,
+            })
+    return records
+
+
+class TestImport:
+    """Test POST /import."""
+
+    def test_import_ndjson(self, client):
+        """
+        Test: import_ndjson
+        Intent: One streamed request loads a sport, its games and their events
+        Expected: Counts returned; games, events, standings and search all see the data
+        """
+        response = client.post("/import", content=ndjson(*competition()), headers=NDJSON)
+        assert response.status_code == 200
+        result = response.json()
+        assert (result["sports"], result["games"], result["events"], result["failed"]) == (1, 2, 6, 0)
+
+        sport_id = client.get("/sports").json()[0]["id"]
+        games = client.get(f"/sports/{sport_id}/games").json()
+        assert [game["team_a_name"] for game in games] == ["Home 0", "Home 1"]
+        # Kickoff times are stored as naive UTC
+        assert games[0]["start_time"] == "2024-05-01T16:00:00"
+        state = client.get(f"/games/{games[0]['id']}").json()
+        assert [event["minute"] for event in state["events"]] == [0, 10, 20]
+
+        table = client.get(f"/sports/{sport_id}/standings").json()
+        assert table[0]["played"] == 1 and table[0]["wins"] == 1
+        assert len(client.get("/search/events", params={"q": "goal"}).json()["results"]) == 6
+
+    def test_import_csv(self, client):
+        """
+        Test: import_csv
+        Intent: CSV bodies import the same records, quoted commas and newlines included
+        Expected: Event description kept intact
+        """
+        body = (
+            "type,ref,name,slug,sport,team_a_name,team_b_name,status,game,team,minute,description\r\n"
+            "sport,,Hockey,hockey,,,,,,,,\r\n"
+            "game,h1,,,hockey,Bears,Wolves,Live,,,,\r\n"
+            'event,,,,,,,,h1,b,7,"Penalty, two minutes\nfor hooking"\r\n'
+        )
+        result = client.post("/import", content=body, headers=CSV).json()
+        assert (result["sports"], result["games"], result["events"], result["failed"]) == (1, 1, 1, 0)
+
+        game_id = client.get(f"/sports/{client.get('/sports').json()[0]['id']}/games").json()[0]["id"]
+        event = client.get(f"/games/{game_id}").json()["events"][0]
+        assert event["description"] == "Penalty, two minutes\nfor hooking"
+        assert event["team"] == "B"
+
+    def test_invalid_records_skipped(self, client):
+        """
+        Test: invalid_records_skipped
+        Intent: Bad records are reported by line without stopping the import
+        Expected: Valid records written; each bad one listed with its line and reason
+        """
+        sport_id = client.post("/sports", json={"name": "Soccer", "slug": "soccer"}).json()["id"]
+        finished = client.post("/games", json={
+            "sport_id": sport_id, "team_a_name": "A", "team_b_name": "B", "status": "Finished"
+        }).json()["id"]
+        body = ndjson(
+            {"type": "sport", "name": "Soccer", "slug": "football"},
+            {"type": "game", "ref": "x", "sport": "soccer", "team_a_name": "C", "team_b_name": "D"},
+            {"type": "event", "game": "x", "team": "C", "minute": 1, "description": "Bad team"},
+            {"type": "event", "game": "y", "team": "A", "minute": 1, "description": "Unknown game"},
+            {"type": "event", "game_id": finished, "team": "A", "minute": 1, "description": "Too late"},
+            {"type": "game", "sport": "curling", "team_a_name": "E", "team_b_name": "F"},
+            {"type": "referee", "name": "Collina"},
+        ) + "{broken\n" + ndjson({"type": "event", "game": "x", "team": "A", "minute": 2, "description": "Kept"})
+        result = client.post("/import", content=body, headers=NDJSON).json()
+
+        assert (result["sports"], result["games"], result["events"]) == (0, 1, 1)
+        assert result["failed"] == 7
+        assert [error["line"] for error in result["errors"]] == [1, 3, 4, 5, 6, 7, 8]
+        reasons = {error["line"]: error["error"] for error in result["errors"]}
+        assert "already exists" in reasons[1]
+        assert "team" in reasons[3]
+        assert reasons[5] == "Game is finished"
+        assert reasons[6] == "Sport not found"
+
+    def test_streamed_in_batches(self, test_db):
+        """
+        Test: streamed_in_batches
+        Intent: Bodies are parsed chunk by chunk and written batch by batch
+        Expected: Lines split across chunks (mid UTF-8 character too) parse;
+                  refs resolve across batches
+        """
+        records = competition(games=3, events=4)
+        records[2]["description"] = "Tor für Müller"
+        data = ndjson(*records).encode()
+
+        async def chunks():
+            for i in range(0, len(data), 7):
+                yield data[i:i + 7]
+
+        async def run():
+            importer = bulk.Importer(test_db, batch_rows=4)
+            async for line, record in bulk.ndjson_records(bulk.read_lines(chunks())):
+                if importer.add(line, record):
+                    importer.flush()
+            return importer.finish()
+
+        result = asyncio.run(run())
+        assert (result["games"], result["events"], result["failed"]) == (3, 12, 0)
+        assert result["batches"] == 4
+        assert test_db.query(bulk.Event).filter_by(description="Tor für Müller").count() == 1
+
+
+class TestExport:
+    """Test GET /export."""
+
+    def test_export_round_trip(self, client):
+        """
+        Test: export_round_trip
+        Intent: An export is a valid import, in either format
+        Expected: Re-importing adds the same games and events and reuses the sport
+        """
+        client.post("/import", content=ndjson(*competition()), headers=NDJSON)
+
+        response = client.get("/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["type"] for record in records[:3]] == ["sport", "game", "game"]
+        assert sum(record["type"] == "event" for record in records) == 6
+
+        result = client.post("/import", content=response.text, headers=NDJSON).json()
+        assert (result["sports"], result["games"], result["events"], result["failed"]) == (0, 2, 6, 0)
+
+        exported = client.get("/export", params={"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(exported.text)))
+        assert len(rows) == 1 + 4 + 12
+        result = client.post("/import", content=exported.text, headers=CSV).json()
+        assert (result["games"], result["events"], result["failed"]) == (4, 12, 0)
+
+    def test_export_one_sport(self, client):
+        """
+        Test: export_one_sport
+        Intent: sport_id limits the export to one sport's games and events
+        Expected: Only that sport's records; 404 for an unknown sport
+        """
+        client.post("/import", content=ndjson(*competition(games=1, events=2)), headers=NDJSON)
+        hockey = client.post("/sports", json={"name": "Hockey", "slug": "hockey"}).json()["id"]
+        client.post("/games", json={"sport_id": hockey, "team_a_name": "Bears", "team_b_name": "Wolves"})
+
+        records = [json.loads(line) for line in client.get("/export", params={"sport_id": hockey}).text.splitlines()]
+        assert [record["type"] for record in records] == ["sport", "game"]
+        assert records[1]["sport"] == "hockey"
+        assert client.get("/export", params={"sport_id": 999}).status_code == 404
@@ -0,0 +1,106 @@
+"""
+Broadcast Coalescing Tests
+
+Validate per-game event coalescing and sequence numbers.
+"""
+import asyncio
+import json
+
+from app.connections import ConnectionManager
+
+
+class FakeWebSocket:
+    """Records decoded messages sent to it."""
+
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+
+def make_manager(subscribers=2, **kwargs):
+    """ConnectionManager with fake subscribers on game 1."""
+    registry = ConnectionManager(**kwargs)
+    sockets = [FakeWebSocket() for _ in range(subscribers)]
+    for socket in sockets:
+        registry.subscribe(socket, 1)
+    return registry, sockets
+
+
+def event(n):
+    return {"event_id": n, "game_id": 1, "description": f"Event {n}"}
+
+
+class TestCoalescing:
+    """Test ConnectionManager.broadcast_event."""
+
+    async def test_disabled_sends_each_event(self):
+        """
+        Test: disabled_sends_each_event
+        Intent: Without a coalescing window every event is its own message
+        Expected: One message per event with increasing seq
+        """
+        registry, sockets = make_manager(coalesce_max_ms=0)
+        for n in range(3):
+            await registry.broadcast_event(1, event(n))
+
+        assert [m["seq"] for m in sockets[0].received] == [1, 2, 3]
+        assert all("type" not in m for m in sockets[0].received)
+
+    async def test_burst_is_batched(self):
+        """
+        Test: burst_is_batched
+        Intent: A burst on a game over its fan-out budget is sent as one batch
+        Expected: First event alone, the rest in one ordered event_batch
+        """
+        registry, sockets = make_manager(coalesce_max_ms=20, fanout_budget=1)
+        for n in range(5):
+            await registry.broadcast_event(1, event(n))
+        await asyncio.sleep(0.05)
+
+        messages = sockets[1].received
+        assert messages[0]["seq"] == 1
+        assert messages[1]["type"] == "event_batch"
+        assert [e["seq"] for e in messages[1]["events"]] == [2, 3, 4, 5]
+        assert len(messages) == 2
+
+    async def test_max_batch_flushes_early(self):
+        """
+        Test: max_batch_flushes_early
+        Intent: A full batch is sent without waiting for the window
+        Expected: Batch delivered before the window elapses
+        """
+        registry, sockets = make_manager(coalesce_max_ms=10000, fanout_budget=1, coalesce_max_batch=3)
+        for n in range(4):
+            await registry.broadcast_event(1, event(n))
+
+        assert [m["seq"] for m in sockets[0].received[1]["events"]] == [2, 3, 4]
+        await registry.flush_all()
+
+    async def test_other_messages_keep_order(self):
+        """
+        Test: other_messages_keep_order
+        Intent: Non-event messages never overtake held events
+        Expected: Held events are sent before the status message
+        """
+        registry, sockets = make_manager(coalesce_max_ms=10000, fanout_budget=1)
+        for n in range(3):
+            await registry.broadcast_event(1, event(n))
+        await registry.broadcast(1, {"type": "game_status", "game_id": 1, "status": "Finished"})
+
+        kinds = [m.get("type", "event") for m in sockets[0].received]
+        assert kinds == ["event", "event_batch", "game_status"]
+
+    def test_window_adapts_to_audience(self):
+        """
+        Test: window_adapts_to_audience
+        Intent: The window grows with subscribers and is capped
+        Expected: Zero within budget, subscribers / budget above it, capped at max
+        """
+        registry, _ = make_manager(subscribers=100, coalesce_max_ms=50, fanout_budget=10000)
+        assert registry.coalesce_window(1, rate=50) == 0.0
+        assert registry.coalesce_window(1, rate=200) == 0.01
+
+        registry, _ = make_manager(subscribers=5000, coalesce_max_ms=50, fanout_budget=10000)
+        assert registry.coalesce_window(1, rate=200) == 0.05
@@ -0,0 +1,147 @@
+"""
+Precompressed Body Tests
+
+Validate Accept-Encoding negotiation and the compressed body cache.
+"""
+import gzip
+
+from app.cache import BodyVariantCache, choose_encoding, game_bodies
+
+
+# Enough events for a game state body well over 1 KB
+MIDFIELD = [
+    {"team": "AB"[minute % 2], "description": f"Pass in midfield, minute {minute}"} for minute in range(40)
+]
+
+
+class TestNegotiation:
+    """Test choose_encoding."""
+
+    def test_choose_encoding(self):
+        """
+        Test: choose_encoding
+        Intent: The preferred acceptable encoding is chosen, honouring q-values
+        Expected: br over gzip when both allowed; q=0 and absent headers give identity
+        """
+        both = ("br", "gzip")
+        assert choose_encoding("gzip, deflate, br", both) == "br"
+        assert choose_encoding("br;q=0.5, gzip", both) == "gzip"
+        assert choose_encoding("gzip;q=0, br;q=0", both) is None
+        assert choose_encoding("*", both) == "br"
+        assert choose_encoding("identity", both) is None
+        assert choose_encoding(None, both) is None
+        assert choose_encoding("br, gzip", ("gzip",)) == "gzip"
+
+
+class TestBodyVariantCache:
+    """Test BodyVariantCache."""
+
+    def test_compress_once(self):
+        """
+        Test: compress_once
+        Intent: Each version of a body is compressed once per encoding
+        Expected: One compression, then hits returning the same bytes
+        """
+        cache = BodyVariantCache(max_bytes=1 << 20)
+        body = b'{"events":[' + b'{"minute":1},' * 500 + b'{}]}'
+        first = cache.variant(1, 7, body, "gzip")
+        assert cache.variant(1, 7, body, "gzip") is first
+        assert gzip.decompress(first) == body
+        assert cache.compressions == 1
+        assert cache.stats()["ratio"] < 0.1
+
+    def test_new_version_replaces_old(self):
+        """
+        Test: new_version_replaces_old
+        Intent: Live games do not accumulate stale versions
+        Expected: Only the newest version of a game stays cached
+        """
+        cache = BodyVariantCache(max_bytes=1 << 20)
+        cache.put(1, 1, "identity", b"a" * 100)
+        cache.put(1, 1, "gzip", b"b" * 10)
+        cache.put(1, 2, "identity", b"c" * 100)
+        assert cache.get(1, 1, "gzip") is None
+        assert cache.get(1, 2, "identity") == b"c" * 100
+        assert cache.stats()["bytes"] == 100
+
+    def test_size_limit(self):
+        """
+        Test: size_limit
+        Intent: The cache stays within its byte budget
+        Expected: Least recently used games evicted
+        """
+        cache = BodyVariantCache(max_bytes=250)
+        for game_id in range(5):
+            cache.put(game_id, 1, "identity", b"x" * 100)
+        stats = cache.stats()
+        assert stats["bytes"] <= 250
+        assert stats["evictions"] == 3
+        assert cache.get(4, 1, "identity") is not None
+        assert cache.get(0, 1, "identity") is None
+
+
+class TestCompressedResponses:
+    """Test GET /games/{game_id} compression."""
+
+    def test_live_game_gzip(self, client, create_game):
+        """
+        Test: live_game_gzip
+        Intent: Live game bodies are sent compressed, once per state version
+        Expected: gzip Content-Encoding; recompressed only after a new event
+        """
+        game_id = create_game(status="Live", events=MIDFIELD)
+        headers = {"Accept-Encoding": "gzip"}
+
+        response = client.get(f"/games/{game_id}", headers=headers)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert len(response.json()["events"]) == 40
+
+        client.get(f"/games/{game_id}", headers=headers)
+        assert game_bodies.compressions == 1
+
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 41, "description": "Goal"})
+        response = client.get(f"/games/{game_id}", headers=headers)
+        assert len(response.json()["events"]) == 41
+        assert game_bodies.compressions == 2
+
+    def test_finished_game_gzip(self, client, create_game):
+        """
+        Test: finished_game_gzip
+        Intent: Finished bodies are compressed once and stay immutable
+        Expected: gzip body with the immutable Cache-Control
+        """
+        game_id = create_game(status="Live", events=MIDFIELD)
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        response = client.get(f"/games/{game_id}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "immutable" in response.headers["Cache-Control"]
+        assert response.json()["status"] == "Finished"
+
+    def test_identity_and_small_bodies(self, client, create_game):
+        """
+        Test: identity_and_small_bodies
+        Intent: Clients without compression and small bodies get plain JSON
+        Expected: No Content-Encoding
+        """
+        game_id = create_game(status="Live", events=MIDFIELD)
+        response = client.get(f"/games/{game_id}", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in response.headers
+
+        sport_id = client.get("/sports").json()[0]["id"]
+        small_id = client.post("/games", json={
+            "sport_id": sport_id, "team_a_name": "A", "team_b_name": "B"
+        }).json()["id"]
+        client.patch(f"/games/{small_id}/status", json={"status": "Live"})
+        response = client.get(f"/games/{small_id}", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+    def test_admin_compression_stats(self, client):
+        """
+        Test: admin_compression_stats
+        Intent: Cache metrics are exposed to operators
+        Expected: Counters for size, hits and compressions
+        """
+        data = client.get("/admin/compression").json()
+        assert {"entries", "bytes", "max_bytes", "hits", "misses", "compressions", "ratio"} <= set(data)
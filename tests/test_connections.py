@@ -0,0 +1,98 @@
+"""
+Connection Registry Tests
+
+Validate connection records, counters and the audience report.
+"""
+from app.connections import ConnectionManager, ConnectionRecord, StreamSubscriber
+
+
+class FakeWebSocket:
+    """Accepts anything sent to it."""
+
+    async def send_text(self, text):
+        pass
+
+
+class BrokenWebSocket:
+    """Fails every send."""
+
+    async def send_text(self, text):
+        raise RuntimeError("Connection reset")
+
+
+class TestConnectionRegistry:
+    """Test ConnectionManager's registry."""
+
+    def test_subscribe_and_disconnect(self):
+        """
+        Test: subscribe_and_disconnect
+        Intent: Subscriptions are records indexed by subscriber
+        Expected: Totals track every add and remove; empty games are dropped
+        """
+        registry = ConnectionManager()
+        sockets = [FakeWebSocket() for _ in range(1000)]
+        for socket in sockets:
+            record = registry.subscribe(socket, 1, "10.0.0.1")
+        assert isinstance(record, ConnectionRecord)
+        assert (record.transport, record.client) == ("websocket", "10.0.0.1")
+        assert registry.total_connections == 1000
+
+        for socket in sockets:
+            registry.disconnect(socket, 1)
+        registry.disconnect(sockets[0], 1)
+        assert registry.total_connections == 0
+        assert 1 not in registry.active_connections
+
+    async def test_counters(self):
+        """
+        Test: counters
+        Intent: Each record counts the messages and bytes delivered to it
+        Expected: Counters on live records; failed subscribers are removed
+        """
+        registry = ConnectionManager()
+        ok = FakeWebSocket()
+        registry.subscribe(ok, 1)
+        registry.subscribe(BrokenWebSocket(), 1)
+
+        await registry.broadcast(1, {"type": "game_status", "game_id": 1, "status": "Live"})
+        await registry.broadcast(1, {"type": "game_status", "game_id": 1, "status": "Live"})
+
+        record = registry.active_connections[1][ok]
+        assert record.messages_sent == 2
+        assert record.bytes_sent == 2 * len('{"type":"game_status","game_id":1,"status":"Live"}')
+        assert registry.total_connections == 1
+
+    async def test_top_games(self):
+        """
+        Test: top_games
+        Intent: Games are ranked by audience size
+        Expected: Largest first, with per-transport counts
+        """
+        registry = ConnectionManager()
+        for game_id, audience in ((1, 2), (2, 5), (3, 1)):
+            for _ in range(audience):
+                registry.subscribe(FakeWebSocket(), game_id)
+        registry.subscribe(StreamSubscriber(), 2)
+
+        top = registry.top_games(2)
+        assert [(g["game_id"], g["connections"]) for g in top] == [(2, 6), (1, 2)]
+        assert (top[0]["websocket"], top[0]["sse"]) == (5, 1)
+
+        usage = registry.memory_usage()
+        assert usage["connections"] == 9
+        assert usage["bytes_per_connection"] > 0
+
+
+class TestConnectionsAdmin:
+    """Test GET /admin/connections."""
+
+    def test_admin_connections(self, client):
+        """
+        Test: admin_connections
+        Intent: The audience report is exposed to operators
+        Expected: Totals, memory figures and a top_games list
+        """
+        response = client.get("/admin/connections?top=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert {"connections", "bytes", "bytes_per_connection", "top_games"} <= set(data)
@@ -0,0 +1,115 @@
+"""
+Graceful Drain Tests
+
+Validate wave-based draining of live connections.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.connections import ConnectionManager, StreamSubscriber
+from app.drain import DrainController, DRAIN_CLOSE_CODE, drainer
+
+
+class FakeWebSocket:
+    """Records the close code and reason."""
+
+    def __init__(self):
+        self.closed = None
+
+    async def send_text(self, text):
+        pass
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+class TestDrainController:
+    """Test DrainController."""
+
+    async def test_drain_closes_in_waves(self):
+        """
+        Test: drain_closes_in_waves
+        Intent: Every connection is closed with the drain code and a reconnect hint
+        Expected: Empty registry; reasons carry a delay and the last event id
+        """
+        registry = ConnectionManager()
+        sockets = [FakeWebSocket() for _ in range(10)]
+        for socket in sockets:
+            registry.subscribe(socket, 1)
+        await registry.broadcast_event(1, {"event_id": 42, "game_id": 1})
+
+        controller = DrainController(registry, waves=3, wave_interval_ms=0, spread_ms=5000)
+        await controller.drain()
+
+        assert registry.total_connections == 0
+        assert controller.closed == 10
+        for socket in sockets:
+            code, reason = socket.closed
+            assert code == DRAIN_CLOSE_CODE
+            delay, last = reason.split(";")
+            assert 0 <= int(delay.split("=")[1]) <= 5000
+            assert last == "last_event_id=42"
+
+    async def test_drain_flushes_pending_broadcasts(self):
+        """
+        Test: drain_flushes_pending_broadcasts
+        Intent: Coalesced events are delivered before clients are closed
+        Expected: The held event is the last one recorded for the client
+        """
+        registry = ConnectionManager(coalesce_max_ms=10000, fanout_budget=1)
+        socket = FakeWebSocket()
+        registry.subscribe(socket, 1)
+        record = registry.active_connections[1][socket]
+        await registry.broadcast_event(1, {"event_id": 1, "game_id": 1})
+        await registry.broadcast_event(1, {"event_id": 2, "game_id": 1})
+
+        await DrainController(registry, wave_interval_ms=0).drain()
+
+        assert record.last_event_id == 2
+        assert socket.closed[1].endswith("last_event_id=2")
+
+    async def test_stream_subscribers_get_drain_frame(self):
+        """
+        Test: stream_subscribers_get_drain_frame
+        Intent: Event-stream clients get the reconnect hint as a frame
+        Expected: A retry field and a drain event, then end of stream
+        """
+        registry = ConnectionManager()
+        subscriber = StreamSubscriber()
+        registry.subscribe(subscriber, 1)
+
+        await DrainController(registry, wave_interval_ms=0).drain()
+
+        frame = subscriber.queue.get_nowait()
+        assert frame.startswith("retry: ")
+        assert "event: drain" in frame
+        assert subscriber.queue.get_nowait() is None
+
+
+class TestDrainEndpoints:
+    """Test drain mode through the API."""
+
+    def test_admin_drain_rejects_new_subscribers(self, client):
+        """
+        Test: admin_drain_rejects_new_subscribers
+        Intent: A draining instance sends new clients elsewhere
+        Expected: 202 from the admin call, drain close code on the WebSocket, 503 on the stream
+        """
+        sport_id = client.post("/sports", json={"name": "Soccer", "slug": "soccer"}).json()["id"]
+        game_id = client.post("/games", json={
+            "sport_id": sport_id, "team_a_name": "A", "team_b_name": "B"
+        }).json()["id"]
+
+        response = client.post("/admin/drain")
+        assert response.status_code == 202
+        assert drainer.draining
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            with pytest.raises(WebSocketDisconnect) as exc:
+                websocket.receive_json()
+        assert exc.value.code == DRAIN_CLOSE_CODE
+        assert exc.value.reason.startswith("retry_after_ms=")
+
+        response = client.get(f"/games/{game_id}/stream")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
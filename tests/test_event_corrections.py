@@ -0,0 +1,123 @@
+"""
+Event Correction Tests
+
+Validate PATCH and DELETE /games/{game_id}/events/{event_id}.
+"""
+
+
+def create_event(client, game_id, team="A", minute=10, description="Goal", points=1):
+    """Create an event, returning its id."""
+    return client.post(f"/games/{game_id}/events", json={
+        "team": team, "minute": minute, "description": description, "points": points
+    }).json()["id"]
+
+
+class TestEventCorrections:
+    """Test event edits and deletions."""
+
+    def test_patch_event(self, client, create_game):
+        """
+        Test: patch_event
+        Intent: Only the given fields change, and live state reflects them
+        Expected: Updated event in the response and in the game state
+        """
+        game_id = create_game(status="Live")
+        event_id = create_event(client, game_id)
+
+        response = client.patch(f"/games/{game_id}/events/{event_id}", json={"team": "b", "minute": 12})
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["team"], data["minute"], data["description"]) == ("B", 12, "Goal")
+
+        event = client.get(f"/games/{game_id}").json()["events"][0]
+        assert (event["team"], event["minute"], event["points"]) == ("B", 12, 1)
+
+    def test_delete_event(self, client, create_game):
+        """
+        Test: delete_event
+        Intent: Deleted events disappear from the game state
+        Expected: 204, then only the remaining event is listed
+        """
+        game_id = create_game(status="Live")
+        first = create_event(client, game_id)
+        second = create_event(client, game_id, minute=20)
+
+        assert client.delete(f"/games/{game_id}/events/{first}").status_code == 204
+        events = client.get(f"/games/{game_id}").json()["events"]
+        assert [e["id"] for e in events] == [second]
+        assert client.delete(f"/games/{game_id}/events/{first}").status_code == 404
+
+    def test_stats_patched_in_place(self, client, create_game):
+        """
+        Test: stats_patched_in_place
+        Intent: Built stats are adjusted rather than rebuilt
+        Expected: Counts move between teams and minutes, deletions uncount
+        """
+        game_id = create_game(status="Live")
+        event_id = create_event(client, game_id, minute=1)
+        create_event(client, game_id, minute=1)
+        client.get(f"/games/{game_id}/stats")
+
+        client.patch(f"/games/{game_id}/events/{event_id}", json={"team": "B", "minute": 2})
+        teams = client.get(f"/games/{game_id}/stats").json()["teams"]
+        assert teams["A"]["per_minute"] == [0, 1, 0]
+        assert teams["B"]["per_minute"] == [0, 0, 1]
+
+        client.delete(f"/games/{game_id}/events/{event_id}")
+        data = client.get(f"/games/{game_id}/stats").json()
+        assert data["total_events"] == 1
+        assert data["teams"]["B"]["count"] == 0
+
+    def test_corrections_broadcast_deltas(self, client, create_game):
+        """
+        Test: corrections_broadcast_deltas
+        Intent: Subscribers get compact deltas instead of refetching history
+        Expected: event_updated with the changed fields, then event_removed
+        """
+        game_id = create_game(status="Live")
+        event_id = create_event(client, game_id)
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            assert websocket.receive_json()["type"] == "connection_established"
+
+            client.patch(f"/games/{game_id}/events/{event_id}", json={"description": "Own goal", "team": "A"})
+            assert websocket.receive_json() == {
+                "type": "event_updated",
+                "event_id": event_id,
+                "game_id": game_id,
+                "changes": {"description": "Own goal"},
+            }
+
+            client.delete(f"/games/{game_id}/events/{event_id}")
+            assert websocket.receive_json() == {
+                "type": "event_removed",
+                "event_id": event_id,
+                "game_id": game_id,
+            }
+
+    def test_finished_game_rejects_corrections(self, client, create_game):
+        """
+        Test: finished_game_rejects_corrections
+        Intent: Finished games stay immutable
+        Expected: 409 Conflict for edits and deletions
+        """
+        game_id = create_game(status="Live")
+        event_id = create_event(client, game_id)
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        assert client.patch(f"/games/{game_id}/events/{event_id}", json={"minute": 3}).status_code == 409
+        assert client.delete(f"/games/{game_id}/events/{event_id}").status_code == 409
+
+    def test_event_of_other_game(self, client, create_game):
+        """
+        Test: event_of_other_game
+        Intent: Events are addressed through their own game
+        Expected: 404 Not Found
+        """
+        game_id = create_game(status="Live")
+        event_id = create_event(client, game_id)
+        other_id = client.post("/games", json={
+            "sport_id": 1, "team_a_name": "Bears", "team_b_name": "Wolves"
+        }).json()["id"]
+
+        assert client.patch(f"/games/{other_id}/events/{event_id}", json={"minute": 3}).status_code == 404
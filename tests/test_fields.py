@@ -0,0 +1,119 @@
+"""
+Sparse Fieldset Tests
+
+Validate ?fields= projection and the columnar list format.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.live_state import live_games
+
+
+@pytest.fixture
+def statements(test_db):
+    """SQL statements executed against the test database."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+EVENTS = [{"team": "AB"[minute % 2], "description": f"Event {minute}"} for minute in range(3)]
+
+
+class TestGameListFields:
+    """Test GET /sports/{sport_id}/games projections."""
+
+    def test_fields_projection(self, client, statements, create_game, create_sport):
+        """
+        Test: fields_projection
+        Intent: Only the requested columns are selected and returned
+        Expected: Rows with exactly those keys; no other game column in the SQL
+        """
+        game_id = create_game()
+        sport_id = create_sport()
+        statements.clear()
+
+        response = client.get(f"/sports/{sport_id}/games?fields=id,team_a_name,status")
+        assert response.status_code == 200
+        assert response.json() == [{"id": game_id, "team_a_name": "Lions", "status": "Scheduled"}]
+
+        select = [s for s in statements if "FROM games" in s][-1]
+        assert "team_b_name" not in select and "created_at" not in select
+
+    def test_columnar(self, client, create_game, create_sport):
+        """
+        Test: columnar
+        Intent: Lists can be returned as one array per field
+        Expected: Parallel arrays keyed by field name
+        """
+        game_id = create_game()
+        sport_id = create_sport()
+        response = client.get(f"/sports/{sport_id}/games?fields=id,team_b_name&format=columnar")
+        assert response.json() == {"id": [game_id], "team_b_name": ["Tigers"]}
+
+    def test_unknown_field(self, client, create_sport):
+        """
+        Test: unknown_field
+        Intent: Typos are reported rather than silently ignored
+        Expected: 400 Bad Request naming the field
+        """
+        sport_id = create_sport()
+        response = client.get(f"/sports/{sport_id}/games?fields=id,score")
+        assert response.status_code == 400
+        assert "score" in response.json()["detail"]
+
+
+class TestGameStateFields:
+    """Test GET /games/{game_id} projections."""
+
+    def test_event_fields_columnar(self, client, create_game):
+        """
+        Test: event_fields_columnar
+        Intent: Event histories can drop repeated columns and use arrays
+        Expected: Requested game fields and columnar events without game_id
+        """
+        game_id = create_game(events=EVENTS)
+        response = client.get(f"/games/{game_id}?fields=id,status,events&event_fields=minute,team&format=columnar")
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": game_id,
+            "status": "Scheduled",
+            "events": {"minute": [0, 1, 2], "team": ["A", "B", "A"]},
+        }
+
+    def test_live_game_projection_from_memory(self, client, statements, create_game):
+        """
+        Test: live_game_projection_from_memory
+        Intent: Projected reads of live games are served from the live-state store
+        Expected: Same shape as the database path, no SQL
+        """
+        game_id = create_game(events=EVENTS)
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        assert game_id in live_games
+        statements.clear()
+
+        data = client.get(f"/games/{game_id}?event_fields=id,description").json()
+        assert statements == []
+        assert [e["description"] for e in data["events"]] == ["Event 0", "Event 1", "Event 2"]
+        assert set(data["events"][0]) == {"id", "description"}
+        assert data["status"] == "Live"
+
+    def test_finished_projection_cacheable(self, client, create_game):
+        """
+        Test: finished_projection_cacheable
+        Intent: Projections of finished games keep the immutable caching
+        Expected: Immutable Cache-Control; events omitted when not requested
+        """
+        game_id = create_game(events=EVENTS)
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        response = client.get(f"/games/{game_id}?fields=team_a_name,team_b_name")
+        assert response.json() == {"team_a_name": "Lions", "team_b_name": "Tigers"}
+        assert "immutable" in response.headers["Cache-Control"]
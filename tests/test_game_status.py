@@ -0,0 +1,136 @@
+"""
+Game Lifecycle Tests
+
+Validate status transitions and immutable finished games.
+"""
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+
+class TestGameStatusTransitions:
+    """Test PATCH /games/{game_id}/status."""
+
+    def test_status_valid_transitions(self, client, create_game):
+        """
+        Test: status_valid_transitions
+        Intent: Game moves SCHEDULED -> LIVE -> FINISHED
+        Expected: 200 with the new status each time
+        """
+        game_id = create_game()
+
+        response = client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "Live"
+
+        response = client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "Finished"
+
+    def test_status_invalid_transition(self, client, create_game):
+        """
+        Test: status_invalid_transition
+        Intent: Reject skipping or reversing states
+        Expected: 409 Conflict
+        """
+        game_id = create_game()
+
+        response = client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        assert response.status_code == 409
+
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        response = client.patch(f"/games/{game_id}/status", json={"status": "Scheduled"})
+        assert response.status_code == 409
+
+    def test_status_unknown_game(self, client):
+        """
+        Test: status_unknown_game
+        Intent: Unknown game id is reported
+        Expected: 404 Not Found
+        """
+        response = client.patch("/games/99999/status", json={"status": "Live"})
+        assert response.status_code == 404
+
+
+class TestFinishedGames:
+    """Test that finished games are immutable and cacheable."""
+
+    def test_finished_game_cache_headers(self, client, create_game):
+        """
+        Test: finished_game_cache_headers
+        Intent: Finished game state is marked immutable, live state is not
+        Expected: Long immutable Cache-Control only once finished
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 5, "description": "Goal"})
+
+        live = client.get(f"/games/{game_id}")
+        assert "immutable" not in live.headers["cache-control"]
+
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        first = client.get(f"/games/{game_id}")
+        second = client.get(f"/games/{game_id}")
+        assert first.status_code == 200
+        assert "immutable" in first.headers["cache-control"]
+        assert first.json() == second.json()
+        assert first.json()["status"] == "Finished"
+        assert first.json()["events"][0]["description"] == "Goal"
+
+    def test_finished_game_rejects_events(self, client, create_game):
+        """
+        Test: finished_game_rejects_events
+        Intent: No events can be added once a game is finished
+        Expected: 409 Conflict
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        response = client.post(f"/games/{game_id}/events", json={
+            "team": "A",
+            "minute": 90,
+            "description": "Late goal"
+        })
+        assert response.status_code == 409
+
+
+class TestStatusBroadcast:
+    """Test status changes over the WebSocket channel."""
+
+    def test_status_broadcast_and_close(self, client, create_game):
+        """
+        Test: status_broadcast_and_close
+        Intent: Subscribers are told about status changes and closed on finish
+        Expected: game_status messages, then the socket is closed
+        """
+        game_id = create_game()
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            assert websocket.receive_json()["type"] == "connection_established"
+
+            client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+            data = websocket.receive_json()
+            assert data == {"type": "game_status", "game_id": game_id, "status": "Live"}
+
+            client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+            data = websocket.receive_json()
+            assert data["status"] == "Finished"
+
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                websocket.receive_json()
+            assert exc_info.value.code == 1000
+
+    def test_finished_game_socket(self, client, create_game):
+        """
+        Test: finished_game_socket
+        Intent: Connecting to a finished game reports the final status only
+        Expected: One game_status message, then close
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            assert websocket.receive_json()["status"] == "Finished"
+            with pytest.raises(WebSocketDisconnect):
+                websocket.receive_json()
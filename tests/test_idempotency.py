@@ -0,0 +1,167 @@
+"""
+Idempotent Event Ingestion Tests
+
+Validate that retried event posts are recorded and broadcast once.
+"""
+import asyncio
+import json
+
+from sqlalchemy.orm import sessionmaker
+
+from app import main, models
+from app.connections import manager
+from app.idempotency import RecentKeys, recent_keys
+from app.ingest import EventBatcher
+
+
+class FakeWebSocket:
+    """Records decoded messages sent to it."""
+
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+
+GOAL = {"team": "A", "minute": 10, "description": "Goal", "points": 1, "source_event_id": "feed-1"}
+
+
+def event_rows(test_db):
+    test_db.expire_all()
+    return test_db.query(models.PlayByPlayEvent).all()
+
+
+class TestIdempotentEvents:
+    """Test POST /games/{game_id}/events retries."""
+
+    def test_retry_is_replayed(self, client, test_db, create_game):
+        """
+        Test: retry_is_replayed
+        Intent: A retried post neither writes nor broadcasts again
+        Expected: Same event with 200 and Idempotent-Replayed; one row,
+                  one broadcast, one event in the game state
+        """
+        game_id = create_game()
+        socket = FakeWebSocket()
+        manager.subscribe(socket, game_id)
+        try:
+            first = client.post(f"/games/{game_id}/events", json=GOAL)
+            retries = [client.post(f"/games/{game_id}/events", json=GOAL) for _ in range(3)]
+        finally:
+            manager.disconnect(socket, game_id)
+
+        assert first.status_code == 201
+        assert "idempotent-replayed" not in first.headers
+        for retry in retries:
+            assert retry.status_code == 200
+            assert retry.headers["idempotent-replayed"] == "true"
+            assert retry.json() == first.json()
+        assert len(event_rows(test_db)) == 1
+        assert len(socket.received) == 1
+        assert recent_keys.stats()["hits"] == 3
+        assert len(client.get(f"/games/{game_id}").json()["events"]) == 1
+
+    def test_idempotency_key_header(self, client, test_db, create_game):
+        """
+        Test: idempotency_key_header
+        Intent: Feeds without a provider id can send an Idempotency-Key header
+        Expected: Deduplicated per game; a key that disagrees with the body is rejected
+        """
+        game_id = create_game()
+        other_game_id = create_game("rugby")
+        event = {"team": "B", "minute": 5, "description": "Try"}
+
+        first = client.post(f"/games/{game_id}/events", json=event, headers={"Idempotency-Key": "k1"})
+        retry = client.post(f"/games/{game_id}/events", json=event, headers={"Idempotency-Key": "k1"})
+        other = client.post(f"/games/{other_game_id}/events", json=event, headers={"Idempotency-Key": "k1"})
+        assert retry.json()["id"] == first.json()["id"]
+        assert other.status_code == 201
+        assert other.json()["id"] != first.json()["id"]
+
+        mismatch = client.post(f"/games/{game_id}/events", json=GOAL, headers={"Idempotency-Key": "k2"})
+        assert mismatch.status_code == 400
+        unkeyed = [client.post(f"/games/{game_id}/events", json=event) for _ in range(2)]
+        assert [r.status_code for r in unkeyed] == [201, 201]
+        assert len(event_rows(test_db)) == 4
+
+    def test_unique_index_catches_uncached_keys(self, client, test_db, create_game):
+        """
+        Test: unique_index_catches_uncached_keys
+        Intent: Keys evicted from the cache (or seen by another worker) are still deduplicated
+        Expected: Replay of the stored event, found through the unique index
+        """
+        game_id = create_game()
+        first = client.post(f"/games/{game_id}/events", json=GOAL).json()
+        recent_keys.clear()
+
+        retry = client.post(f"/games/{game_id}/events", json=GOAL)
+        assert retry.status_code == 200
+        assert retry.json()["id"] == first["id"]
+        assert len(event_rows(test_db)) == 1
+        assert len(recent_keys) == 1
+
+    def test_corrections_update_replays(self, client, test_db, create_game):
+        """
+        Test: corrections_update_replays
+        Intent: Replays never return an event as it was before a correction
+        Expected: Corrected fields after PATCH; a new event after DELETE
+        """
+        game_id = create_game()
+        event_id = client.post(f"/games/{game_id}/events", json=GOAL).json()["id"]
+        client.patch(f"/games/{game_id}/events/{event_id}", json={"description": "Own goal"})
+
+        retry = client.post(f"/games/{game_id}/events", json=GOAL)
+        assert retry.json()["description"] == "Own goal"
+
+        client.delete(f"/games/{game_id}/events/{event_id}")
+        recorded = client.post(f"/games/{game_id}/events", json=GOAL)
+        assert recorded.status_code == 201
+        assert recorded.json()["id"] != event_id
+
+    def test_batched_retries(self, client, test_db, monkeypatch, create_game):
+        """
+        Test: batched_retries
+        Intent: Concurrent duplicates that land in one group commit are stored once
+        Expected: One row; the duplicate's insert is rejected, and the endpoint
+                  replays the stored event for it
+        """
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_db.get_bind())
+        monkeypatch.setattr(main, "event_batcher", EventBatcher(session_factory, window_ms=5))
+        game_id = create_game()
+
+        async def post_twice():
+            return await asyncio.gather(*[
+                main.event_batcher.submit(game_id=game_id, team=models.TeamSide.A, minute=10,
+                                          description="Goal", points=1, source_event_id="feed-1")
+                for _ in range(2)
+            ], return_exceptions=True)
+
+        results = asyncio.run(post_twice())
+        assert sum(isinstance(result, Exception) for result in results) == 1
+        assert len(event_rows(test_db)) == 1
+
+        response = client.post(f"/games/{game_id}/events", json=GOAL)
+        assert response.status_code == 200
+        stored = next(result for result in results if not isinstance(result, Exception))
+        assert response.json()["id"] == stored.id
+
+
+class TestRecentKeys:
+    """Test the recent keys LRU."""
+
+    def test_bounded(self):
+        """
+        Test: bounded
+        Intent: Memory stays bounded during retry storms with fresh keys
+        Expected: Least recently used keys are evicted first
+        """
+        keys = RecentKeys(max_entries=2)
+        keys.put(1, "a", {"id": 1})
+        keys.put(1, "b", {"id": 2})
+        assert keys.get(1, "a") == {"id": 1}
+        keys.put(1, "c", {"id": 3})
+        assert keys.get(1, "b") is None
+        assert keys.get(1, "a") == {"id": 1}
+        assert keys.get(2, "a") is None
+        assert len(keys) == 2
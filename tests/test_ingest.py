@@ -0,0 +1,114 @@
+"""
+Group-Commit Ingest Tests
+
+Validate batched event inserts.
+"""
+import asyncio
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import main, models
+from app.ingest import EventBatcher
+
+
+@pytest.fixture
+def game(test_db):
+    """Create a sport and a game directly in the test database."""
+    sport = models.Sport(name="Soccer", slug="soccer")
+    test_db.add(sport)
+    test_db.commit()
+    game = models.Game(sport_id=sport.id, team_a_name="A", team_b_name="B")
+    test_db.add(game)
+    test_db.commit()
+    return game
+
+
+@pytest.fixture
+def session_factory(test_db):
+    """Session factory bound to the test database."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_db.get_bind())
+
+
+class TestEventBatcher:
+    """Test EventBatcher flushing."""
+
+    async def test_concurrent_events_share_one_commit(self, game, session_factory):
+        """
+        Test: concurrent_events_share_one_commit
+        Intent: Events submitted within one window are written together
+        Expected: One flush, every caller gets its own id and timestamp
+        """
+        batcher = EventBatcher(session_factory, window_ms=5, max_events=100)
+        events = await asyncio.gather(*[
+            batcher.submit(game_id=game.id, team=models.TeamSide.A, minute=i, description=f"Event {i}")
+            for i in range(10)
+        ])
+
+        assert batcher.batches_flushed == 1
+        ids = [event.id for event in events]
+        assert len(set(ids)) == 10
+        assert ids == sorted(ids)
+        assert all(event.created_at is not None for event in events)
+        assert [event.minute for event in events] == list(range(10))
+
+    async def test_max_events_bounds_batch(self, game, session_factory):
+        """
+        Test: max_events_bounds_batch
+        Intent: A full batch is flushed without waiting for the window
+        Expected: Batches of at most max_events
+        """
+        batcher = EventBatcher(session_factory, window_ms=1000, max_events=2)
+        await asyncio.wait_for(asyncio.gather(*[
+            batcher.submit(game_id=game.id, team=models.TeamSide.B, minute=i, description="Burst")
+            for i in range(4)
+        ]), timeout=0.5)
+
+        assert batcher.batches_flushed == 2
+        assert batcher.events_flushed == 4
+
+    async def test_failed_event_does_not_fail_batch(self, game, session_factory):
+        """
+        Test: failed_event_does_not_fail_batch
+        Intent: One invalid row only fails its own caller
+        Expected: Valid events are committed, the invalid one raises
+        """
+        batcher = EventBatcher(session_factory, window_ms=5, max_events=100)
+        results = await asyncio.gather(
+            batcher.submit(game_id=game.id, team=models.TeamSide.A, minute=1, description="Good"),
+            batcher.submit(game_id=None, team=models.TeamSide.A, minute=2, description="Bad"),
+            batcher.submit(game_id=game.id, team=models.TeamSide.B, minute=3, description="Also good"),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], Exception)
+        assert results[0].id is not None
+        assert results[2].id is not None
+
+
+class TestBatchedCreateEvent:
+    """Test POST /games/{game_id}/events through the batcher."""
+
+    def test_create_event_batched(self, client, session_factory, monkeypatch):
+        """
+        Test: create_event_batched
+        Intent: Event endpoint works with group commit enabled
+        Expected: 201 Created and event visible in game state
+        """
+        monkeypatch.setattr(main, "event_batcher", EventBatcher(session_factory, window_ms=2))
+        sport_id = client.post("/sports", json={"name": "Soccer", "slug": "soccer"}).json()["id"]
+        game_id = client.post("/games", json={
+            "sport_id": sport_id,
+            "team_a_name": "A",
+            "team_b_name": "B"
+        }).json()["id"]
+
+        response = client.post(f"/games/{game_id}/events", json={
+            "team": "A",
+            "minute": 10,
+            "description": "Goal"
+        })
+        assert response.status_code == 201
+        assert response.json()["id"] is not None
+
+        events = client.get(f"/games/{game_id}").json()["events"]
+        assert [event["description"] for event in events] == ["Goal"]
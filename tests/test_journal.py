@@ -0,0 +1,132 @@
+"""
+Event Journal Tests
+
+Validate warm restarts of live-game state from the local journal.
+"""
+import os
+
+import pytest
+
+from app import models
+from app.journal import EventJournal, read_segment, restore_live_games
+from app.live_state import LiveGameStore, live_games
+
+
+@pytest.fixture
+def journal(tmp_path):
+    """A journal attached to the live-state store for the test."""
+    journal = EventJournal(str(tmp_path))
+    journal.open()
+    live_games.journal = journal
+    yield journal
+    live_games.journal = None
+    journal.close()
+
+
+def scored(count=3):
+    """Event bodies worth a point each, alternating sides."""
+    return [{"team": "AB"[minute % 2], "description": f"Event {minute}", "points": 1} for minute in range(count)]
+
+
+def restart(journal, test_db):
+    """Close the journal and restore it into a fresh store, as a new process would."""
+    live_games.journal = None
+    journal.close()
+    reopened = EventJournal(journal.directory)
+    store = LiveGameStore()
+    restored = restore_live_games(reopened, store, test_db)
+    reopened.close()
+    return store, restored
+
+
+class TestEventJournal:
+    """Test EventJournal and restore_live_games."""
+
+    def test_restart_restores_live_games(self, client, test_db, journal, create_game):
+        """
+        Test: restart_restores_live_games
+        Intent: Live games come back from the journal, corrections included
+        Expected: Same events as the database, without loading the game again
+        """
+        game_id = create_game(status="Live", events=scored())
+        events = client.get(f"/games/{game_id}").json()["events"]
+        client.patch(f"/games/{game_id}/events/{events[0]['id']}", json={"minute": 9})
+        client.delete(f"/games/{game_id}/events/{events[1]['id']}")
+
+        store, restored = restart(journal, test_db)
+
+        assert restored == 1
+        game = store.get(game_id)
+        assert game.status == models.GameStatus.LIVE
+        assert [(e.id, e.minute) for e in game.events] == [(events[0]["id"], 9), (events[2]["id"], 2)]
+        assert game.events[0].team == models.TeamSide.A
+
+    def test_finished_games_compacted(self, client, test_db, journal, create_game):
+        """
+        Test: finished_games_compacted
+        Intent: Finished games are dropped when the journal is compacted
+        Expected: Nothing restored and no records left for the game
+        """
+        game_id = create_game(status="Live", events=scored())
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        store, restored = restart(journal, test_db)
+
+        assert restored == 0
+        assert game_id not in store
+        records = [r for path in journal.segments() for r in read_segment(path)]
+        assert all(r.get("id") != game_id for r in records)
+
+    def test_stale_games_not_restored(self, client, test_db, journal, create_game):
+        """
+        Test: stale_games_not_restored
+        Intent: The database wins when the journal disagrees with it
+        Expected: A game with an event written outside the journal is skipped
+        """
+        game_id = create_game(status="Live", events=scored())
+        test_db.add(models.PlayByPlayEvent(
+            game_id=game_id, team=models.TeamSide.A, minute=5, description="Written elsewhere"
+        ))
+        test_db.commit()
+
+        store, restored = restart(journal, test_db)
+
+        assert restored == 0
+        assert game_id not in store
+
+    def test_torn_tail_ignored(self, client, test_db, journal, create_game):
+        """
+        Test: torn_tail_ignored
+        Intent: A partially written last record does not break replay
+        Expected: Records before the torn one are restored
+        """
+        game_id = create_game(status="Live", events=scored())
+        with open(journal.segments()[-1], "ab") as f:
+            f.write(b"\x40\x00\x00\x00\x01\x02")
+
+        store, restored = restart(journal, test_db)
+
+        assert restored == 1
+        assert len(store.get(game_id).events) == 3
+
+    def test_segments_roll_and_compact(self, client, test_db, tmp_path, create_game):
+        """
+        Test: segments_roll_and_compact
+        Intent: Segments roll over at their size limit and sealed ones are compacted
+        Expected: A bounded number of segments and complete state after restart
+        """
+        journal = EventJournal(str(tmp_path), segment_bytes=512, max_segments=3)
+        journal.open()
+        live_games.journal = journal
+        try:
+            game_id = create_game(status="Live", events=scored(40))
+        finally:
+            live_games.journal = None
+            journal.close()
+
+        assert len(journal.segments()) <= 5
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+        store, restored = restart(journal, test_db)
+        assert restored == 1
+        assert [e.minute for e in store.get(game_id).events] == list(range(40))
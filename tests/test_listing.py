@@ -0,0 +1,115 @@
+"""
+Game Listing Tests
+
+Validate status filters, keyset pagination and embedded scores on
+GET /sports/{sport_id}/games.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import archive
+
+
+def events(*scored):
+    """Event bodies for (team, points, description) tuples."""
+    return [{"team": team, "points": points, "description": description} for team, points, description in scored]
+
+
+class TestGameListing:
+    """Test GET /sports/{sport_id}/games filters, pages and includes."""
+
+    def test_status_filter(self, client, create_game, create_sport):
+        """
+        Test: status_filter
+        Intent: Games can be filtered by one or more statuses, by name or value
+        Expected: Only matching games; 400 for an unknown status
+        """
+        sport_id = create_sport()
+        scheduled = create_game()
+        live = create_game(status="Live")
+        finished = create_game(status="Finished")
+
+        ids = lambda **params: [g["id"] for g in client.get(f"/sports/{sport_id}/games", params=params).json()]
+        assert ids(status="LIVE") == [live]
+        assert ids(status="Live,finished") == [live, finished]
+        assert ids() == [scheduled, live, finished]
+        assert client.get(f"/sports/{sport_id}/games", params={"status": "Postponed"}).status_code == 400
+
+    def test_keyset_pages(self, client, create_game, create_sport):
+        """
+        Test: keyset_pages
+        Intent: Pages are keyed on game id and linked with rel="next"
+        Expected: Pages in id order without gaps; no Link on the last page
+        """
+        sport_id = create_sport()
+        game_ids = [create_game() for _ in range(5)]
+
+        seen, url, pages = [], f"/sports/{sport_id}/games?limit=2&fields=id", 0
+        while url:
+            response = client.get(url)
+            seen += [game["id"] for game in response.json()]
+            link = response.headers.get("link")
+            url = link[1:link.index(">")] if link else None
+            pages += 1
+        assert seen == game_ids
+        assert pages == 3
+
+        page = client.get(f"/sports/{sport_id}/games", params={"after_id": game_ids[1], "limit": 2}).json()
+        assert [game["id"] for game in page] == game_ids[2:4]
+        assert client.get("/sports/999/games", params={"limit": 2}).status_code == 404
+
+    def test_include_score_and_last_event(self, client, test_db, create_game, create_sport):
+        """
+        Test: include_score_and_last_event
+        Intent: A sport page gets every game's score and latest event in one query
+        Expected: Scores per side, the last recorded event (None without events),
+                  one SQL statement for the whole page
+        """
+        sport_id = create_sport()
+        live = create_game(status="Live", events=events(("A", 1, "Goal"), ("B", 1, "Goal"), ("A", 1, "Goal"),
+                                                        ("B", 0, "Yellow card")))
+        quiet = create_game(status="Live")
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+        try:
+            response = client.get(f"/sports/{sport_id}/games", params={
+                "status": "Live", "include": "score,last_event", "fields": "id,team_a_name"
+            })
+        finally:
+            event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+        assert response.status_code == 200
+        assert len(statements) == 1
+
+        games = {game["id"]: game for game in response.json()}
+        assert games[live]["score"] == {"team_a": 2, "team_b": 1}
+        assert games[live]["last_event"]["description"] == "Yellow card"
+        assert games[live]["last_event"]["minute"] == 3
+        assert set(games[live]) == {"id", "team_a_name", "score", "last_event"}
+        assert games[quiet]["score"] == {"team_a": 0, "team_b": 0}
+        assert games[quiet]["last_event"] is None
+
+        columnar = client.get(f"/sports/{sport_id}/games", params={
+            "include": "score", "fields": "id", "format": "columnar"
+        }).json()
+        assert columnar == {"id": [live, quiet], "score": [{"team_a": 2, "team_b": 1}, {"team_a": 0, "team_b": 0}]}
+        assert client.get(f"/sports/{sport_id}/games", params={"include": "lineups"}).status_code == 400
+
+    def test_archived_game_scores(self, client, test_db, create_game, create_sport):
+        """
+        Test: archived_game_scores
+        Intent: Games whose events were archived still list their score
+        Expected: Score and last event read from the archive
+        """
+        sport_id = create_sport()
+        game_id = create_game(status="Finished", events=events(("A", 3, "Try"), ("B", 2, "Conversion")))
+        test_db.execute(archive.Game.__table__.update().values(start_time=datetime(2020, 1, 1)))
+        test_db.commit()
+        archive.archive_finished(test_db, datetime(2021, 1, 1), pause_ms=0)
+
+        game = client.get(f"/sports/{sport_id}/games", params={"include": "score,last_event"}).json()[0]
+        assert game["id"] == game_id
+        assert game["score"] == {"team_a": 3, "team_b": 2}
+        assert game["last_event"]["description"] == "Conversion"
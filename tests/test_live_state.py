@@ -0,0 +1,145 @@
+"""
+Live-State Store Tests
+
+Validate that live-game reads are served from memory.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.live_state import live_games, LiveGameStore
+
+
+@pytest.fixture
+def query_counter(test_db):
+    """Count SQL statements executed against the test database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestLiveGameReads:
+    """Test reads of live games."""
+
+    def test_live_game_loaded_on_live(self, client, query_counter, create_game):
+        """
+        Test: live_game_loaded_on_live
+        Intent: Going LIVE loads the game, reads then skip the database
+        Expected: GET /games/{game_id} runs no SQL
+        """
+        game_id = create_game()
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 1, "description": "Kickoff"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        assert game_id in live_games
+
+        query_counter.clear()
+        data = client.get(f"/games/{game_id}").json()
+        assert query_counter == []
+        assert data["status"] == "Live"
+        assert [e["description"] for e in data["events"]] == ["Kickoff"]
+
+    def test_create_event_writes_through(self, client, query_counter, create_game):
+        """
+        Test: create_event_writes_through
+        Intent: New events appear in the store without a reload
+        Expected: Event visible in GET with no SQL, only the INSERT on create
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+
+        query_counter.clear()
+        response = client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 7, "description": "Goal"})
+        assert response.status_code == 201
+        assert not any("FROM games" in s for s in query_counter)
+
+        query_counter.clear()
+        events = client.get(f"/games/{game_id}").json()["events"]
+        assert query_counter == []
+        assert events[0]["description"] == "Goal"
+        assert events[0]["game_id"] == game_id
+
+    def test_first_subscriber_loads_game(self, client, create_game):
+        """
+        Test: first_subscriber_loads_game
+        Intent: A scheduled game is loaded when a client subscribes
+        Expected: Game present in the store after the handshake
+        """
+        game_id = create_game()
+        assert game_id not in live_games
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            websocket.receive_json()
+            assert game_id in live_games
+
+    def test_subscriber_releases_session(self, client, test_db, create_game):
+        """
+        Test: subscriber_releases_session
+        Intent: An open socket does not hold a pooled database connection
+        Expected: The handshake's session has no transaction while connected
+        """
+        game_id = create_game()
+        test_db.close()
+
+        with client.websocket_connect(f"/ws/games/{game_id}") as websocket:
+            websocket.receive_json()
+            assert game_id in live_games
+            assert not test_db.in_transaction()
+
+    def test_finished_game_evicted(self, client, create_game):
+        """
+        Test: finished_game_evicted
+        Intent: Finishing a game drops it from the store
+        Expected: Game absent from the store
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        assert game_id not in live_games
+
+    def test_memory_report(self, client, create_game):
+        """
+        Test: memory_report
+        Intent: Admin endpoint reports store size
+        Expected: Game and event counts with a byte estimate
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 3, "description": "Shot"})
+
+        data = client.get("/admin/live-games").json()
+        assert data["games"] == 1
+        assert data["events"] == 1
+        assert data["bytes"] > 0
+        assert data["game_ids"] == [game_id]
+
+
+class TestIdleEviction:
+    """Test idle eviction."""
+
+    def test_idle_games_evicted_unless_subscribed(self, test_db):
+        """
+        Test: idle_games_evicted_unless_subscribed
+        Intent: Idle games are dropped unless they still have subscribers
+        Expected: Only the unsubscribed game is evicted
+        """
+        from app import models
+        sport = models.Sport(name="Soccer", slug="soccer")
+        test_db.add(sport)
+        test_db.commit()
+        games = [models.Game(sport_id=sport.id, team_a_name="A", team_b_name="B") for _ in range(2)]
+        test_db.add_all(games)
+        test_db.commit()
+
+        store = LiveGameStore(idle_seconds=10)
+        store.is_active = lambda game_id: game_id == games[1].id
+        for game in games:
+            store.load_game(game)
+
+        assert store.evict_idle(now=store.get(games[0].id).last_access + 5) == []
+        assert store.evict_idle(now=store.get(games[0].id).last_access + 11) == [games[0].id]
+        assert games[1].id in store
@@ -0,0 +1,127 @@
+"""
+Long-Poll Tests
+
+Validate /games/{game_id}/events/wait and in-memory wakeups.
+"""
+import asyncio
+import threading
+import time
+
+from app.live_state import live_games
+from app.notify import GameNotifier, notifier
+
+
+class TestLongPoll:
+    """Test GET /games/{game_id}/events/wait."""
+
+    def test_wait_returns_newer_events_immediately(self, client, create_game):
+        """
+        Test: wait_returns_newer_events_immediately
+        Intent: Events newer than after_id are returned without waiting
+        Expected: 200 with only the newer events
+        """
+        game_id = create_game()
+        first = client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 1, "description": "First"}).json()
+        client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 2, "description": "Second"})
+
+        response = client.get(f"/games/{game_id}/events/wait", params={"after_id": first["id"]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "Scheduled"
+        assert [e["description"] for e in data["events"]] == ["Second"]
+
+    def test_wait_events_out_of_id_order(self, client, create_game):
+        """
+        Test: wait_events_out_of_id_order
+        Intent: Events appended out of id order (concurrent commits) are not skipped
+        Expected: Every event above after_id, wherever it sits in the live list
+        """
+        events = [{"team": "A", "description": f"E{n}"} for n in range(3)]
+        game_id = create_game(status="Live", events=events)
+        live_games.get(game_id).events.reverse()
+        first_id = min(event.id for event in live_games.get(game_id).events)
+
+        response = client.get(f"/games/{game_id}/events/wait", params={"after_id": first_id})
+        assert sorted(e["description"] for e in response.json()["events"]) == ["E1", "E2"]
+
+    def test_wait_timeout(self, client, create_game):
+        """
+        Test: wait_timeout
+        Intent: No new events within the timeout
+        Expected: 204 No Content
+        """
+        game_id = create_game()
+        response = client.get(f"/games/{game_id}/events/wait", params={"after_id": 0, "timeout": 0.1})
+        assert response.status_code == 204
+
+    def test_wait_woken_by_new_event(self, client, create_game):
+        """
+        Test: wait_woken_by_new_event
+        Intent: A parked request returns as soon as an event is created
+        Expected: 200 with the new event, well before the timeout
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+
+        result = {}
+
+        def wait():
+            start = time.time()
+            response = client.get(f"/games/{game_id}/events/wait", params={"after_id": 0, "timeout": 10})
+            result.update(response=response, elapsed=time.time() - start)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        deadline = time.time() + 5
+        while notifier.waiting(game_id) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 3, "description": "Goal"})
+        waiter.join(timeout=10)
+
+        assert result["response"].status_code == 200
+        assert result["response"].json()["events"][0]["description"] == "Goal"
+        assert result["elapsed"] < 5
+
+    def test_wait_finished_game(self, client, create_game):
+        """
+        Test: wait_finished_game
+        Intent: Finished games never get new events
+        Expected: 200 immediately with the final status
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        response = client.get(f"/games/{game_id}/events/wait", params={"after_id": 0, "timeout": 10})
+        assert response.status_code == 200
+        assert response.json() == {"game_id": game_id, "status": "Finished", "events": []}
+
+
+class TestGameNotifier:
+    """Test GameNotifier."""
+
+    async def test_one_notification_wakes_all(self):
+        """
+        Test: one_notification_wakes_all
+        Intent: Thousands of waiters share one future
+        Expected: A single notify wakes every waiter and clears the registry
+        """
+        game_notifier = GameNotifier()
+        waiters = [asyncio.ensure_future(game_notifier.wait(1, timeout=5)) for _ in range(1000)]
+        await asyncio.sleep(0)
+        assert game_notifier.waiting(1) == 1000
+
+        game_notifier.notify(1)
+        assert all(await asyncio.gather(*waiters))
+        assert game_notifier.waiting(1) == 0
+
+    async def test_timeout_cleans_up(self):
+        """
+        Test: timeout_cleans_up
+        Intent: Timed-out waiters leave no state behind
+        Expected: wait returns False and nothing is registered
+        """
+        game_notifier = GameNotifier()
+        assert await game_notifier.wait(1, timeout=0.01) is False
+        assert game_notifier.waiting(1) == 0
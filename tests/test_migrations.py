@@ -0,0 +1,82 @@
+"""
+Schema Migration Tests
+
+Validate Alembic migrations and the startup schema check.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from app.database import Base, SCHEMA_VERSION, include_name, verify_schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    """Alembic config pointing at a temporary SQLite database."""
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path}/migrated.db")
+    config.attributes["configure_logger"] = False
+    return config
+
+
+class TestMigrations:
+    """Test Alembic migrations."""
+
+    def test_schema_version_is_head(self, alembic_config):
+        """
+        Test: schema_version_is_head
+        Intent: Code expects the latest migration
+        Expected: SCHEMA_VERSION equals the Alembic head revision
+        """
+        script = ScriptDirectory.from_config(alembic_config)
+        assert script.get_current_head() == SCHEMA_VERSION
+
+    def test_upgrade_matches_models(self, alembic_config):
+        """
+        Test: upgrade_matches_models
+        Intent: Migrations produce the schema the models describe
+        Expected: No differences after upgrade head, schema check passes
+        """
+        command.upgrade(alembic_config, "head")
+        engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={"include_name": include_name})
+            diff = compare_metadata(context, Base.metadata)
+        assert diff == []
+        verify_schema(engine)
+
+    def test_unmigrated_database_rejected(self, tmp_path):
+        """
+        Test: unmigrated_database_rejected
+        Intent: Startup refuses a database that was never migrated
+        Expected: RuntimeError from verify_schema
+        """
+        engine = create_engine(f"sqlite:///{tmp_path}/empty.db")
+        with pytest.raises(RuntimeError):
+            verify_schema(engine)
+
+
+class TestStartup:
+    """Test application import side effects."""
+
+    def test_import_does_not_touch_database(self, tmp_path):
+        """
+        Test: import_does_not_touch_database
+        Intent: Importing the app creates no engine and no database file
+        Expected: No engine built, no SQLite file created
+        """
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path}/app.db", PYTHONPATH=ROOT)
+        code = "import app.main, app.database as d; assert d._engine is None"
+        subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+        assert not (tmp_path / "app.db").exists()
@@ -0,0 +1,131 @@
+"""
+Replay Tool Tests
+
+Validate how benchmarks/replay.py loads recordings and times their events.
+"""
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "replay", Path(__file__).resolve().parent.parent / "benchmarks" / "replay.py"
+)
+replay = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(replay)
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + "\n")
+    return str(path)
+
+
+class TestLoadJsonl:
+    """Test reading recordings from JSONL."""
+
+    def test_groups_by_game(self, tmp_path):
+        """
+        Test: groups_by_game
+        Intent: Each recorded game replays its own events in file order
+        Expected: Events grouped under their game_id, order kept, blank lines skipped
+        """
+        path = write_jsonl(tmp_path / "matchday.jsonl", [
+            {"game_id": 7, "team": "A", "minute": 1, "description": "Kick-off"},
+            {"game_id": 9, "team": "B", "minute": 2, "description": "Kick-off"},
+            {"game_id": 7, "team": "B", "minute": 30, "description": "Goal", "points": 1},
+        ])
+        games = replay.load_jsonl(path)
+        assert sorted(games) == [7, 9]
+        assert [event["minute"] for event in games[7]] == [1, 30]
+        assert games[9][0]["team"] == "B"
+
+    def test_missing_game_id(self, tmp_path):
+        """
+        Test: missing_game_id
+        Intent: A single-game recording does not need a game_id column
+        Expected: All events land in one game
+        """
+        path = write_jsonl(tmp_path / "game.jsonl", [
+            {"team": "A", "minute": 1, "description": "Kick-off"},
+            {"team": "A", "minute": 5, "description": "Shot"},
+        ])
+        games = replay.load_jsonl(path)
+        assert list(games) == [0]
+        assert len(games[0]) == 2
+
+
+class TestSchedule:
+    """Test event timing offsets."""
+
+    def test_created_at_offsets(self):
+        """
+        Test: created_at_offsets
+        Intent: Recorded timestamps keep the original spacing
+        Expected: Seconds since the first event
+        """
+        events = [
+            {"minute": 1, "created_at": "2026-05-01T15:00:00"},
+            {"minute": 1, "created_at": "2026-05-01T15:00:02.5"},
+            {"minute": 3, "created_at": "2026-05-01T15:01:40"},
+        ]
+        assert replay.schedule(events, 1.0) == [0.0, 2.5, 100.0]
+
+    def test_minute_offsets(self):
+        """
+        Test: minute_offsets
+        Intent: Without timestamps (even on one event), events are spaced by minute
+        Expected: 60 s per minute since the first event
+        """
+        events = [
+            {"minute": 10, "created_at": "2026-05-01T15:00:00"},
+            {"minute": 12, "created_at": None},
+            {"minute": 15},
+        ]
+        assert replay.schedule(events, 1.0) == [0.0, 120.0, 300.0]
+
+    def test_speed_scaling(self):
+        """
+        Test: speed_scaling
+        Intent: --speed divides the spacing between events
+        Expected: Offsets at 10x are a tenth of those at 1x
+        """
+        events = [{"minute": 0}, {"minute": 1}, {"minute": 45}]
+        assert replay.schedule(events, 10.0) == [0.0, 6.0, 270.0]
+        assert replay.schedule(events, 0.5) == [0.0, 120.0, 5400.0]
+
+    def test_out_of_order_and_empty(self):
+        """
+        Test: out_of_order_and_empty
+        Intent: Events recorded before the first one are sent immediately, not in the past
+        Expected: Negative offsets clamp to 0; no events, no offsets
+        """
+        events = [{"minute": 20}, {"minute": 18}, {"minute": 21}]
+        assert replay.schedule(events, 1.0) == [0.0, 0.0, 60.0]
+        assert replay.schedule([], 1.0) == []
+
+
+class TestFanOut:
+    """Test --copies."""
+
+    @pytest.mark.parametrize("copies", [1, 3])
+    def test_copies(self, copies):
+        """
+        Test: copies
+        Intent: Every recording is replayed --copies times, interleaved
+        Expected: copies x recordings games, each recording the same number of times
+        """
+        first, second = [{"minute": 1}], [{"minute": 2}]
+        replays = replay.fan_out([first, second], copies)
+        assert len(replays) == 2 * copies
+        assert replays[:2] == [first, second]
+        assert sum(events is first for events in replays) == copies
+        assert sum(events is second for events in replays) == copies
+
+    def test_no_copies(self):
+        """
+        Test: no_copies
+        Intent: --copies 0 replays nothing
+        Expected: No games
+        """
+        assert replay.fan_out([[{"minute": 1}]], 0) == []
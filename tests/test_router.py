@@ -0,0 +1,310 @@
+"""
+Game-Affinity Router Tests
+
+Validate rendezvous routing, rebalancing and HTTP proxying.
+"""
+from collections import Counter
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.cache import game_bodies
+from app.live_state import live_games
+from app.router import (
+    GameRouter, ProxiedSocket, RouterApp, REBALANCE_CLOSE_CODE, game_id_for, owner, relay_close_code
+)
+from app.stats import game_stats
+
+WORKERS = [f"http://127.0.0.1:800{n}" for n in range(1, 5)]
+
+
+class FakeSocket:
+    """Records how a proxied connection was closed."""
+
+    def __init__(self):
+        self.closed = None
+
+    async def close(self, code=1000, reason=""):
+        self.closed = code
+
+
+class TestRendezvousHashing:
+    """Test owner() and GameRouter.route."""
+
+    def test_game_paths(self):
+        """
+        Test: game_paths
+        Intent: Every per-game endpoint carries the game id used for routing
+        Expected: Game ids for game paths, None otherwise
+        """
+        assert game_id_for("/ws/games/7") == 7
+        assert game_id_for("/games/7/events/3") == 7
+        assert game_id_for("/games/7") == 7
+        assert game_id_for("/games") is None
+        assert game_id_for("/sports/7/games") is None
+
+    def test_same_worker_for_a_game(self):
+        """
+        Test: same_worker_for_a_game
+        Intent: A game's socket, event and read paths meet on one worker
+        Expected: One worker for all of them; games spread over every worker
+        """
+        router = GameRouter(WORKERS)
+        for game_id in range(100):
+            targets = {
+                router.route(f"/ws/games/{game_id}"),
+                router.route(f"/games/{game_id}/events"),
+                router.route(f"/games/{game_id}"),
+            }
+            assert len(targets) == 1
+
+        counts = Counter(owner(game_id, WORKERS) for game_id in range(10000))
+        assert set(counts) == set(WORKERS)
+        assert min(counts.values()) > 2000
+
+    def test_membership_changes_move_few_games(self):
+        """
+        Test: membership_changes_move_few_games
+        Intent: Only the games of a worker that leaves or joins move
+        Expected: Removal moves only that worker's games; a join moves games only to it
+        """
+        before = {game_id: owner(game_id, WORKERS) for game_id in range(5000)}
+
+        remaining = WORKERS[1:]
+        for game_id, worker in before.items():
+            if worker != WORKERS[0]:
+                assert owner(game_id, remaining) == worker
+
+        joined = WORKERS + ["http://127.0.0.1:8005"]
+        moved = [g for g in before if owner(g, joined) != before[g]]
+        assert all(owner(g, joined) == "http://127.0.0.1:8005" for g in moved)
+        assert len(moved) < 5000 * 0.3
+
+
+class TestRebalance:
+    """Test GameRouter.rebalance."""
+
+    async def test_moved_sockets_closed(self):
+        """
+        Test: moved_sockets_closed
+        Intent: Sockets whose game changed owner reconnect to the new owner
+        Expected: Only sockets of the departed worker's games are closed, with 1012
+        """
+        router = GameRouter(WORKERS)
+        sockets = []
+        for game_id in range(40):
+            socket = ProxiedSocket(game_id, router.route(f"/ws/games/{game_id}"), FakeSocket(), FakeSocket())
+            router.register(socket)
+            sockets.append(socket)
+
+        router.remove_worker(WORKERS[0])
+        closed = await router.rebalance()
+
+        for socket in sockets:
+            if socket.worker == WORKERS[0]:
+                assert socket.client.closed == REBALANCE_CLOSE_CODE
+                assert socket.game_id not in router.sockets
+            else:
+                assert socket.client.closed is None
+        assert closed == sum(1 for s in sockets if s.worker == WORKERS[0])
+
+
+class TestRouterApp:
+    """Test proxying through RouterApp."""
+
+    def make_client(self):
+        """Router over fake workers that answer with their own address."""
+        async def handler(request):
+            body = json.dumps({
+                "worker": f"{request.url.scheme}://{request.url.host}:{request.url.port}",
+                "path": request.url.path,
+                "forwarded_for": request.headers.get("x-forwarded-for"),
+            }).encode()
+
+            async def stream():
+                yield body
+            return httpx.Response(200, headers={"content-type": "application/json"}, content=stream())
+        router = GameRouter(WORKERS)
+        return router, TestClient(RouterApp(router, transport=httpx.MockTransport(handler)))
+
+    def test_requests_routed_by_game(self):
+        """
+        Test: requests_routed_by_game
+        Intent: HTTP requests for a game are proxied to its owner
+        Expected: Owner's response, path preserved, client address forwarded
+        """
+        router, client = self.make_client()
+        response = client.post("/games/12/events", json={"team": "A", "minute": 1, "description": "Goal"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["worker"] == owner(12, WORKERS)
+        assert data["path"] == "/games/12/events"
+        assert data["forwarded_for"] == "testclient"
+
+    def test_request_body_streamed(self):
+        """
+        Test: request_body_streamed
+        Intent: Large bodies (POST /import) are not buffered by the router
+        Expected: Body forwarded as a stream with its Content-Length; bodiless requests send none
+        """
+        requests = []
+
+        class RecordingTransport(httpx.AsyncBaseTransport):
+            """Notes how each upstream body arrives, before reading it."""
+
+            async def handle_async_request(self, request):
+                chunks = [chunk async for chunk in request.stream]
+                requests.append((type(request.stream), request.headers.get("content-length"), b"".join(chunks)))
+                return httpx.Response(204, stream=httpx.ByteStream(b""))
+
+        client = TestClient(RouterApp(GameRouter(WORKERS), transport=RecordingTransport()))
+        body = b'{"type": "sport", "name": "Soccer", "slug": "soccer"}\n' * 10000
+        client.post("/import", content=body, headers={"content-type": "application/x-ndjson"})
+        client.get("/games/12")
+
+        (imported, length, received), (_, _, empty) = requests
+        assert not issubclass(imported, httpx.ByteStream)
+        assert length == str(len(body))
+        assert received == body
+        assert empty == b""
+
+    def test_close_codes_relayed(self):
+        """
+        Test: close_codes_relayed
+        Intent: Worker close codes reach clients, but never ones reserved for local use
+        Expected: Sendable codes unchanged; 1005/1006/1015 become 1012 (reconnect)
+        """
+        assert relay_close_code(1000) == 1000
+        assert relay_close_code(4000) == 4000
+        assert relay_close_code(None) == 1000
+        for code in (1005, 1006, 1015):
+            assert relay_close_code(code) == REBALANCE_CLOSE_CODE
+
+    def test_workers_admin(self):
+        """
+        Test: workers_admin
+        Intent: Workers can be removed and added at runtime
+        Expected: Membership updated and traffic follows it
+        """
+        router, client = self.make_client()
+        leaving = owner(12, WORKERS)
+
+        data = client.delete("/_router/workers", params={"url": leaving}).json()
+        assert leaving not in data["healthy"]
+        assert client.get("/games/12").json()["worker"] != leaving
+
+        client.post("/_router/workers", params={"url": leaving})
+        assert client.get("/games/12").json()["worker"] == leaving
+
+    def test_no_healthy_workers(self):
+        """
+        Test: no_healthy_workers
+        Intent: The router reports when it cannot route
+        Expected: 503 Service Unavailable
+        """
+        router, client = self.make_client()
+        router.healthy.clear()
+        assert client.get("/games/1").status_code == 503
+
+
+class TestHealthChecks:
+    """Test worker probes and the game state released on membership changes."""
+
+    def make_app(self, down):
+        """Router over fake workers; workers in `down` fail every request. Records release calls."""
+        releases = []
+
+        async def handler(request):
+            worker = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+            if worker in down:
+                raise httpx.ConnectError("refused", request=request)
+            if request.url.path == "/admin/release":
+                releases.append((worker, json.loads(request.content)))
+            return httpx.Response(200, json={})
+        app = RouterApp(GameRouter(WORKERS), transport=httpx.MockTransport(handler), unhealthy_after=3)
+        return app, releases
+
+    async def test_failure_threshold(self):
+        """
+        Test: failure_threshold
+        Intent: One slow or failed probe does not move a worker's games
+        Expected: Removed only after 3 failures in a row; a success resets the count;
+                  probes time out before the next one is due
+        """
+        down = {WORKERS[0]}
+        app, _ = self.make_app(down)
+        assert app.probe_timeout < app.health_interval
+
+        assert not await app.probe()
+        assert not await app.probe()
+        down.clear()
+        await app.probe()
+        down.add(WORKERS[0])
+        assert not await app.probe()
+        assert not await app.probe()
+        assert WORKERS[0] in app.router.healthy
+        assert await app.probe()
+        assert WORKERS[0] not in app.router.healthy
+
+    async def test_returning_worker_released(self):
+        """
+        Test: returning_worker_released
+        Intent: A worker never serves game state it held before its games moved away
+        Expected: A returning worker drops every game before it is routed to; every
+                  healthy worker is told which games it owns after the change
+        """
+        down = {WORKERS[0]}
+        app, releases = self.make_app(down)
+        for _ in range(3):
+            await app.probe()
+        assert [worker for worker, _ in releases] == sorted(WORKERS[1:])
+        releases.clear()
+
+        down.clear()
+        assert await app.probe()
+        assert releases[0] == (WORKERS[0], {})
+        assert sorted(worker for worker, _ in releases[1:]) == WORKERS
+        assert all(body == {"worker": worker, "workers": WORKERS} for worker, body in releases[1:])
+
+    async def test_unreleased_worker_not_admitted(self):
+        """
+        Test: unreleased_worker_not_admitted
+        Intent: A worker that cannot drop its stale games gets no traffic
+        Expected: Still out of rotation
+        """
+        app, _ = self.make_app(set())
+        app.router.remove_worker(WORKERS[0])
+
+        async def refuse(worker, workers):
+            return False
+        app._release = refuse
+        assert not await app.probe()
+        assert WORKERS[0] not in app.router.healthy
+
+
+class TestRelease:
+    """Test POST /admin/release on a worker."""
+
+    def test_release_unowned_games(self, client, test_db, create_game):
+        """
+        Test: release_unowned_games
+        Intent: A worker drops the state of games that moved to another worker
+        Expected: Live state, stats and cached bodies gone for moved games only;
+                  everything gone without a worker
+        """
+        game_ids = [create_game(status="Live") for _ in range(8)]
+        for game_id in game_ids:
+            client.get(f"/games/{game_id}")
+            client.get(f"/games/{game_id}/stats")
+        me = WORKERS[0]
+        kept = {game_id for game_id in game_ids if owner(game_id, WORKERS) == me}
+
+        response = client.post("/admin/release", json={"worker": me, "workers": WORKERS})
+        assert response.json() == {"games": len(game_ids) - len(kept)}
+        assert set(live_games.game_ids()) == kept
+        assert set(game_stats.game_ids()) == kept
+        assert set(game_bodies.game_ids()) <= kept
+
+        client.post("/admin/release", json={})
+        assert live_games.game_ids() == game_stats.game_ids() == game_bodies.game_ids() == []
@@ -0,0 +1,149 @@
+"""
+Kickoff Scheduler Tests
+
+Validate start_time, pre-warming and automatic kickoffs.
+"""
+from datetime import datetime, timedelta
+
+from app import main
+from app.live_state import live_games
+from app.scheduler import KICKOFF, PREWARM, KickoffScheduler, kickoffs
+from app.stats import game_stats
+
+NOW = datetime(2026, 10, 19, 18, 0)
+
+
+def scheduler_for(test_db):
+    """A scheduler using the test session and the application's hooks."""
+    scheduler = KickoffScheduler(lambda: test_db, lead_seconds=60, lookahead_seconds=3600, scan_seconds=60)
+    scheduler.prewarm = main.prewarm_game
+    scheduler.kick_off = main.kick_off
+    return scheduler
+
+
+class TestStartTime:
+    """Test start_time on POST /games."""
+
+    def test_start_time_stored_as_utc(self, client, create_game):
+        """
+        Test: start_time_stored_as_utc
+        Intent: Kickoff times with an offset are normalized to UTC
+        Expected: 20:00+02:00 stored and returned as 18:00
+        """
+        game_id = create_game(start_time="2026-10-19T20:00:00+02:00")
+        game = client.get(f"/games/{game_id}").json()
+        assert game["start_time"] == "2026-10-19T18:00:00"
+        assert game["status"] == "Scheduled"
+
+    def test_start_time_defaults_to_now(self, client, create_game):
+        """
+        Test: start_time_defaults_to_now
+        Intent: Games created without a start time keep the old default
+        Expected: start_time close to the creation time
+        """
+        game = client.get(f"/games/{create_game()}").json()
+        assert abs(datetime.fromisoformat(game["start_time"]) - datetime.utcnow()) < timedelta(minutes=1)
+
+
+class TestQueue:
+    """Test the kickoff heap."""
+
+    def test_due_in_order(self):
+        """
+        Test: due_in_order
+        Intent: Pre-warms come lead time before kickoffs, earliest first
+        Expected: Actions popped in time order, only once due
+        """
+        scheduler = KickoffScheduler(lead_seconds=60)
+        scheduler.add(1, NOW + timedelta(seconds=30), NOW)
+        scheduler.add(2, NOW + timedelta(seconds=10), NOW)
+
+        assert scheduler._pop_due(NOW) == [(PREWARM, 2), (PREWARM, 1)]
+        assert scheduler._pop_due(NOW + timedelta(seconds=15)) == [(KICKOFF, 2)]
+        assert scheduler.is_upcoming(1) and not scheduler.is_upcoming(2)
+        assert scheduler._pop_due(NOW + timedelta(seconds=30)) == [(KICKOFF, 1)]
+
+    def test_window_and_requeue(self):
+        """
+        Test: window_and_requeue
+        Intent: Only kickoffs inside the window are queued; moving one drops its old entries
+        Expected: Far-future and long-overdue games skipped; one kickoff at the new time
+        """
+        scheduler = KickoffScheduler(lead_seconds=0, lookahead_seconds=3600, max_late_seconds=600)
+        scheduler.add(1, NOW + timedelta(hours=2), NOW)
+        scheduler.add(2, NOW - timedelta(hours=1), NOW)
+        assert not scheduler.is_upcoming(1) and not scheduler.is_upcoming(2)
+
+        scheduler.add(3, NOW + timedelta(seconds=10), NOW)
+        scheduler.add(3, NOW + timedelta(seconds=20), NOW)
+        due = scheduler._pop_due(NOW + timedelta(seconds=30))
+        assert due.count((KICKOFF, 3)) == 1
+
+
+class TestKickoff:
+    """Test pre-warming and starting games."""
+
+    async def test_prewarm_then_kickoff(self, client, test_db, create_game):
+        """
+        Test: prewarm_then_kickoff
+        Intent: Games are warm before kickoff and go Live on time
+        Expected: In live state and stats before kickoff; Live afterwards
+        """
+        start = NOW + timedelta(seconds=30)
+        game_id = create_game(start_time=start.isoformat())
+        scheduler = scheduler_for(test_db)
+
+        await scheduler.tick(NOW)
+        warm = live_games.get(game_id)
+        assert warm is not None and warm.status.value == "Scheduled"
+        assert game_stats.get(game_id) is not None
+        assert client.get(f"/games/{game_id}").json()["status"] == "Scheduled"
+
+        await scheduler.tick(start)
+        assert scheduler.started == 1
+        assert client.get(f"/games/{game_id}").json()["status"] == "Live"
+        assert live_games.get(game_id).status.value == "Live"
+
+    async def test_started_by_hand(self, client, test_db, create_game):
+        """
+        Test: started_by_hand
+        Intent: A game started before its kickoff time is left alone
+        Expected: No automatic start counted, game stays Live
+        """
+        start = NOW + timedelta(seconds=30)
+        game_id = create_game(start_time=start.isoformat())
+        scheduler = scheduler_for(test_db)
+        await scheduler.tick(NOW)
+
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        await scheduler.tick(start)
+        assert scheduler.started == 0
+        assert client.get(f"/games/{game_id}").json()["status"] == "Live"
+
+    def test_queued_only_while_running(self, client, monkeypatch, create_game):
+        """
+        Test: queued_only_while_running
+        Intent: Without the scheduler loop nothing would ever leave its queue
+        Expected: Nothing queued while stopped; a queued game started by hand
+                  is dropped and can be evicted from live state
+        """
+        start = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+        game_id = create_game(start_time=start)
+        assert not kickoffs.is_upcoming(game_id)
+        assert kickoffs.stats()["upcoming"] == []
+
+        monkeypatch.setattr(kickoffs, "_task", object())
+        game_id = create_game(start_time=start)
+        assert kickoffs.is_upcoming(game_id)
+
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        assert not kickoffs.is_upcoming(game_id)
+        assert game_id in live_games.evict_idle(now=1e12)
+
+    def test_admin_kickoffs(self, client):
+        """
+        Test: admin_kickoffs
+        Intent: Scheduler state is visible to operators
+        Expected: running flag, upcoming, warm and started
+        """
+        assert set(client.get("/admin/kickoffs").json()) == {"running", "upcoming", "warm", "started"}
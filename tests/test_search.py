@@ -0,0 +1,124 @@
+"""
+Event Search Tests
+
+Validate the full-text index over play-by-play descriptions.
+"""
+from datetime import datetime
+
+from app import archive, search
+
+
+def post(client, game_id, description, team="A", minute=1):
+    return client.post(f"/games/{game_id}/events", json={
+        "team": team, "minute": minute, "description": description
+    }).json()["id"]
+
+
+def found(client, **params):
+    """Event ids returned by a search."""
+    return [hit["event_id"] for hit in client.get("/search/events", params=params).json()["results"]]
+
+
+class TestSearch:
+    """Test GET /search/events."""
+
+    def test_search_across_games(self, client, create_game):
+        """
+        Test: search_across_games
+        Intent: New events are searchable at once, in any game
+        Expected: Matching events from both games, with highlights
+        """
+        game_a = create_game(status="Live")
+        game_b = create_game(status="Live")
+        first = post(client, game_a, "Penalty to Lions after a foul on Müller")
+        post(client, game_a, "Corner kick")
+        second = post(client, game_b, "Penalty saved by the keeper")
+
+        response = client.get("/search/events", params={"q": "penalty"})
+        assert response.status_code == 200
+        hits = response.json()["results"]
+        assert sorted(hit["event_id"] for hit in hits) == sorted([first, second])
+        assert "<mark>Penalty</mark>" in hits[0]["highlight"]
+        # Diacritics are folded, words are ANDed
+        assert found(client, q="muller foul") == [first]
+        assert found(client, q="pen*") != []
+
+    def test_filters(self, client, create_game, create_sport):
+        """
+        Test: filters
+        Intent: Results can be narrowed by sport, game and team
+        Expected: Only events matching every filter
+        """
+        game_a = create_game(status="Live")
+        soccer = create_sport()
+        game_b = create_game("hockey", status="Live")
+        hockey = create_sport("hockey")
+        a = post(client, game_a, "Goal from a header", team="A")
+        b = post(client, game_a, "Goal from a rebound", team="B")
+        c = post(client, game_b, "Goal on the power play", team="A")
+
+        assert sorted(found(client, q="goal", sport_id=soccer)) == sorted([a, b])
+        assert found(client, q="goal", sport_id=hockey) == [c]
+        assert found(client, q="goal", game_id=game_a, team="b") == [b]
+
+    def test_ranking_and_pages(self, client, create_game):
+        """
+        Test: ranking_and_pages
+        Intent: Best matches first, or newest first, one page at a time
+        Expected: Stronger match ranked first; next_offset until the last page
+        """
+        game_id = create_game(status="Live")
+        weak = post(client, game_id, "Yellow card shown after a long argument with the referee about a penalty")
+        strong = post(client, game_id, "Penalty! Penalty given")
+        assert found(client, q="penalty") == [strong, weak]
+        assert found(client, q="penalty", order="recent") == [strong, weak]
+
+        ids = [post(client, game_id, f"Shot number {i}") for i in range(5)]
+        page = client.get("/search/events", params={"q": "shot", "order": "recent", "limit": 2}).json()
+        assert [hit["event_id"] for hit in page["results"]] == ids[::-1][:2]
+        assert page["next_offset"] == 2
+        last = client.get("/search/events", params={"q": "shot", "order": "recent", "limit": 2, "offset": 4}).json()
+        assert [hit["event_id"] for hit in last["results"]] == [ids[0]]
+        assert last["next_offset"] is None
+
+    def test_corrections_kept_in_sync(self, client, create_game):
+        """
+        Test: corrections_kept_in_sync
+        Intent: Corrected and deleted events are reindexed in the same transaction
+        Expected: Old wording gone, new wording found, deleted event gone
+        """
+        game_id = create_game(status="Live")
+        event_id = post(client, game_id, "Goal by Smith")
+        client.patch(f"/games/{game_id}/events/{event_id}", json={"description": "Goal by Smyth"})
+        assert found(client, q="smith") == []
+        assert found(client, q="smyth") == [event_id]
+
+        client.delete(f"/games/{game_id}/events/{event_id}")
+        assert found(client, q="smyth") == []
+
+    def test_archived_events_searchable(self, client, test_db, create_game):
+        """
+        Test: archived_events_searchable
+        Intent: Moving a game to the archive keeps its events searchable
+        Expected: Same hit before and after archiving; rebuild reindexes both
+        """
+        game_id = create_game(status="Live")
+        event_id = post(client, game_id, "Red card for dissent")
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        test_db.execute(archive.Game.__table__.update().values(start_time=datetime(2020, 1, 1)))
+        test_db.commit()
+        archive.archive_finished(test_db, datetime(2021, 1, 1), pause_ms=0)
+        assert found(client, q="dissent") == [event_id]
+
+        live_game = create_game(status="Live")
+        post(client, live_game, "Free kick")
+        assert search.rebuild(test_db) == 2
+        assert found(client, q="dissent") == [event_id]
+
+    def test_query_without_words(self, client):
+        """
+        Test: query_without_words
+        Intent: Queries with nothing to match are rejected rather than matching everything
+        Expected: 400
+        """
+        assert client.get("/search/events", params={"q": "!!!"}).status_code == 400
@@ -0,0 +1,82 @@
+"""
+Standings Tests
+
+Validate the per-sport standings projection.
+"""
+from app import models, standings
+
+
+def play_game(create_game, team_a, team_b, points_a, points_b):
+    """Create a game, score the given points and finish it."""
+    goals = [{"team": "A", "description": "Goal", "points": 1}] * points_a
+    goals += [{"team": "B", "description": "Goal", "points": 1}] * points_b
+    return create_game(status="Finished", events=goals + [{"team": "A", "description": "Yellow card"}],
+                       team_a_name=team_a, team_b_name=team_b)
+
+
+def table(rows):
+    """Standings rows as comparable tuples."""
+    return [
+        (r["team_name"], r["played"], r["wins"], r["draws"], r["losses"], r["points_for"], r["points_against"])
+        for r in rows
+    ]
+
+
+class TestStandings:
+    """Test GET /sports/{sport_id}/standings."""
+
+    def test_standings_updated_on_finish(self, client, create_game, create_sport):
+        """
+        Test: standings_updated_on_finish
+        Intent: Finishing a game applies its result to the sport's table
+        Expected: Wins/draws/losses and points per team, best team first
+        """
+        sport_id = create_sport()
+        play_game(create_game, "Lions", "Tigers", 2, 1)
+        play_game(create_game, "Tigers", "Bears", 0, 0)
+        play_game(create_game, "Bears", "Lions", 3, 1)
+
+        response = client.get(f"/sports/{sport_id}/standings")
+        assert response.status_code == 200
+        assert table(response.json()) == [
+            ("Bears", 2, 1, 1, 0, 3, 1),
+            ("Lions", 2, 1, 0, 1, 3, 4),
+            ("Tigers", 2, 0, 1, 1, 1, 2),
+        ]
+
+    def test_live_games_not_counted(self, client, create_game, create_sport):
+        """
+        Test: live_games_not_counted
+        Intent: Only finished games count
+        Expected: Empty table while the game is live
+        """
+        sport_id = create_sport()
+        game_id = create_game(status="Live")
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 1, "description": "Goal", "points": 1})
+
+        assert client.get(f"/sports/{sport_id}/standings").json() == []
+
+    def test_rebuild_matches_incremental(self, client, test_db, create_game, create_sport):
+        """
+        Test: rebuild_matches_incremental
+        Intent: The set-based rebuild produces the same table
+        Expected: Identical standings after truncating and rebuilding
+        """
+        sport_id = create_sport()
+        play_game(create_game, "Lions", "Tigers", 2, 1)
+        play_game(create_game, "Tigers", "Lions", 2, 2)
+        incremental = client.get(f"/sports/{sport_id}/standings").json()
+
+        test_db.query(models.Standing).delete()
+        test_db.commit()
+        standings.rebuild(test_db)
+
+        assert client.get(f"/sports/{sport_id}/standings").json() == incremental
+
+    def test_standings_unknown_sport(self, client):
+        """
+        Test: standings_unknown_sport
+        Intent: Unknown sports are reported
+        Expected: 404 Not Found
+        """
+        assert client.get("/sports/99999/standings").status_code == 404
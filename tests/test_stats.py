@@ -0,0 +1,142 @@
+"""
+Game Statistics Tests
+
+Validate /games/{game_id}/stats and incremental aggregation.
+"""
+from sqlalchemy import event
+
+from app.schemas import MAX_EVENT_MINUTE
+from app.stats import game_stats
+
+
+class TestGameStats:
+    """Test GET /games/{game_id}/stats."""
+
+    def test_stats_counts_and_histograms(self, client, create_game):
+        """
+        Test: stats_counts_and_histograms
+        Intent: Stats aggregate existing events per team and minute
+        Expected: Counts, per-minute buckets and running totals
+        """
+        game_id = create_game()
+        for team, minute in (("A", 0), ("A", 2), ("B", 2), ("A", 2)):
+            client.post(f"/games/{game_id}/events", json={"team": team, "minute": minute, "description": "Shot"})
+
+        response = client.get(f"/games/{game_id}/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_events"] == 4
+        assert data["minutes"] == 3
+        assert data["teams"]["A"] == {"count": 3, "per_minute": [1, 0, 2], "running": [1, 1, 3]}
+        assert data["teams"]["B"] == {"count": 1, "per_minute": [0, 0, 1], "running": [0, 0, 1]}
+
+    def test_stats_updated_incrementally(self, client, test_db, create_game):
+        """
+        Test: stats_updated_incrementally
+        Intent: New events update built stats without rescanning events
+        Expected: Updated counts and no query on play_by_play_events for the read
+        """
+        game_id = create_game()
+        client.get(f"/games/{game_id}/stats")
+
+        client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 5, "description": "Goal"})
+
+        statements = []
+        engine = test_db.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            data = client.get(f"/games/{game_id}/stats").json()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert statements == []
+        assert data["teams"]["B"]["per_minute"] == [0, 0, 0, 0, 0, 1]
+        assert data["total_events"] == 1
+
+    def test_minute_bounded(self, client, create_game):
+        """
+        Test: minute_bounded
+        Intent: One event cannot blow up the dense per-minute buckets
+        Expected: 422 past MAX_EVENT_MINUTE, for new events and corrections
+        """
+        game_id = create_game()
+        too_late = {"team": "A", "minute": MAX_EVENT_MINUTE + 1, "description": "Goal"}
+        assert client.post(f"/games/{game_id}/events", json=too_late).status_code == 422
+        event_id = client.post(f"/games/{game_id}/events", json=dict(too_late, minute=MAX_EVENT_MINUTE)).json()["id"]
+        response = client.patch(f"/games/{game_id}/events/{event_id}", json={"minute": 5000000})
+        assert response.status_code == 422
+        assert client.get(f"/games/{game_id}/stats").json()["minutes"] == MAX_EVENT_MINUTE + 1
+
+    def test_stats_unknown_game(self, client):
+        """
+        Test: stats_unknown_game
+        Intent: Unknown games are reported
+        Expected: 404 Not Found
+        """
+        assert client.get("/games/99999/stats").status_code == 404
+
+    def test_rebuild_backfills(self, client, test_db, create_game):
+        """
+        Test: rebuild_backfills
+        Intent: Rows written outside create_event are picked up by a rebuild
+        Expected: Rebuilt stats include the backfilled rows
+        """
+        from app import models
+        game_id = create_game()
+        client.get(f"/games/{game_id}/stats")
+
+        test_db.add_all([
+            models.PlayByPlayEvent(game_id=game_id, team=models.TeamSide.A, minute=m, description="Imported")
+            for m in range(3)
+        ])
+        test_db.commit()
+        assert client.get(f"/games/{game_id}/stats").json()["total_events"] == 0
+
+        assert client.post("/admin/stats/rebuild").json() == {"games": 1}
+        assert client.get(f"/games/{game_id}/stats").json()["teams"]["A"]["running"] == [1, 2, 3]
+        assert game_stats.get(game_id).last_event_id > 0
+
+    def test_event_during_build(self, client, test_db, monkeypatch, create_game):
+        """
+        Test: event_during_build
+        Intent: An event committed between the build query and installing its
+                result (when record() finds no stats yet) is still counted
+        Expected: The late event is in the built stats; later events are counted once
+        """
+        game_id = create_game()
+        client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 1, "description": "Shot"})
+        snapshot = game_stats._snapshot
+
+        def snapshot_then_commit(db, game_ids):
+            built = snapshot(db, game_ids)
+            client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 2, "description": "Goal"})
+            return built
+
+        monkeypatch.setattr(game_stats, "_snapshot", snapshot_then_commit)
+        assert game_stats.get_or_build(test_db, game_id).to_dict()["total_events"] == 2
+
+        monkeypatch.undo()
+        client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 2, "description": "Goal"})
+        data = client.get(f"/games/{game_id}/stats").json()
+        assert data["teams"]["B"]["per_minute"] == [0, 0, 2]
+        assert data["total_events"] == 3
+
+    def test_event_during_rebuild(self, client, test_db, monkeypatch, create_game):
+        """
+        Test: event_during_rebuild
+        Intent: A rebuild does not overwrite an event record() counted into the stats it replaces
+        Expected: The event is in the rebuilt stats
+        """
+        game_id = create_game()
+        client.get(f"/games/{game_id}/stats")
+        snapshot = game_stats._snapshot
+
+        def snapshot_then_commit(db, game_ids):
+            built = snapshot(db, game_ids)
+            client.post(f"/games/{game_id}/events", json={"team": "A", "minute": 0, "description": "Goal"})
+            return built
+
+        monkeypatch.setattr(game_stats, "_snapshot", snapshot_then_commit)
+        client.post("/admin/stats/rebuild")
+        assert client.get(f"/games/{game_id}/stats").json()["teams"]["A"]["count"] == 1
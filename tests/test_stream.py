@@ -0,0 +1,153 @@
+"""
+Server-Sent Events Tests
+
+Validate the /games/{game_id}/stream endpoint and shared fan-out.
+"""
+import json
+import threading
+import time
+
+from app.connections import ConnectionManager, StreamSubscriber, manager
+
+
+def parse_frames(body):
+    """Split an event-stream body into (event, id, data) tuples."""
+    frames = []
+    for block in body.strip().split("\n\n"):
+        fields = {}
+        for line in block.split("\n"):
+            if line.startswith(":") or ": " not in line:
+                continue
+            key, value = line.split(": ", 1)
+            fields[key] = value
+        if "event" in fields:
+            frames.append((fields["event"], fields.get("id"), fields["data"]))
+    return frames
+
+
+class FakeWebSocket:
+    """Records text frames sent to it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+class TestEventStream:
+    """Test GET /games/{game_id}/stream."""
+
+    def test_stream_resume_finished_game(self, client, create_game):
+        """
+        Test: stream_resume_finished_game
+        Intent: Last-Event-ID replays only newer events; finished games end the stream
+        Expected: Events after the given id, then the final status
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+        ids = [
+            client.post(f"/games/{game_id}/events", json={"team": "A", "minute": m, "description": f"E{m}"}).json()["id"]
+            for m in (1, 2, 3)
+        ]
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+
+        response = client.get(f"/games/{game_id}/stream", headers={"Last-Event-ID": str(ids[0])})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        frames = parse_frames(response.text)
+        assert [(kind, event_id) for kind, event_id, _ in frames] == [
+            ("event", str(ids[1])), ("event", str(ids[2])), ("game_status", None)
+        ]
+
+    def test_stream_live_events(self, client, create_game):
+        """
+        Test: stream_live_events
+        Intent: Stream subscribers receive new events through ConnectionManager
+        Expected: New event frame, then the stream ends when the game finishes
+        """
+        game_id = create_game()
+        client.patch(f"/games/{game_id}/status", json={"status": "Live"})
+
+        result = {}
+        reader = threading.Thread(target=lambda: result.update(body=client.get(f"/games/{game_id}/stream").text))
+        reader.start()
+        deadline = time.time() + 5
+        while game_id not in manager.active_connections and time.time() < deadline:
+            time.sleep(0.01)
+
+        event_id = client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 9, "description": "Goal"}).json()["id"]
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        reader.join(timeout=5)
+
+        frames = parse_frames(result["body"])
+        assert frames[0][:2] == ("event", str(event_id))
+        assert '"description":"Goal"' in frames[0][2]
+        assert frames[1][0] == "game_status"
+        assert game_id not in manager.active_connections
+
+    def test_stream_resume_inside_held_batch(self, client, monkeypatch, create_game):
+        """
+        Test: stream_resume_inside_held_batch
+        Intent: A coalesced batch straddling a resumed client's position does not repeat events
+        Expected: Replayed event once; the batch re-encoded with only the newer event
+        """
+        monkeypatch.setattr(manager, "coalesce_window", lambda game_id, rate: 60.0)
+        game_id = create_game(status="Live")
+        ids = [
+            client.post(f"/games/{game_id}/events", json={"team": "A", "minute": m, "description": f"E{m}"}).json()["id"]
+            for m in (1, 2)
+        ]
+
+        result = {}
+        headers = {"Last-Event-ID": str(ids[0])}
+        reader = threading.Thread(target=lambda: result.update(
+            body=client.get(f"/games/{game_id}/stream", headers=headers).text
+        ))
+        reader.start()
+        deadline = time.time() + 5
+        while game_id not in manager.active_connections and time.time() < deadline:
+            time.sleep(0.01)
+
+        # Joins the batch still holding the first two events
+        ids.append(client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 3, "description": "E3"}).json()["id"])
+        client.patch(f"/games/{game_id}/status", json={"status": "Finished"})
+        reader.join(timeout=5)
+
+        frames = parse_frames(result["body"])
+        assert [(kind, event_id) for kind, event_id, _ in frames] == [
+            ("event", str(ids[1])), ("event_batch", str(ids[2])), ("game_status", None)
+        ]
+        assert [event["event_id"] for event in json.loads(frames[1][2])["events"]] == [ids[2]]
+
+    def test_stream_unknown_game(self, client):
+        """
+        Test: stream_unknown_game
+        Intent: Unknown games are reported before streaming starts
+        Expected: 404 Not Found
+        """
+        assert client.get("/games/99999/stream").status_code == 404
+
+
+class TestSharedFanOut:
+    """Test that all transports share one encoding per broadcast."""
+
+    async def test_broadcast_encodes_once(self):
+        """
+        Test: broadcast_encodes_once
+        Intent: WebSocket and SSE subscribers get the same pre-encoded payload
+        Expected: Identical JSON text for sockets, an SSE frame with the event id
+        """
+        registry = ConnectionManager()
+        sockets = [FakeWebSocket(), FakeWebSocket()]
+        stream = StreamSubscriber()
+        for subscriber in (*sockets, stream):
+            registry.subscribe(subscriber, 1)
+
+        await registry.broadcast(1, {"event_id": 7, "game_id": 1, "description": "Goal"})
+
+        assert sockets[0].sent[0] is sockets[1].sent[0]
+        frame = stream.queue.get_nowait()
+        assert frame.startswith("id: 7\nevent: event\n")
+        assert sockets[0].sent[0] in frame
@@ -0,0 +1,168 @@
+"""
+Tracing Tests
+
+Validate sampled request traces, SQL and fan-out spans, trace ids in
+broadcast payloads and span export.
+"""
+import json
+
+import pytest
+
+from app.connections import manager
+from app.tracing import FileExporter, OtlpExporter, Span, Tracer, tracer
+
+
+class MemoryExporter:
+    """Keeps exported spans."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+class FakeWebSocket:
+    """Records decoded messages sent to it."""
+
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    """Trace every request into a MemoryExporter."""
+    exporter = MemoryExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    tracer.flush()
+    return exporter
+
+
+class TestTracing:
+    """Test request tracing end to end."""
+
+    def test_event_trace(self, client, traced, create_game):
+        """
+        Test: event_trace
+        Intent: One trace covers an event's request, SQL, write and fan-out
+        Expected: Route-named root span with DB, write and ws.fanout children;
+                  the broadcast payload carries the trace id
+        """
+        game_id = create_game()
+        socket = FakeWebSocket()
+        manager.subscribe(socket, game_id)
+        try:
+            response = client.post(f"/games/{game_id}/events", json={
+                "team": "A", "minute": 10, "description": "Goal", "points": 1
+            })
+        finally:
+            manager.disconnect(socket, game_id)
+        tracer.flush()
+
+        trace_id = response.headers["traceparent"].split("-")[1]
+        spans = [span for span in traced.spans if span.trace_id == trace_id]
+        by_name = {span.name: span for span in spans}
+        root = by_name["POST /games/{game_id}/events"]
+        assert root.parent_id is None
+        assert root.attributes["http.status_code"] == 201
+        assert by_name["event.write"].parent_id == root.span_id
+        assert any(span.name == "db.query" and "INSERT" in span.attributes["db.statement"] for span in spans)
+        fanout = by_name["ws.fanout"]
+        assert fanout.attributes["ws.subscribers"] == 1
+        assert fanout.attributes["ws.failed"] == 0
+        assert socket.received[0]["trace_id"] == trace_id
+
+    def test_incoming_traceparent(self, client, traced):
+        """
+        Test: incoming_traceparent
+        Intent: A caller's traceparent is continued; an unsampled one is respected
+        Expected: Same trace id and parent; no spans when the sampled flag is off
+        """
+        parent = "00-" + "ab" * 16 + "-" + "cd" * 8
+        response = client.get("/sports", headers={"traceparent": parent + "-01"})
+        tracer.flush()
+        root = next(span for span in traced.spans if span.name == "GET /sports")
+        assert root.trace_id == "ab" * 16
+        assert root.parent_id == "cd" * 8
+        assert response.headers["traceparent"] == root.traceparent
+
+        traced.spans.clear()
+        response = client.get("/sports", headers={"traceparent": parent + "-00"})
+        tracer.flush()
+        assert "traceparent" not in response.headers
+        assert traced.spans == []
+
+    def test_unsampled(self, client, traced, monkeypatch, create_game):
+        """
+        Test: unsampled
+        Intent: Requests outside the sample rate cost no spans
+        Expected: No spans, no traceparent header, no trace_id in payloads
+        """
+        monkeypatch.setattr(tracer, "sample_rate", 0.0)
+        game_id = create_game()
+        response = client.post(f"/games/{game_id}/events", json={"team": "B", "minute": 1, "description": "Kick-off"})
+        tracer.flush()
+        assert response.status_code == 201
+        assert "traceparent" not in response.headers
+        assert traced.spans == []
+
+
+class TestExport:
+    """Test span queueing and exporters."""
+
+    def finished(self, name="work", parent_id=None, **attributes):
+        span = Span(name, "ab" * 16, parent_id, **attributes)
+        span.end_ns = span.start_ns + 1500000
+        return span
+
+    def test_queue_drops_when_full(self):
+        """
+        Test: queue_drops_when_full
+        Intent: A slow exporter must not grow memory without bound
+        Expected: Spans past the queue size are dropped and counted
+        """
+        exporter = MemoryExporter()
+        local = Tracer(exporter, sample_rate=1.0, max_queue=3)
+        root = local.start_trace("root")
+        for _ in range(5):
+            local.end(Span("child", root.trace_id, root.span_id))
+        assert local.stats()["dropped"] == 2
+        assert local.flush() == 3
+        assert local.stats()["exported"] == 3
+
+    def test_otlp_payload(self):
+        """
+        Test: otlp_payload
+        Intent: Spans are posted in the OTLP/HTTP JSON shape collectors accept
+        Expected: Resource service name, ids, nanosecond times, typed attributes
+        """
+        root = self.finished("GET /sports", **{"http.status_code": 200})
+        child = self.finished("db.query", root.span_id, **{"db.statement": "SELECT 1"})
+        child.error = "OperationalError()"
+        payload = OtlpExporter("http://collector/v1/traces", service_name="scoreboard").payload([root, child])
+
+        resource = payload["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "scoreboard"}
+        spans = resource["scopeSpans"][0]["spans"]
+        assert spans[0]["traceId"] == "ab" * 16
+        assert "parentSpanId" not in spans[0]
+        assert spans[0]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
+        assert spans[1]["parentSpanId"] == root.span_id
+        assert int(spans[1]["endTimeUnixNano"]) - int(spans[1]["startTimeUnixNano"]) == 1500000
+        assert spans[1]["status"] == {"code": 2, "message": "OperationalError()"}
+
+    def test_file_exporter(self, tmp_path):
+        """
+        Test: file_exporter
+        Intent: Spans can be written to a local file
+        Expected: One JSON span per line
+        """
+        path = tmp_path / "spans.jsonl"
+        FileExporter(str(path)).export([self.finished("a"), self.finished("b")])
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["name"] for line in lines] == ["a", "b"]
+        assert lines[0]["duration_ms"] == 1.5